@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Render benchmarks on synthetic scripts.
+
+    python benchmarks/render_bench.py run --sizes small,medium --save-baseline local
+    python benchmarks/render_bench.py compare benchmarks/baselines/local.json benchmarks/results/latest.json
+
+``run`` generates the synthetic inputs (see ``benchmarks/synthetic.py``) and
+measures command build time, text rasterization throughput, timeline build time
+and, with ``--encode``, end-to-end encode fps. ``compare`` exits 1 when any
+metric regressed by more than ``--threshold``.
+
+Every sample runs against empty render caches (a fresh temp dir per sample and
+no in-process layout plans), so repeated runs on one tree measure the code
+rather than what earlier runs left in ``outputs/cache``. Timings depend on the
+machine, so no baseline is committed: save one with ``--save-baseline`` on the
+host you compare on.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.synthetic import SIZES, generate  # noqa: E402
+from src.models import ConfigModel  # noqa: E402
+from src.render import ffmpeg_runner, layout_plan  # noqa: E402
+from src.render.ffmpeg_runner import _render_text_image, _resolve_font_path, build_ffmpeg_command  # noqa: E402
+from src.script_io import load_script  # noqa: E402
+from src.timeline import build_timeline  # noqa: E402
+
+BASELINE_DIR = PROJECT_ROOT / "benchmarks" / "baselines"
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+DEFAULT_WORK_DIR = PROJECT_ROOT / "work" / "bench"
+LOWER, HIGHER = "lower", "higher"
+
+
+@dataclass
+class Comparison:
+    metric: str
+    baseline: float
+    current: float
+    better: str
+    change: float
+    regressed: bool
+
+
+def _metric(value: float, unit: str, better: str) -> Dict[str, object]:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+class _ColdCaches:
+    """Stands in for ``ffmpeg_runner._cache_dir`` with empty dirs under ``root``.
+
+    ``reset`` switches to a new empty dir and forgets the in-process layout
+    plans, so the next sample rasterizes and lays out from scratch.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.generation = 0
+
+    def __call__(self, name: str) -> Path:
+        path = self.root / str(self.generation) / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def reset(self) -> None:
+        self.generation += 1
+        layout_plan._PLANS.clear()
+
+
+def _median_ms(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    samples = []
+    for _ in range(max(repeat, 1)):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _ffmpeg_version(ffmpeg_path: str) -> Optional[str]:
+    if shutil.which(ffmpeg_path) is None:
+        return None
+    try:
+        out = subprocess.run([ffmpeg_path, "-version"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.splitlines()[0] if out else None
+
+
+def _environment(ffmpeg_path: str) -> Dict[str, object]:
+    version_file = PROJECT_ROOT / "VERSION"
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "version": version_file.read_text(encoding="utf-8").strip() if version_file.exists() else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": _ffmpeg_version(ffmpeg_path),
+    }
+
+
+@contextlib.contextmanager
+def _cold_caches() -> Iterator[_ColdCaches]:
+    """Route the render caches into a temp dir for the duration of the block."""
+    with tempfile.TemporaryDirectory(prefix="render_bench_") as root:
+        caches = _ColdCaches(Path(root))
+        original = ffmpeg_runner._cache_dir
+        ffmpeg_runner._cache_dir = caches
+        try:
+            yield caches
+        finally:
+            ffmpeg_runner._cache_dir = original
+            layout_plan._PLANS.clear()
+
+
+def bench_size(
+    name: str,
+    work_dir: Path,
+    *,
+    repeat: int,
+    font: str,
+    text_samples: int,
+    encode: bool,
+    profile_name: str,
+    ffmpeg_path: str,
+) -> Dict[str, Dict[str, object]]:
+    root = work_dir / name
+    script = load_script(generate(name, root, font=font, ffmpeg_path=ffmpeg_path))
+    audio_dir = root / "audio"
+    profile = ConfigModel().get_render_profile(profile_name)
+    results: Dict[str, Dict[str, object]] = {}
+
+    results[f"{name}.timeline.build_ms"] = _metric(
+        _median_ms(lambda: build_timeline(script, audio_dir), repeat), "ms", LOWER
+    )
+    timeline = build_timeline(script, audio_dir)
+
+    def build() -> List[str]:
+        return build_ffmpeg_command(
+            script=script,
+            timeline=timeline,
+            audio_dir=audio_dir,
+            output_path=root / "out.mp4",
+            ffmpeg_path=ffmpeg_path,
+            profile=profile,
+        )
+
+    with _cold_caches() as caches:
+        # Font lookup is memoized per process; resolve it before anything is timed.
+        font_path = _resolve_font_path(script.text_style.font)
+        results[f"{name}.command.build_ms"] = _metric(_median_ms(build, repeat, setup=caches.reset), "ms", LOWER)
+
+        caches.reset()
+        started = time.perf_counter()
+        for idx in range(text_samples):
+            # Distinct strings in an empty cache, so every call rasterizes.
+            _render_text_image(f"{name} テロップ {idx}", font_path, 54, "#FFFFFF", "#000000", 3, 8, max_width=1600)
+        elapsed = time.perf_counter() - started
+        results[f"{name}.text.images_per_sec"] = _metric(text_samples / max(elapsed, 1e-9), "img/s", HIGHER)
+
+        if encode:
+            command = build()
+            frames = timeline.total_duration * (profile.fps or script.video.fps)
+            started = time.perf_counter()
+            subprocess.run(command, check=True, capture_output=True)
+            elapsed = time.perf_counter() - started
+            results[f"{name}.encode.fps"] = _metric(frames / max(elapsed, 1e-9), "fps", HIGHER)
+    return results
+
+
+def compare_results(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> List[Comparison]:
+    """Compare the metrics both result files have; ``threshold`` is a fraction (0.1 = 10%)."""
+    base_metrics = baseline.get("metrics", {})
+    cur_metrics = current.get("metrics", {})
+    comparisons: List[Comparison] = []
+    for metric in sorted(set(base_metrics) & set(cur_metrics)):
+        base = float(base_metrics[metric]["value"])
+        cur = float(cur_metrics[metric]["value"])
+        better = cur_metrics[metric].get("better", LOWER)
+        change = (cur - base) / base if base else 0.0
+        regressed = change > threshold if better == LOWER else change < -threshold
+        comparisons.append(Comparison(metric, base, cur, better, change, regressed))
+    return comparisons
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        print(f"[ERROR] Unknown size(s): {', '.join(unknown)} (available: {', '.join(SIZES)})", file=sys.stderr)
+        return 2
+    if args.encode and shutil.which(args.ffmpeg) is None:
+        print("[ERROR] --encode requires ffmpeg on PATH", file=sys.stderr)
+        return 2
+
+    metrics: Dict[str, Dict[str, object]] = {}
+    for size in sizes:
+        print(f"[Bench] {size}: {SIZES[size]}")
+        metrics.update(
+            bench_size(
+                size,
+                args.work_dir,
+                repeat=args.repeat,
+                font=args.font,
+                text_samples=args.text_samples,
+                encode=args.encode,
+                profile_name=args.profile,
+                ffmpeg_path=args.ffmpeg,
+            )
+        )
+    for metric, entry in metrics.items():
+        print(f"  {metric:<32} {entry['value']:>12.3f} {entry['unit']}")
+
+    payload = {"environment": _environment(args.ffmpeg), "profile": args.profile, "repeat": args.repeat, "metrics": metrics}
+    output = args.output or RESULTS_DIR / "latest.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] Results: {output}")
+    if args.save_baseline:
+        baseline_path = BASELINE_DIR / f"{args.save_baseline}.json"
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[OK] Baseline saved: {baseline_path}")
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    comparisons = compare_results(baseline, current, args.threshold)
+    if not comparisons:
+        print("[WARN] No common metrics to compare.")
+        return 0
+    for item in comparisons:
+        flag = "REGRESSION" if item.regressed else "ok"
+        print(f"  {item.metric:<32} {item.baseline:>12.3f} -> {item.current:>12.3f} ({item.change:+.1%}, {item.better} is better) {flag}")
+    regressions = [item for item in comparisons if item.regressed]
+    if regressions:
+        print(f"[ERROR] {len(regressions)} metric(s) regressed beyond {args.threshold:.0%}")
+        return 1
+    print(f"[OK] No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the render pipeline on synthetic scripts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Generate synthetic inputs and measure")
+    run.add_argument("--sizes", default="small,medium", help=f"Comma-separated sizes ({', '.join(SIZES)})")
+    run.add_argument("--repeat", type=int, default=5, help="Repetitions per timing (median is reported)")
+    run.add_argument("--text-samples", type=int, default=30, help="Text images rendered per size")
+    run.add_argument("--font", default="Noto Sans JP", help="Font for the synthetic captions")
+    run.add_argument("--profile", default="draft", help="Render profile used for command build and encode")
+    run.add_argument("--encode", action="store_true", help="Also run ffmpeg and measure end-to-end encode fps")
+    run.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg executable")
+    run.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR, help="Where synthetic inputs are written")
+    run.add_argument("--output", type=Path, help="Results JSON (default: benchmarks/results/latest.json)")
+    run.add_argument("--save-baseline", metavar="NAME", help="Also store the results as benchmarks/baselines/NAME.json")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Flag regressions between two result files")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown (0.10 = 10%%)")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import math
+import shutil
+import struct
+import subprocess
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+from src.models import (
+    OnScreenSegment,
+    OutputOptions,
+    OverlayImage,
+    ScriptModel,
+    Section,
+    StrokeStyle,
+    TextPosition,
+    TextStyle,
+    VideoConfig,
+    VoiceSettings,
+)
+
+SAMPLE_RATE = 24000
+
+
+@dataclass(frozen=True)
+class BenchSize:
+    sections: int
+    segments: int
+    overlays: int
+
+
+# sections x on-screen segments per section x overlay images per section
+SIZES: Dict[str, BenchSize] = {
+    "small": BenchSize(sections=5, segments=1, overlays=0),
+    "medium": BenchSize(sections=20, segments=2, overlays=1),
+    "large": BenchSize(sections=60, segments=3, overlays=2),
+}
+
+
+def section_seconds(index: int) -> float:
+    """Deterministic narration length so every run renders the same timeline."""
+    return 2.0 + (index % 3) * 0.5
+
+
+def write_sine_wav(path: Path, seconds: float, freq: float = 440.0) -> Path:
+    frames = int(seconds * SAMPLE_RATE)
+    amplitude = 0.2 * 32767
+    data = b"".join(
+        struct.pack("<h", int(amplitude * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))) for i in range(frames)
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(data)
+    return path
+
+
+def write_lavfi_background(
+    path: Path, width: int, height: int, fps: int, seconds: float, ffmpeg_path: str = "ffmpeg"
+) -> Optional[Path]:
+    """Render a ``testsrc2`` clip; returns None when ffmpeg is unavailable."""
+    if shutil.which(ffmpeg_path) is None:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    command = [
+        ffmpeg_path,
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={width}x{height}:rate={fps}",
+        "-t",
+        f"{seconds:.2f}",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        str(path),
+    ]
+    subprocess.run(command, check=True, capture_output=True)
+    return path
+
+
+def write_overlay_png(path: Path, size: int = 240) -> Path:
+    from PIL import Image, ImageDraw
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    ImageDraw.Draw(img).ellipse((8, 8, size - 8, size - 8), fill=(255, 200, 0, 220))
+    img.save(path, format="PNG")
+    return path
+
+
+def build_script(name: str, root: Path, *, font: str = "Noto Sans JP") -> ScriptModel:
+    size = SIZES[name]
+    overlay_path = root / "overlay.png"
+    sections = []
+    for idx in range(size.sections):
+        segments = [
+            OnScreenSegment(text=f"セクション{idx + 1} テロップ{seg + 1}") for seg in range(size.segments)
+        ] if size.segments > 1 else []
+        overlays = [
+            OverlayImage(file=str(overlay_path), position=TextPosition(x=f"left+{40 + 260 * n}", y="top+40"), scale=0.5)
+            for n in range(size.overlays)
+        ]
+        sections.append(
+            Section(
+                id=f"s{idx + 1:02d}",
+                on_screen_text=f"ベンチマーク用のテロップ {idx + 1}",
+                on_screen_segments=segments,
+                overlays=overlays,
+                narration=f"これは合成ベンチマークのナレーション {idx + 1} です。",
+                effects=["vignette"] if idx % 4 == 0 else [],
+            )
+        )
+    return ScriptModel(
+        project=f"bench-{name}",
+        title=f"Benchmark {name}",
+        video=VideoConfig(bg=str(root / "bg.mp4")),
+        voice=VoiceSettings(speaker_id=1),
+        text_style=TextStyle(font=font, stroke=StrokeStyle()),
+        sections=sections,
+        output=OutputOptions(filename=f"bench_{name}.mp4", srt=False),
+    )
+
+
+def generate(name: str, root: Path, *, font: str = "Noto Sans JP", ffmpeg_path: str = "ffmpeg") -> Path:
+    """Write the script YAML, narration WAVs and background for ``name`` under ``root``.
+
+    Narration WAVs land in ``root/audio`` with the names ``build_timeline``
+    expects. Nothing touches the network; the background is skipped (with the
+    YAML still pointing at it) when ffmpeg is missing.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    script = build_script(name, root, font=font)
+    for idx, section in enumerate(script.sections, start=1):
+        wav_path = root / "audio" / f"{idx:02d}_{section.id}.wav"
+        if not wav_path.exists():
+            write_sine_wav(wav_path, section_seconds(idx - 1), freq=330.0 + 20 * (idx % 8))
+    if SIZES[name].overlays and not (root / "overlay.png").exists():
+        write_overlay_png(root / "overlay.png")
+    bg_path = Path(script.video.bg)
+    if not bg_path.exists():
+        write_lavfi_background(bg_path, script.video.width, script.video.height, script.video.fps, 6.0, ffmpeg_path)
+    script_path = root / f"{name}.yaml"
+    script_path.write_text(
+        yaml.dump(script.model_dump(mode="json", exclude_none=True), allow_unicode=True, sort_keys=False),
+        encoding="utf-8",
+    )
+    return script_path
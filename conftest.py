@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _render_cache_root(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Keep the font index, caption, layout and clip caches out of the repo's ``outputs/cache``.
+
+    Lives at the repo root so the top-level ``test_*.py`` checks are covered
+    as well as ``tests/``.
+    """
+    from src.render import ffmpeg_runner, font_index
+
+    monkeypatch.setattr(ffmpeg_runner, "_CACHE_ROOT", tmp_path / "render_cache")
+    monkeypatch.setattr(font_index, "_INDEX", None)
@@ -66,6 +66,7 @@ const PYTHON_BIN = process.env.PYTHON_BIN || (fs.existsSync(VENV_PY) ? VENV_PY :
 const FETCH_ASSETS_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'fetch_assets.py');
 const GENERATE_AUDIO_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'generate_audio.py');
 const DESCRIBE_TIMELINE_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'describe_timeline.py');
+const RENDER_SNAPSHOT_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'render_snapshot.py');
 const GENERATE_VIDEO_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'generate_video.py');
 const YOUTUBE_AUTH_TEST_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'youtube_auth_test.py');
 const TRENDS_FETCH_SCRIPT = path.join(PROJECT_ROOT, 'scripts', 'fetch_trend_ideas_llm.py');
@@ -75,10 +76,13 @@ const DEFAULT_MAX_CONCURRENT = 1;
 const SCHEDULER_LOG_DIR = path.join(PROJECT_ROOT, 'logs', 'scheduler');
 const TMP_DIR = path.join(PROJECT_ROOT, 'tmp');
 const UI_SCRIPT_PATH = path.join(TMP_DIR, 'ui_script.yaml');
+const PREVIEW_SCRIPT_PATH = path.join(TMP_DIR, 'preview_script.yaml');
+const PREVIEW_SNAPSHOT_PATH = path.join(TMP_DIR, 'preview_snapshot.png');
 const AUDIO_CACHE_DIR = path.join(PROJECT_ROOT, 'work', 'audio');
 const OUTPUTS_DIR = path.join(PROJECT_ROOT, 'outputs', 'rendered');
 const CACHE_DIR = path.join(PROJECT_ROOT, 'outputs', 'cache');
 const DEBUG_FRAMES_DIR = path.join(PROJECT_ROOT, 'outputs', 'debug_frames');
+const PREVIEWS_DIR = path.join(PROJECT_ROOT, 'outputs', 'previews');
 const AUDIO_EXTENSIONS = new Set(['.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.aiff', '.aif', '.wma']);
 
 let currentSettings = loadAISettings();
@@ -298,6 +302,75 @@ function registerHandlers() {
     return { ok: false };
   });
 
+  ipcMain.handle('preview:snapshot', async (_event, payload) => {
+    // One composited frame (background seek + cached caption layers), fast enough to follow edits
+    const script = payload?.script;
+    if (!script) {
+      throw new Error('Script data is required for snapshot.');
+    }
+    fs.mkdirSync(TMP_DIR, { recursive: true });
+    fs.writeFileSync(PREVIEW_SCRIPT_PATH, YAML.stringify(script), 'utf-8');
+    const args = [
+      RENDER_SNAPSHOT_SCRIPT,
+      '--script',
+      PREVIEW_SCRIPT_PATH,
+      '--output',
+      PREVIEW_SNAPSHOT_PATH,
+      '--profile',
+      String(payload?.profile || 'preview'),
+      '--json',
+    ];
+    if (Number.isInteger(payload?.sectionIndex)) {
+      args.push('--section-index', String(payload.sectionIndex));
+    } else if (typeof payload?.time === 'number') {
+      args.push('--time', String(payload.time));
+    }
+    if (payload?.configPath) {
+      args.push('--config', payload.configPath);
+    }
+    return runPythonJson(args, 'プレビュー画像の生成に失敗しました。');
+  });
+
+  ipcMain.handle('preview:stream', async (event, payload) => {
+    // Low-resolution HLS proxy; the playlist is announced before the encode so playback can start early
+    const script = payload?.script;
+    if (!script) {
+      throw new Error('Script data is required for preview stream.');
+    }
+    fs.mkdirSync(TMP_DIR, { recursive: true });
+    fs.writeFileSync(PREVIEW_SCRIPT_PATH, YAML.stringify(script), 'utf-8');
+    const args = [GENERATE_VIDEO_SCRIPT, '--script', PREVIEW_SCRIPT_PATH, '--preview-stream'];
+    if (payload?.configPath) {
+      args.push('--config', payload.configPath);
+    }
+    if (payload?.skipAudio) args.push('--skip-audio');
+    if (payload?.profile) args.push('--profile', String(payload.profile));
+    return runPythonText(args, 'プレビューストリームの生成に失敗しました。', (progress) => {
+      if (event.sender.isDestroyed()) return;
+      if (progress.stage === 'preview_stream' && progress.playlist) {
+        event.sender.send('preview:stream-ready', progress);
+      } else {
+        event.sender.send('preview:stream-progress', progress);
+      }
+    });
+  });
+
+  ipcMain.handle('preview:stream-read', (_event, playlistPath) => {
+    const resolved = path.resolve(String(playlistPath || ''));
+    if (!resolved.startsWith(PREVIEWS_DIR + path.sep) || !fs.existsSync(resolved)) {
+      return { init: null, segments: [], ended: false };
+    }
+    return parseStreamPlaylist(resolved);
+  });
+
+  ipcMain.handle('preview:stream-segment', (_event, segmentPath) => {
+    const resolved = path.resolve(String(segmentPath || ''));
+    if (!resolved.startsWith(PREVIEWS_DIR + path.sep)) {
+      throw new Error('Segment outside the previews directory.');
+    }
+    return fs.readFileSync(resolved);
+  });
+
   ipcMain.handle('themes:list', () => listThemes());
   ipcMain.handle('scripts:new', (event, args) => {
     const theme = listThemes().find((t) => t.id === args?.themeId);
@@ -643,7 +716,15 @@ function registerHandlers() {
     if (payload?.skipAudio) args.push('--skip-audio');
     if (payload?.forceAudio) args.push('--force-audio');
     if (payload?.clearAudio) args.push('--clear-audio-cache');
-    const result = await runPythonText(args, '動画生成に失敗しました。');
+    if (payload?.profile) args.push('--profile', String(payload.profile));
+    // Segment rendering lets an edit re-encode only the sections whose content changed.
+    const workers = payload?.workers || Math.max(2, Math.floor(os.cpus().length / 2));
+    args.push('--workers', String(workers));
+    const result = await runPythonText(args, '動画生成に失敗しました。', (progress) => {
+      if (!event.sender.isDestroyed()) {
+        event.sender.send('video:progress', progress);
+      }
+    });
     const outputDir = payload?.outputDir || OUTPUTS_DIR;
     const filename = script?.output?.filename || 'output.mp4';
     return { ...result, outputPath: path.join(outputDir, filename) };
@@ -1600,15 +1681,42 @@ function runPythonJson(args, friendlyError) {
   });
 }
 
-function runPythonText(args, friendlyError) {
+function parseProgressLine(line) {
+  const trimmed = line.trim();
+  if (!trimmed.startsWith('{') || !trimmed.includes('"progress"')) return null;
+  try {
+    const payload = JSON.parse(trimmed);
+    return payload && payload.event === 'progress' ? payload : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+function runPythonText(args, friendlyError, onProgress) {
   return new Promise((resolve, reject) => {
     const proc = spawn(PYTHON_BIN, args, { cwd: PROJECT_ROOT, env: buildEnv() });
     let stderr = '';
     let stdout = '';
+    let pending = '';
     proc.stdout.on('data', (data) => {
       const text = data.toString();
-      stdout += text;
       process.stdout.write(text);
+      if (!onProgress) {
+        stdout += text;
+        return;
+      }
+      // Progress JSON lines go to the callback; everything else stays in the log.
+      pending += text;
+      const lines = pending.split('\n');
+      pending = lines.pop();
+      lines.forEach((line) => {
+        const progress = parseProgressLine(line);
+        if (progress) {
+          onProgress(progress);
+        } else {
+          stdout += `${line}\n`;
+        }
+      });
     });
     proc.stderr.on('data', (data) => {
       stderr += data.toString();
@@ -1617,6 +1725,9 @@ function runPythonText(args, friendlyError) {
       reject(new Error(`${friendlyError || 'コマンド実行に失敗しました。'}\n${err.message}`));
     });
     proc.on('close', (code) => {
+      if (pending && !parseProgressLine(pending)) {
+        stdout += pending;
+      }
       if (code !== 0) {
         reject(new Error(`${friendlyError || 'コマンド実行に失敗しました。'}\n${stderr.trim()}`));
         return;
@@ -1681,6 +1792,23 @@ function collectBgmFiles(directory) {
   return { resolvedDirectory, items };
 }
 
+function parseStreamPlaylist(playlistPath) {
+  // Minimal HLS reader for the ffmpeg "event" playlists written by --preview-stream
+  const dir = path.dirname(playlistPath);
+  const lines = fs.readFileSync(playlistPath, 'utf-8').split('\n').map((line) => line.trim());
+  let init = null;
+  const segments = [];
+  lines.forEach((line) => {
+    const map = line.match(/^#EXT-X-MAP:URI="([^"]+)"/);
+    if (map) {
+      init = path.join(dir, map[1]);
+    } else if (line && !line.startsWith('#')) {
+      segments.push(path.join(dir, line));
+    }
+  });
+  return { init, segments, ended: lines.includes('#EXT-X-ENDLIST') };
+}
+
 function saveTempScript(script) {
   fs.mkdirSync(TMP_DIR, { recursive: true });
   const yamlText = YAML.stringify(script || {});
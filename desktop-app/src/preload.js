@@ -26,6 +26,7 @@ contextBridge.exposeInMainWorld('api', {
   clearAllCache: () => ipcRenderer.invoke('cache:clear-all'),
   describeTimeline: (payload) => ipcRenderer.invoke('timeline:describe', payload),
   generateVideo: (payload) => ipcRenderer.invoke('video:generate', payload),
+  onVideoProgress: (callback) => ipcRenderer.on('video:progress', (_event, progress) => callback(progress)),
   uploadVideo: (payload) => ipcRenderer.invoke('video:upload', payload),
   openOutputPath: (payload) => ipcRenderer.invoke('video:open-output', payload),
   getLatestVideo: () => ipcRenderer.invoke('video:get-latest'),
@@ -50,6 +51,12 @@ contextBridge.exposeInMainWorld('api', {
   onPreviewRequestFromMain: (callback) => ipcRenderer.on('preview:request-from-main', callback),
   onPreviewScriptUpdated: (callback) => ipcRenderer.on('preview:script-updated', (_event, script) => callback(script)),
   updateScriptFromPreview: (script) => ipcRenderer.invoke('preview:update-script', script),
+  renderPreviewSnapshot: (payload) => ipcRenderer.invoke('preview:snapshot', payload),
+  startPreviewStream: (payload) => ipcRenderer.invoke('preview:stream', payload),
+  onPreviewStreamReady: (callback) => ipcRenderer.on('preview:stream-ready', (_event, data) => callback(data)),
+  onPreviewStreamProgress: (callback) => ipcRenderer.on('preview:stream-progress', (_event, data) => callback(data)),
+  readPreviewStream: (playlistPath) => ipcRenderer.invoke('preview:stream-read', playlistPath),
+  readPreviewSegment: (segmentPath) => ipcRenderer.invoke('preview:stream-segment', segmentPath),
   requestPreviewData: () => ipcRenderer.send('preview:request-data'),
   sendPreviewData: (data) => ipcRenderer.send('preview:send-data', data),
 });
@@ -8,10 +8,21 @@
   const summaryPanel = document.getElementById('summaryPanel');
   const sectionPreviewBg = document.getElementById('sectionPreviewBg');
   const sectionPreviewTexts = document.getElementById('sectionPreviewTexts');
+  const sectionPreviewSnapshot = document.getElementById('sectionPreviewSnapshot');
+  const sectionPreviewLabel = document.getElementById('sectionPreviewLabel');
+  const streamStartBtn = document.getElementById('streamStartBtn');
+  const streamStatus = document.getElementById('streamStatus');
+  const streamVideo = document.getElementById('streamVideo');
 
   let editMode = false;
   let currentScript = null;
   let selectedSectionIndex = 0;
+  let snapshotTimer = null;
+  let snapshotSeq = 0;
+  let streamToken = 0;
+
+  // fMP4 HLS segments from --preview-stream (H.264 + AAC)
+  const STREAM_MIME = 'video/mp4; codecs="avc1.640028, mp4a.40.2"';
 
   const PREVIEW_BASE_W = 1080;
   const PREVIEW_BASE_H = 1920;
@@ -22,8 +33,34 @@
     selectedSectionIndex = data.selectedIndex || 0;
     updatePreview();
     updateSectionPreview();
+    requestSnapshot();
   });
 
+  // Replace the HTML mock with a frame composited by the renderer (debounced; latest edit wins)
+  function requestSnapshot() {
+    if (!currentScript || !window.api.renderPreviewSnapshot) return;
+    clearTimeout(snapshotTimer);
+    snapshotTimer = setTimeout(async () => {
+      const seq = ++snapshotSeq;
+      sectionPreviewLabel.textContent = 'セクションプレビュー (レンダリング中…)';
+      try {
+        const result = await window.api.renderPreviewSnapshot({
+          script: currentScript,
+          sectionIndex: selectedSectionIndex,
+        });
+        if (seq !== snapshotSeq) return;
+        sectionPreviewSnapshot.src = `file://${result.path}?t=${Date.now()}`;
+        sectionPreviewSnapshot.classList.add('is-ready');
+        sectionPreviewLabel.textContent = `セクションプレビュー (${result.section} / ${result.time}s・${result.elapsed_sec}s で生成)`;
+      } catch (err) {
+        if (seq !== snapshotSeq) return;
+        console.error('Snapshot error:', err);
+        sectionPreviewSnapshot.classList.remove('is-ready');
+        sectionPreviewLabel.textContent = 'セクションプレビュー (50% 縮尺・配置のみ)';
+      }
+    }, 300);
+  }
+
   function updatePreview() {
     if (!currentScript) {
       yamlPreview.value = '# スクリプトが読み込まれていません';
@@ -123,6 +160,74 @@
     }
   }
 
+  // Progressive proxy playback: append segments to a MediaSource as ffmpeg publishes them
+  async function playStream(playlistPath, token) {
+    const mediaSource = new MediaSource();
+    streamVideo.src = URL.createObjectURL(mediaSource);
+    await new Promise((resolve) => mediaSource.addEventListener('sourceopen', resolve, { once: true }));
+    const buffer = mediaSource.addSourceBuffer(STREAM_MIME);
+    const append = (data) =>
+      new Promise((resolve, reject) => {
+        buffer.addEventListener('updateend', resolve, { once: true });
+        buffer.addEventListener('error', reject, { once: true });
+        buffer.appendBuffer(data);
+      });
+    const appended = new Set();
+    let initAppended = false;
+    while (token === streamToken) {
+      const playlist = await window.api.readPreviewStream(playlistPath);
+      if (playlist.init && !initAppended) {
+        await append(await window.api.readPreviewSegment(playlist.init));
+        initAppended = true;
+      }
+      if (initAppended) {
+        for (const segment of playlist.segments) {
+          if (appended.has(segment) || token !== streamToken) continue;
+          await append(await window.api.readPreviewSegment(segment));
+          appended.add(segment);
+          if (streamVideo.paused && appended.size === 1) {
+            streamVideo.play().catch(() => {});
+          }
+        }
+      }
+      if (playlist.ended) {
+        if (mediaSource.readyState === 'open') mediaSource.endOfStream();
+        return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  }
+
+  window.api.onPreviewStreamReady((data) => {
+    const token = streamToken;
+    streamStatus.textContent = `プロキシ再生 (エンコード中… 全 ${data.total_sec}s)`;
+    playStream(data.playlist, token).catch((err) => {
+      console.error('Stream playback error:', err);
+      streamStatus.textContent = `プロキシ再生エラー: ${err.message || err}`;
+    });
+  });
+
+  window.api.onPreviewStreamProgress((progress) => {
+    if (progress.percent != null && progress.status !== 'end') {
+      streamStatus.textContent = `プロキシ再生 (エンコード中… ${progress.percent}%)`;
+    }
+  });
+
+  streamStartBtn.addEventListener('click', async () => {
+    if (!currentScript) return;
+    streamToken += 1;
+    streamStartBtn.disabled = true;
+    streamStatus.textContent = 'プロキシ再生 (準備中…)';
+    try {
+      await window.api.startPreviewStream({ script: currentScript });
+      streamStatus.textContent = 'プロキシ再生 (エンコード完了)';
+    } catch (err) {
+      streamStatus.textContent = `プロキシ再生エラー: ${err.message || err}`;
+    } finally {
+      streamStartBtn.disabled = false;
+    }
+  });
+
   yamlEditBtn.addEventListener('click', () => {
     editMode = !editMode;
     yamlPreview.readOnly = !editMode;
@@ -143,6 +248,8 @@
       await window.api.updateScriptFromPreview(edited);
       
       currentScript = edited;
+      updateSectionPreview();
+      requestSnapshot();
       editMode = false;
       yamlPreview.readOnly = true;
       yamlApplyBtn.disabled = true;
@@ -46,6 +46,7 @@
   const historyRefreshBtn = document.getElementById('historyRefreshBtn');
   const schedulerBtn = document.getElementById('schedulerBtn');
   const clearAudioOnVideo = document.getElementById('clearAudioOnVideo');
+  const renderProfileSelect = document.getElementById('renderProfileSelect');
   const shortModeCheck = document.getElementById('shortModeCheck');
   const tabButtons = Array.from(document.querySelectorAll('.tab-btn'));
   const tabContents = Array.from(document.querySelectorAll('.tab-content'));
@@ -707,6 +708,7 @@
       const result = await window.api.generateVideo({
         script: state.script,
         clearAudio: clearAudioOnVideo?.checked !== false,
+        profile: renderProfileSelect?.value || undefined,
       });
       state.videoLog = result.stdout || '';
       videoLogEl.value = state.videoLog;
@@ -1987,6 +1989,14 @@
   if (videoGenerateBtn) {
     videoGenerateBtn.addEventListener('click', handleVideoGenerate);
   }
+  if (window.api.onVideoProgress) {
+    window.api.onVideoProgress((progress) => {
+      if (!state.videoGenerating || !videoGenerateBtn) return;
+      const percent = typeof progress.percent === 'number' ? `${progress.percent.toFixed(0)}%` : '';
+      const eta = typeof progress.eta_sec === 'number' ? ` 残り${Math.ceil(progress.eta_sec)}秒` : '';
+      videoGenerateBtn.textContent = `動画生成中... ${percent}${eta}`;
+    });
+  }
   if (videoOpenBtn) {
     videoOpenBtn.addEventListener('click', handleOpenVideo);
   }
@@ -17,7 +17,7 @@ import logging
 import sys
 from pathlib import Path
 from copy import deepcopy
-from typing import Tuple
+from typing import Optional, Tuple
 
 # プロジェクトルートをパスに追加
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -25,7 +25,9 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.script_io import load_script
-from src.render.ffmpeg_runner import _resolve_font_path, _fit_font_size
+from src.render.ffmpeg_runner import _resolve_font_path
+from src.render.font_metrics import get_font_metrics
+from src.render.layout_plan import LayoutPlan, SectionLayout, get_layout_plan
 from src.models import TextStyle, ScriptModel, OnScreenSegment
 
 logger = logging.getLogger(__name__)
@@ -46,40 +48,62 @@ def verify_fit(text: str, font_path: str, fontsize: int, max_width: int, stroke_
       - is_fit: True なら収まっている
       - max_line_width: 最長行の幅（px）。-1 はエラー
     """
+    metrics = get_font_metrics()
     try:
-        from PIL import ImageFont, Image, ImageDraw
-    except Exception as e:
+        metrics.face(font_path, fontsize)
+    except ImportError as e:
         logger.error(f"Pillow import failed: {e}")
         return True, 0
-
-    try:
-        font = ImageFont.truetype(font_path, size=fontsize)
-        dummy = Image.new("RGB", (8, 8))
-        draw = ImageDraw.Draw(dummy)
-        lines = text.split("\n")
-        
-        max_width_found = 0
-        for idx, line in enumerate(lines):
-            if not line.strip():
-                continue
-            try:
-                # stroke_width を含めて計測（ffmpeg_runner.py と同じ方法）
-                bbox = draw.textbbox((0, 0), line, font=font, stroke_width=max(0, stroke_width))
-                line_width = bbox[2] - bbox[0]
-                max_width_found = max(max_width_found, line_width)
-                
-                if line_width > max_width:
-                    logger.debug(f"  Line {idx} exceeds: '{line[:20]}...' = {line_width}px > {max_width}px")
-            except Exception as e:
-                logger.warning(f"  getbbox failed for line: {line[:20]}..., error: {e}")
-                return False, -1
-        
-        return max_width_found <= max_width, max_width_found
-    
     except Exception as e:
         logger.error(f"verify_fit error: {e}")
         return False, -1
 
+    max_width_found = 0
+    for idx, line in enumerate(text.split("\n")):
+        if not line.strip():
+            continue
+        try:
+            # stroke_width を含めて計測（ffmpeg_runner.py と同じ FontMetrics を共有）
+            line_width = metrics.line_size(line, font_path, fontsize, stroke_width)[0]
+        except Exception as e:
+            logger.warning(f"  getbbox failed for line: {line[:20]}..., error: {e}")
+            return False, -1
+        max_width_found = max(max_width_found, line_width)
+        if line_width > max_width:
+            logger.debug(f"  Line {idx} exceeds: '{line[:20]}...' = {line_width}px > {max_width}px")
+
+    return max_width_found <= max_width, max_width_found
+
+
+def planned_fit(
+    layout: Optional[SectionLayout], idx: int, text: str, font_path: str, fontsize: int, max_width: int, stroke_width: int
+) -> Optional[Tuple[bool, float]]:
+    """
+    LayoutPlan が同じ条件（テキスト・フォント・サイズ・ストローク）で計測済みなら、その幅で判定する。
+
+    戻り値: verify_fit() と同じ (is_fit, max_line_width)。計測結果を流用できなければ None。
+    """
+    if layout is None or idx >= len(layout.captions):
+        return None
+    caption = layout.captions[idx]
+    lines = [ln for ln in text.split("\n") if ln.strip()]
+    if (caption.text, caption.font_path, caption.fontsize, caption.stroke_width, caption.lines) != (
+        text, font_path, fontsize, stroke_width, lines
+    ):
+        return None
+    return caption.width <= max_width, caption.width
+
+
+def fit_fontsize(text: str, font_path: str, fontsize: int, max_width: int, min_fontsize: int, stroke_width: int) -> int:
+    """min_fontsize 以上で収まる最大のフォントサイズ（二分探索）。収まらなければ min_fontsize。"""
+    try:
+        return get_font_metrics().fit_font_size(
+            text, font_path, fontsize, max_width, min_fontsize=min_fontsize, stroke_width=stroke_width
+        )
+    except Exception as e:
+        logger.error(f"fit_fontsize error: {e}")
+        return min_fontsize
+
 
 def split_text_for_wrap(text: str) -> str:
     """テキストをスペース/句読点で改行。"""
@@ -113,9 +137,17 @@ def ensure_segments(section):
     section.on_screen_segments = [seg]
 
 
-def adjust_section(section, video_width: int, min_fontsize: int = 40, scale_factor: float = 0.85):
+def adjust_section(
+    section,
+    video_width: int,
+    min_fontsize: int = 40,
+    scale_factor: float = 0.85,
+    layout: Optional[SectionLayout] = None,
+):
     """
     セクションのテロップを3段階優先順位で調整し、複数回検証。
+
+    layout（LayoutPlan のセクション）があれば、初期判定はその計測結果を使う。
     
     戻り値: True なら変更あり、False なら変更なし
     """
@@ -156,7 +188,9 @@ def adjust_section(section, video_width: int, min_fontsize: int = 40, scale_fact
         
         # ===== 段階1: 初期判定 =====
         logger.debug(f"Segment: '{text[:30]}...' ({len(text)} chars)")
-        is_fit, max_line_width = verify_fit(current_text, font_path, current_fontsize, max_width, stroke_width)
+        is_fit, max_line_width = planned_fit(
+            layout, idx, current_text, font_path, current_fontsize, max_width, stroke_width
+        ) or verify_fit(current_text, font_path, current_fontsize, max_width, stroke_width)
         
         if is_fit:
             logger.debug(f"  ✅ No adjustment needed (width={max_line_width:.0f}px)")
@@ -169,14 +203,13 @@ def adjust_section(section, video_width: int, min_fontsize: int = 40, scale_fact
         # 優先順位1: フォントサイズ縮小
         logger.debug(f"  [P1] Trying font size reduction...")
         font_reduced = False
-        while current_fontsize > min_fontsize:
-            current_fontsize = max(min_fontsize, int(round(current_fontsize * 0.9)))
+        if current_fontsize > min_fontsize:
+            current_fontsize = fit_fontsize(current_text, font_path, current_fontsize, max_width, min_fontsize, stroke_width)
             is_fit, line_width = verify_fit(current_text, font_path, current_fontsize, max_width, stroke_width)
             if is_fit:
                 logger.info(f"    ✅ [P1] Font size reduced to {current_fontsize}pt (fit={line_width:.0f}px)")
                 changed = True
                 font_reduced = True
-                break
         
         if not font_reduced and current_fontsize == min_fontsize:
             # min_fontsize でもはみ出す
@@ -193,16 +226,13 @@ def adjust_section(section, video_width: int, min_fontsize: int = 40, scale_fact
             else:
                 # 改行 + フォント再縮小
                 logger.debug(f"  [P2+P1] Wrapped text still too long, retry font reduction...")
-                wrapped_fontsize = current_fontsize
-                while wrapped_fontsize > min_fontsize:
-                    wrapped_fontsize = max(min_fontsize, int(round(wrapped_fontsize * 0.9)))
-                    is_fit, _ = verify_fit(wrapped, font_path, wrapped_fontsize, max_width, stroke_width)
-                    if is_fit:
-                        current_text = wrapped
-                        current_fontsize = wrapped_fontsize
-                        logger.info(f"    ✅ [P2+P1] Wrapping + font reduced to {wrapped_fontsize}pt")
-                        changed = True
-                        break
+                wrapped_fontsize = fit_fontsize(wrapped, font_path, current_fontsize, max_width, min_fontsize, stroke_width)
+                is_fit, _ = verify_fit(wrapped, font_path, wrapped_fontsize, max_width, stroke_width)
+                if is_fit:
+                    current_text = wrapped
+                    current_fontsize = wrapped_fontsize
+                    logger.info(f"    ✅ [P2+P1] Wrapping + font reduced to {wrapped_fontsize}pt")
+                    changed = True
                 else:
                     # 優先順位3: スケーリング
                     logger.debug(f"  [P3] Trying scaling ({scale_factor}x)...")
@@ -238,7 +268,13 @@ def adjust_section(section, video_width: int, min_fontsize: int = 40, scale_fact
     
     return changed
 
-def adjust_script(script: ScriptModel):
+def adjust_script(script: ScriptModel, plan: Optional[LayoutPlan] = None):
+    """全セクションを調整する。plan が無ければレンダラーと共有の LayoutPlan を取得して計測を流用する。"""
+    if plan is None:
+        try:
+            plan = get_layout_plan(script)
+        except Exception as e:
+            logger.warning(f"LayoutPlan unavailable, measuring directly: {e}")
     video_width = getattr(script.video, "width", 1920) or 1920
     video_height = getattr(script.video, "height", 1080) or 1080
     short_mode = getattr(script.video, "short_mode", None)
@@ -253,7 +289,7 @@ def adjust_script(script: ScriptModel):
     
     changed_any = False
     for sec in script.sections:
-        changed_any = adjust_section(sec, actual_width) or changed_any
+        changed_any = adjust_section(sec, actual_width, layout=plan.section(sec.id) if plan else None) or changed_any
     return changed_any
 
 
@@ -34,6 +34,10 @@ try:
 except Exception:
     fetch_trend_ideas_via_llm = None
 
+from src.models import StrokeStyle, TextStyle  # noqa: E402
+from src.render.font_metrics import get_font_metrics  # noqa: E402
+from src.render.layout_plan import layout_text_block  # noqa: E402
+
 TOPIC_HISTORY_DEFAULT = PROJECT_ROOT / "work" / "topic_history.json"
 
 
@@ -193,7 +197,11 @@ def run_video_generation(script_path: Path, config_path: Optional[Path], adjust_
 
 
 def clear_audio_cache(work_dir: Path) -> None:
-    """Remove cached audio to avoid reuse across runs."""
+    """Remove per-run audio/video so nothing is reused across runs.
+
+    The shared narration cache (``work/tts_cache``) is kept: its entries are
+    keyed by text and voice, so a line repeated across videos is never stale.
+    """
     targets = [work_dir / "audio", work_dir / "video", work_dir / "tmp"]
     for target in targets:
         if target.exists():
@@ -216,20 +224,20 @@ THUMBNAIL_STROKE = "#050910"
 THUMBNAIL_FILL = "#FFD166"
 
 
-def _load_thumbnail_font(size: int):
+def _thumbnail_font_path(size: int) -> Optional[str]:
+    """First thumbnail font candidate FreeType can open (faces are cached by FontMetrics)."""
     if not ImageFont:
         return None
-    for candidate in THUMBNAIL_FONT_CANDIDATES:
+    metrics = get_font_metrics()
+    for candidate in [*THUMBNAIL_FONT_CANDIDATES, "ArialUnicode.ttf"]:
         if not candidate:
             continue
         try:
-            return ImageFont.truetype(candidate, size)
+            metrics.face(candidate, size)
+            return candidate
         except OSError:
             continue
-    try:
-        return ImageFont.truetype("ArialUnicode.ttf", size)
-    except OSError:
-        return ImageFont.load_default()
+    return None
 
 
 def generate_thumbnail_from_title(title: str) -> Optional[Path]:
@@ -238,29 +246,29 @@ def generate_thumbnail_from_title(title: str) -> Optional[Path]:
     try:
         img = Image.new("RGB", THUMBNAIL_SIZE, THUMBNAIL_BG)
         draw = ImageDraw.Draw(img)
-        font = _load_thumbnail_font(96)
-        if not font:
+        if not ImageFont:
             return None
+        font_path = _thumbnail_font_path(96)
         lines = textwrap.wrap(title.strip(), width=10) or [title.strip()]
-        bbox = font.getbbox("あ")
-        line_height = (bbox[3] - bbox[1]) + 10
-        total_height = len(lines) * line_height
-        y = max(40, (THUMBNAIL_SIZE[1] - total_height) // 2)
-        for line in lines:
-            if not line:
-                continue
-            text_bbox = draw.textbbox((0, 0), line, font=font, stroke_width=6)
-            line_width = text_bbox[2] - text_bbox[0]
-            x = max(40, (THUMBNAIL_SIZE[0] - line_width) // 2)
-            draw.text(
-                (x, y),
-                line,
-                font=font,
-                fill=THUMBNAIL_FILL,
-                stroke_width=6,
-                stroke_fill=THUMBNAIL_STROKE,
-            )
-            y += line_height
+        if font_path:
+            # Lines are rasterized through the caption text cache, which also records their size.
+            style = TextStyle(font=font_path, fontsize=96, fill=THUMBNAIL_FILL, stroke=StrokeStyle(color=THUMBNAIL_STROKE, width=6))
+            for caption in layout_text_block(lines, style, *THUMBNAIL_SIZE, line_gap_px=10, margin=40):
+                with Image.open(caption.image) as piece:
+                    layer = piece.convert("RGBA")
+                img.paste(layer, (caption.x, caption.y), layer)
+        else:
+            font = ImageFont.load_default()
+            bbox = font.getbbox("あ")
+            line_height = (bbox[3] - bbox[1]) + 10
+            y = max(40, (THUMBNAIL_SIZE[1] - len(lines) * line_height) // 2)
+            for line in lines:
+                if not line:
+                    continue
+                text_bbox = draw.textbbox((0, 0), line, font=font, stroke_width=6)
+                x = max(40, (THUMBNAIL_SIZE[0] - (text_bbox[2] - text_bbox[0])) // 2)
+                draw.text((x, y), line, font=font, fill=THUMBNAIL_FILL, stroke_width=6, stroke_fill=THUMBNAIL_STROKE)
+                y += line_height
         with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
             img.save(tmp.name, format="PNG")
             return Path(tmp.name)
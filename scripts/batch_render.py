@@ -2,10 +2,19 @@
 from __future__ import annotations
 
 import argparse
-import subprocess
+import hashlib
+import json
 import sys
 from pathlib import Path
-from typing import List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.batch import build_render_jobs, plan_workers, run_batch  # noqa: E402
+from src.script_io import load_config  # noqa: E402
+
+BATCH_LOG_DIR = PROJECT_ROOT / "logs" / "batch"
 
 
 def main() -> None:
@@ -17,20 +26,55 @@ def main() -> None:
         default="python scripts/generate_video.py",
         help="Render command to invoke per script",
     )
+    parser.add_argument("--workers", type=int, help="同時レンダリング数（未指定時は CPU/メモリ予算から算出）")
+    parser.add_argument("--threads-per-job", type=int, default=4, help="1 ジョブあたりの ffmpeg スレッド数")
+    parser.add_argument("--memory-per-job-gb", type=float, default=3.0, help="1 ジョブあたりの想定ピークメモリ (GB)")
+    parser.add_argument("--retries", type=int, default=1, help="失敗したジョブの再試行回数")
+    parser.add_argument("--fail-fast", action="store_true", help="最初の失敗で残りのジョブを開始しない")
+    parser.add_argument("--state", type=Path, help="ジョブ状態ファイル（中断後の再開に使用）")
+    parser.add_argument("--summary", type=Path, help="JSON サマリーの出力先")
+    parser.add_argument("--restart", action="store_true", help="状態ファイルを無視して全ジョブを最初から実行する")
     args = parser.parse_args()
 
-    scripts = list(Path(".").glob(args.glob))
+    scripts = sorted(Path(".").glob(args.glob))
     if not scripts:
         print("No scripts matched glob pattern.", file=sys.stderr)
         sys.exit(1)
 
-    for script_path in scripts:
-        command: List[str] = args.command.split()
-        command.extend(["--script", str(script_path)])
-        if args.config:
-            command.extend(["--config", str(args.config)])
-        print(f"[Batch] Running {' '.join(command)}")
-        subprocess.run(command, check=True)
+    batch_id = hashlib.sha1(args.glob.encode("utf-8")).hexdigest()[:8]
+    batch_dir = BATCH_LOG_DIR / batch_id
+    state_path = args.state or batch_dir / "state.json"
+    summary_path = args.summary or batch_dir / "summary.json"
+    if args.restart and state_path.exists():
+        state_path.unlink()
+
+    jobs = build_render_jobs(
+        scripts,
+        args.command,
+        work_root=load_config(args.config).work_dir / "batch" / batch_id,
+        config_path=args.config,
+        threads_per_job=args.threads_per_job,
+    )
+
+    workers = args.workers or plan_workers(args.threads_per_job, args.memory_per_job_gb)
+    workers = min(workers, len(jobs))
+    print(f"[Batch] {len(jobs)} job(s), {workers} worker(s), {args.threads_per_job} thread(s) per job")
+
+    summary = run_batch(
+        jobs,
+        state_path=state_path,
+        log_dir=batch_dir / "jobs",
+        workers=workers,
+        threads_per_job=args.threads_per_job,
+        retries=max(args.retries, 0),
+        continue_on_error=not args.fail_fast,
+    )
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[Batch] Summary: {summary_path}")
+    if summary.failed:
+        print(f"[Batch] {len(summary.failed)} job(s) did not finish: {', '.join(job.id for job in summary.failed)}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import time
 from pathlib import Path
 import sys
 
@@ -9,7 +10,10 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.audio.voicevox_client import VoicevoxClient, VoicevoxError
+from src.audio.engine_pool import EnginePool
+from src.audio.synthesis import print_result, section_audio_jobs, summarize, synthesize_sections
+from src.audio.tts_cache import tts_cache_for
+from src.audio.voicevox_client import VoicevoxError
 from src.script_io import load_config, load_script
 
 
@@ -25,21 +29,29 @@ def main() -> None:
     work_audio_dir = config.work_dir / "audio"
     work_audio_dir.mkdir(parents=True, exist_ok=True)
 
-    client = VoicevoxClient(
-        base_url=config.voicevox_endpoint,
-        timeout_sec=config.timeout_sec,
-        retries=config.retries,
-    )
-
-    for idx, section in enumerate(script.sections, start=1):
-        text = section.narration.strip()
-        if not text:
-            continue
-        wav_bytes = client.synthesize(text, script.voice)
-        out_path = work_audio_dir / f"{idx:02d}_{section.id}.wav"
-        out_path.write_bytes(wav_bytes)
-        print(f"[OK] {out_path}")
-
+    jobs = section_audio_jobs(script, work_audio_dir)
+    client = EnginePool.from_config(config)
+    if jobs and not client.warm_up(script.voice.speaker_id):
+        print("[WARN] No VOICEVOX engine answered the warm-up; synthesis will retry")
+
+    started = time.perf_counter()
+    try:
+        results = synthesize_sections(
+            client,
+            jobs,
+            script.voice,
+            concurrency=config.voicevox_concurrency,
+            cache=tts_cache_for(config),
+            sentence_gap_msec=config.get_sentence_gap_msec(),
+            on_result=print_result,
+        )
+    except VoicevoxError as err:
+        raise SystemExit(f"[ERROR] VOICEVOX synthesis failed for {err}") from err
+    finally:
+        client.close()
+    if len(client.nodes) > 1:
+        print("\n".join(client.describe()))
+    print(summarize(results, time.perf_counter() - started))
     print("All sections processed.")
 
 
@@ -6,7 +6,10 @@ import json
 import subprocess
 import sys
 import os
+import threading
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
@@ -25,14 +28,26 @@ from src.assets import (
     PixabayClient,
     StableDiffusionClient,
 )  # noqa: E402
-from src.audio.voicevox_client import VoicevoxClient, VoicevoxError  # noqa: E402
+from src.audio.engine_pool import EnginePool  # noqa: E402
+from src.audio.synthesis import print_result, section_audio_jobs, summarize, synthesize_sections  # noqa: E402
+from src.audio.tts_cache import tts_cache_for  # noqa: E402
+from src.audio.voicevox_client import VoicevoxError  # noqa: E402
 from src.models import BGMAudio  # noqa: E402
 from src.outputs import write_metadata, write_srt  # noqa: E402
+from src.render.audio_stage import AudioStageError, build_mux_command, plan_audio_track, run_audio_track  # noqa: E402
+from src.render.bg_normalize import normalize_backgrounds  # noqa: E402
 from src.render.ffmpeg_runner import build_ffmpeg_command  # noqa: E402
+from src.render.preview_stream import PLAYLIST_NAME, build_preview_stream_command, stream_dir_for  # noqa: E402
+from src.render.progress import PROGRESS_EVENT, emit_progress, run_with_progress  # noqa: E402
+from src.render.segments import SegmentRenderError, render_segments  # noqa: E402
+from src.render.text_cache import configure_text_cache  # noqa: E402
 from src.script_io import load_config, load_script  # noqa: E402
+from src.stages import Stage, StageTimeout, run_stages  # noqa: E402
 from src.timeline import build_timeline  # noqa: E402
+from src.timing import Timings, activate, append_render_log, span  # noqa: E402
 
 SETTINGS_PATH = PROJECT_ROOT / "settings" / "ai_settings.json"
+RENDER_LOG_PATH = PROJECT_ROOT / "logs" / "render_log.jsonl"
 
 
 def load_saved_settings() -> dict:
@@ -45,6 +60,13 @@ def load_saved_settings() -> dict:
         return {}
 
 
+def read_version() -> str | None:
+    try:
+        return (PROJECT_ROOT / "VERSION").read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
 def resolve_bgm_directory(settings: dict) -> Path:
     raw = os.getenv("BGM_DIRECTORY") or settings.get("bgmDirectory") or ""
     raw = raw.strip()
@@ -73,6 +95,49 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--skip-audio", action="store_true", help="既存 WAV を再利用し、VOICEVOX 合成をスキップ")
     parser.add_argument("--force-audio", action="store_true", help="既存 WAV があっても再生成する")
     parser.add_argument("--dry-run", action="store_true", help="ffmpeg を実行せずにコマンドのみ表示する")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="2 以上を指定するとセクション単位で並列エンコードし、-c copy で結合します（1 は従来の単一グラフ）。",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        help="ffmpeg が使うスレッド数の上限（並列ワーカー全体で共有）。未指定時は ffmpeg/CPU 数に任せる。",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        help="中間ファイル（音声・セグメント等）の作業ディレクトリ。config の work_dir を上書きします（並列バッチ用）。TTS キャッシュは共有のままです。",
+    )
+    parser.add_argument(
+        "--no-section-cache",
+        dest="section_cache",
+        action="store_false",
+        help="セクション単位レンダリング時に outputs/cache/sections のクリップを再利用しない。",
+    )
+    parser.add_argument(
+        "--no-audio-stage",
+        dest="audio_stage",
+        action="store_false",
+        help="音声（ナレーション/BGM ミックス）を映像と同じ ffmpeg グラフで処理する（キャッシュ済み AAC を使わない）。",
+    )
+    parser.add_argument(
+        "--no-bg-normalize",
+        dest="bg_normalize",
+        action="store_false",
+        help="背景素材を出力解像度/fps に事前変換せず、毎回フィルタでスケーリングする。",
+    )
+    parser.add_argument(
+        "--profile",
+        help="レンダリングプロファイル名（draft / preview / final など。ConfigModel.render_profiles で定義）。未指定時は config の render_profile。",
+    )
+    parser.add_argument(
+        "--preview-stream",
+        action="store_true",
+        help="低解像度プロキシ（既定 proxy プロファイル）を HLS (fMP4) で outputs/previews/<名前>_stream/ に書き出す。エンコード中から再生可能。",
+    )
     parser.add_argument(
         "--clear-audio-cache",
         action="store_true",
@@ -386,49 +451,201 @@ def ensure_audio(
     *,
     skip_audio: bool,
     force_audio: bool,
+    cancel: threading.Event | None = None,
 ) -> Path:
     audio_dir = config.work_dir / "audio"
     audio_dir.mkdir(parents=True, exist_ok=True)
     if skip_audio:
         return audio_dir
 
-    client = VoicevoxClient(
-        base_url=config.voicevox_endpoint,
-        timeout_sec=config.timeout_sec,
-        retries=config.retries,
-    )
+    jobs = section_audio_jobs(script, audio_dir)
+    client = EnginePool.from_config(config)
+    if jobs and not client.warm_up(script.voice.speaker_id):
+        print("[WARN] No VOICEVOX engine answered the warm-up; synthesis will retry")
 
-    for idx, section in enumerate(script.sections, start=1):
-        text = (section.narration or "").strip()
-        if not text:
-            continue
-        out_path = audio_dir / f"{idx:02d}_{section.id}.wav"
-        if out_path.exists() and not force_audio:
-            print(f"[SKIP] {out_path.name} (exists)")
-            continue
-        try:
-            wav_bytes = client.synthesize(text, script.voice)
-        except VoicevoxError as err:
-            raise SystemExit(f"[ERROR] VOICEVOX synthesis failed for section {section.id}: {err}") from err
-        out_path.write_bytes(wav_bytes)
-        print(f"[OK] {out_path}")
+    started = time.perf_counter()
+    try:
+        results = synthesize_sections(
+            client,
+            jobs,
+            script.voice,
+            concurrency=config.voicevox_concurrency,
+            force=force_audio,
+            cache=tts_cache_for(config),
+            sentence_gap_msec=config.get_sentence_gap_msec(),
+            cancel=cancel,
+            on_result=print_result,
+        )
+    except VoicevoxError as err:
+        raise SystemExit(f"[ERROR] VOICEVOX synthesis failed for {err}") from err
+    finally:
+        client.close()
+    if len(client.nodes) > 1:
+        print("\n".join(client.describe()))
+    if jobs:
+        print(summarize(results, time.perf_counter() - started))
     return audio_dir
 
 
-def run_ffmpeg(command: list[str], dry_run: bool) -> None:
+def run_ffmpeg(command: list[str], dry_run: bool, total_duration: float | None = None) -> None:
     cmd_str = " ".join(command)
     print(f"[FFmpeg] {cmd_str}")
     if dry_run:
         print("[DRY RUN] ffmpeg command was not executed.")
         return
     try:
-        subprocess.run(command, check=True)
+        if total_duration:
+            # JSON-lines progress on stdout for the desktop app and scheduler.
+            run_with_progress(command, total_duration)
+        else:
+            subprocess.run(command, check=True)
     except subprocess.CalledProcessError as err:
         raise SystemExit(f"[ERROR] ffmpeg failed with exit code {err.returncode}") from err
 
 
+def render_video(
+    args: argparse.Namespace,
+    script,
+    timeline,
+    audio_dir: Path,
+    output_path: Path,
+    config,
+    profile,
+    backgrounds: dict,
+) -> List[List[str]]:
+    """Render ``output_path`` (segment-parallel or single graph) and return the ffmpeg commands used."""
+    ffmpeg_cmds: List[List[str]] = []
+    if args.workers > 1 and len(timeline.sections) > 1:
+        try:
+            segment_result = render_segments(
+                script,
+                timeline,
+                output_path,
+                work_dir=config.work_dir,
+                ffmpeg_path=config.ffmpeg_path,
+                workers=args.workers,
+                dry_run=args.dry_run,
+                use_cache=args.section_cache,
+                profile=profile,
+                backgrounds=backgrounds,
+                on_progress=emit_progress,
+                audio_stage=args.audio_stage,
+                thread_budget=args.threads,
+                cache_max_bytes=config.section_cache_max_mb * 1024 * 1024,
+            )
+            ffmpeg_cmds = segment_result.commands
+            for command in ffmpeg_cmds:
+                print(f"[FFmpeg] {' '.join(command)}")
+            reused = len(segment_result.cache_hits)
+            print(
+                f"[INFO] Rendered {len(segment_result.clip_paths) - reused} sections with {args.workers} workers "
+                f"({reused} reused from cache)."
+            )
+        except SegmentRenderError as err:
+            print(f"[WARN] Segment-parallel render failed, falling back to single graph: {err}")
+            ffmpeg_cmds = []
+    if not ffmpeg_cmds:
+        audio_plan = None
+        if args.audio_stage:
+            audio_plan = plan_audio_track(script, timeline, ffmpeg_path=config.ffmpeg_path, profile=profile)
+        # With the audio stage the graph renders video only and the track is muxed in afterwards.
+        video_path = config.work_dir / "ffmpeg" / f"{output_path.stem}.video.mp4" if audio_plan else output_path
+        video_path.parent.mkdir(parents=True, exist_ok=True)
+        input_stats: dict = {}
+        with span("render.graph"):
+            ffmpeg_cmd = build_ffmpeg_command(
+                script=script,
+                timeline=timeline,
+                audio_dir=audio_dir,
+                output_path=video_path,
+                ffmpeg_path=config.ffmpeg_path,
+                input_stats=input_stats,
+                profile=profile,
+                backgrounds=backgrounds,
+                filter_script_path=config.work_dir / "ffmpeg" / f"{output_path.stem}.filtergraph",
+                include_audio=audio_plan is None,
+                threads=args.threads,
+            )
+        if input_stats.get("inputs_saved"):
+            print(
+                f"[INFO] ffmpeg inputs deduplicated: {input_stats['inputs_opened']}/{input_stats['inputs_requested']} opened "
+                f"(saved {input_stats['inputs_saved']} inputs, {input_stats['decoders_saved']} decoders)"
+            )
+        if audio_plan is None:
+            with span("render.encode"):
+                run_ffmpeg(ffmpeg_cmd, args.dry_run, total_duration=timeline.total_duration)
+            ffmpeg_cmds = [ffmpeg_cmd]
+        else:
+            mux_cmd = build_mux_command(video_path, audio_plan.path, output_path, ffmpeg_path=config.ffmpeg_path)
+            if audio_plan.cached:
+                print(f"[INFO] 音声トラックはキャッシュを再利用します: {audio_plan.path.name}")
+            else:
+                print(f"[FFmpeg] {' '.join(audio_plan.command)}")
+            def encode_audio() -> Path:
+                with span("audio.encode"):
+                    return run_audio_track(audio_plan)
+
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                audio_future = None if args.dry_run else pool.submit(encode_audio)
+                with span("render.encode"):
+                    run_ffmpeg(ffmpeg_cmd, args.dry_run, total_duration=timeline.total_duration)
+                if audio_future is not None:
+                    try:
+                        audio_future.result()
+                    except AudioStageError as err:
+                        raise SystemExit(f"[ERROR] {err}") from err
+            with span("render.mux"):
+                run_ffmpeg(mux_cmd, args.dry_run)
+            if not args.dry_run:
+                video_path.unlink(missing_ok=True)
+            ffmpeg_cmds = ([] if audio_plan.cached else [audio_plan.command]) + [ffmpeg_cmd, mux_cmd]
+    return ffmpeg_cmds
+
+
+def render_preview_stream(
+    args: argparse.Namespace,
+    script,
+    timeline,
+    audio_dir: Path,
+    output_path: Path,
+    config,
+    profile,
+    backgrounds: dict,
+) -> Path:
+    """Encode the proxy stream and announce its playlist before the encode starts."""
+    stream_dir = stream_dir_for(config.outputs_dir.parent / "previews", output_path)
+    with span("render.graph"):
+        command = build_preview_stream_command(
+            script,
+            timeline,
+            audio_dir,
+            stream_dir,
+            ffmpeg_path=config.ffmpeg_path,
+            profile=profile,
+            backgrounds=backgrounds,
+            threads=args.threads,
+        )
+    playlist = (stream_dir / PLAYLIST_NAME).resolve()
+    # The desktop app starts polling the playlist on this event; segments follow as they are encoded.
+    emit_progress(
+        {
+            "event": PROGRESS_EVENT,
+            "stage": "preview_stream",
+            "status": "start",
+            "playlist": str(playlist),
+            "total_sec": round(timeline.total_duration, 2),
+        }
+    )
+    with span("render.encode"):
+        run_ffmpeg(command, args.dry_run, total_duration=timeline.total_duration)
+    print(f"[OK] Preview stream: {playlist}")
+    return playlist
+
+
 def main() -> None:
     args = parse_args()
+    timings = Timings()
+    activate(timings)
     script = load_script(args.script)
     adjusted_yaml: Path | None = None
     
@@ -458,7 +675,8 @@ def main() -> None:
         from scripts.adjust_tickers import adjust_script
 
         script_copy = deepcopy(script)
-        changed = adjust_script(script_copy)
+        with span("ticker_adjust"):
+            changed = adjust_script(script_copy)
         if changed:
             print("[INFO] テロップ幅を自動調整しました（レンダリングに反映されます）。")
             # Save adjusted script back to YAML to persist changes
@@ -471,6 +689,16 @@ def main() -> None:
                 print(f"[WARN] 調整後のスクリプトの保存に失敗: {e}")
         script = script_copy
     config = load_config(args.config)
+    if args.work_dir:
+        # Keep the content-addressed TTS cache shared across work dirs.
+        config = config.model_copy(update={"work_dir": args.work_dir, "tts_cache_dir": config.get_tts_cache_dir()})
+    configure_text_cache(config.text_cache_max_mb * 1024 * 1024)
+    profile_name = args.profile or ("proxy" if args.preview_stream else None)
+    try:
+        profile = config.get_render_profile(profile_name)
+    except ValueError as err:
+        raise SystemExit(f"[ERROR] {err}") from err
+    print(f"[INFO] Render profile: {profile_name or config.render_profile}")
     if args.clear_audio_cache:
         try:
             audio_dir = config.work_dir / "audio"
@@ -482,17 +710,38 @@ def main() -> None:
         except Exception as err:
             print(f"[WARN] Failed to clear audio cache: {err}")
 
-    bg_asset = ensure_background_assets(script)
-    ensure_bgm_track(script)
-
-    audio_dir = ensure_audio(
-        script,
-        config,
-        skip_audio=args.skip_audio,
-        force_audio=args.force_audio,
-    )
-
-    timeline = build_timeline(script, audio_dir)
+    # These stages touch disjoint parts of the script (backgrounds, bgm,
+    # narration audio), so their network and engine waits can overlap.
+    cancel = threading.Event()
+    timeout = config.prerender_timeout_sec
+    try:
+        with span("prerender"):
+            report = run_stages(
+                [
+                    Stage("backgrounds", lambda: ensure_background_assets(script), timeout),
+                    Stage("bgm", lambda: ensure_bgm_track(script), timeout),
+                    Stage(
+                        "voicevox",
+                        lambda: ensure_audio(
+                            script,
+                            config,
+                            skip_audio=args.skip_audio,
+                            force_audio=args.force_audio,
+                            cancel=cancel,
+                        ),
+                        timeout,
+                    ),
+                ],
+                cancel=cancel,
+            )
+    except StageTimeout as err:
+        raise SystemExit(f"[ERROR] {err}") from err
+    print(report.describe())
+    bg_asset = report.results["backgrounds"]
+    audio_dir = report.results["voicevox"]
+
+    with span("timeline"):
+        timeline = build_timeline(script, audio_dir)
     print(f"[INFO] Total duration: {timeline.total_duration:.2f}s across {len(timeline.sections)} sections.")
 
     # Re-confirm short mode with actual timeline duration (for auto mode)
@@ -508,86 +757,138 @@ def main() -> None:
     config.outputs_dir.mkdir(parents=True, exist_ok=True)
     output_path = config.outputs_dir / script.output.filename
 
-    ffmpeg_cmd = build_ffmpeg_command(
-        script=script,
-        timeline=timeline,
-        audio_dir=audio_dir,
-        output_path=output_path,
-        ffmpeg_path=config.ffmpeg_path,
-    )
-    run_ffmpeg(ffmpeg_cmd, args.dry_run)
+    backgrounds: dict = {}
+    if args.bg_normalize and not args.dry_run:
+        with span("bg_normalize"):
+            backgrounds = normalize_backgrounds(
+                script,
+                profile=profile,
+                ffmpeg_path=config.ffmpeg_path,
+                workers=max(args.workers, 1),
+                cache_max_bytes=config.normalized_cache_max_mb * 1024 * 1024,
+            )
+
+    if args.preview_stream:
+        render_preview_stream(args, script, timeline, audio_dir, output_path, config, profile, backgrounds)
+        activate(None)
+        return
+
+    with span("render"):
+        ffmpeg_cmds = render_video(args, script, timeline, audio_dir, output_path, config, profile, backgrounds)
 
     if script.output.srt:
         srt_path = output_path.with_suffix(".srt")
-        write_srt(timeline, srt_path)
+        with span("srt"):
+            write_srt(timeline, srt_path)
         print(f"[OK] SRT: {srt_path}")
 
+    run_dir: Path | None = None
+    with span("cache_export"):
+        try:
+            ts = datetime.now().strftime("%Y%m%d%H%M%S")
+            run_dir = config.outputs_dir / f"{script.project}-{ts}"
+            (run_dir / "text").mkdir(parents=True, exist_ok=True)
+            (run_dir / "frames").mkdir(parents=True, exist_ok=True)
+            (run_dir / "ffmpeg").mkdir(parents=True, exist_ok=True)
+
+            # Save ffmpeg command(s) used, one per line
+            (run_dir / "ffmpeg" / "command.txt").write_text(
+                "\n".join(" ".join(command) for command in ffmpeg_cmds), encoding="utf-8"
+            )
+            for command in ffmpeg_cmds:
+                if "-filter_complex_script" in command:
+                    graph_file = Path(command[command.index("-filter_complex_script") + 1])
+                    if graph_file.exists():
+                        shutil.copy2(graph_file, run_dir / "ffmpeg" / graph_file.name)
+
+            # Copy SRT into the run directory
+            srt_path = output_path.with_suffix(".srt")
+            if srt_path.exists():
+                try:
+                    shutil.copy2(srt_path, run_dir / srt_path.name)
+                except Exception:
+                    pass
+
+            # Copy adjusted YAML if it exists
+            if adjusted_yaml and adjusted_yaml.exists():
+                try:
+                    shutil.copy2(adjusted_yaml, run_dir / adjusted_yaml.name)
+                except Exception:
+                    pass
+
+            # Copy text PNGs referenced by ffmpeg into run_dir/text and save all inputs manifest
+            inputs_manifest: List[str] = []
+            for ffmpeg_cmd in ffmpeg_cmds:
+                for i, token in enumerate(ffmpeg_cmd):
+                    if token != "-i" or i + 1 >= len(ffmpeg_cmd):
+                        continue
+                    src = Path(ffmpeg_cmd[i + 1])
+                    if str(src) in inputs_manifest:
+                        continue
+                    inputs_manifest.append(str(src))
+                    if src.name.startswith(("text_", "layer_")) and src.suffix.lower() == ".png" and src.exists():
+                        try:
+                            shutil.copy2(src, run_dir / "text" / src.name)
+                        except Exception:
+                            pass
+            (run_dir / "inputs_manifest.txt").write_text("\n".join(inputs_manifest), encoding="utf-8")
+
+            # Copy debug frames if present
+            dbg_dir = Path("outputs/debug_frames")
+            if dbg_dir.exists():
+                for png in dbg_dir.glob("*.png"):
+                    try:
+                        shutil.copy2(png, run_dir / "frames" / png.name)
+                    except Exception:
+                        pass
+
+            print(f"[OK] Render cache exported to {run_dir}")
+        except Exception as err:
+            print(f"[WARN] Render cache export failed: {err}")
+
+    # Written last so the timings cover every stage, cache export included.
     metadata_path = output_path.with_suffix(".json")
     text_cache_dir = config.outputs_dir / "cache" / "text"
+    activate(None)
+    timing_report = timings.to_dict()
     write_metadata(
         script,
         timeline,
         metadata_path,
         background_asset=bg_asset,
         text_cache_dir=text_cache_dir if text_cache_dir.exists() else None,
+        timings=timing_report,
     )
     print(f"[OK] Metadata: {metadata_path}")
-
-    # Export per-render cache bundle under outputs/rendered/<project>-<timestamp>
-    try:
-        ts = datetime.now().strftime("%Y%m%d%H%M%S")
-        run_dir = config.outputs_dir / f"{script.project}-{ts}"
-        (run_dir / "text").mkdir(parents=True, exist_ok=True)
-        (run_dir / "frames").mkdir(parents=True, exist_ok=True)
-        (run_dir / "ffmpeg").mkdir(parents=True, exist_ok=True)
-
-        # Save ffmpeg command used
-        (run_dir / "ffmpeg" / "command.txt").write_text(" ".join(ffmpeg_cmd), encoding="utf-8")
-
-        # Copy metadata and SRT into the run directory
+    if run_dir is not None and run_dir.exists():
         try:
             shutil.copy2(metadata_path, run_dir / "metadata.json")
         except Exception:
             pass
-        srt_path = output_path.with_suffix(".srt")
-        if srt_path.exists():
-            try:
-                shutil.copy2(srt_path, run_dir / srt_path.name)
-            except Exception:
-                pass
-
-        # Copy adjusted YAML if it exists
-        if adjusted_yaml and adjusted_yaml.exists():
-            try:
-                shutil.copy2(adjusted_yaml, run_dir / adjusted_yaml.name)
-            except Exception:
-                pass
-
-        # Copy text PNGs referenced by ffmpeg into run_dir/text and save all inputs manifest
-        inputs_manifest: List[str] = []
-        for i, token in enumerate(ffmpeg_cmd):
-            if token == "-i" and i + 1 < len(ffmpeg_cmd):
-                src = Path(ffmpeg_cmd[i + 1])
-                inputs_manifest.append(str(src))
-                if src.name.startswith("text_") and src.suffix.lower() == ".png" and src.exists():
-                    try:
-                        shutil.copy2(src, run_dir / "text" / src.name)
-                    except Exception:
-                        pass
-        (run_dir / "inputs_manifest.txt").write_text("\n".join(inputs_manifest), encoding="utf-8")
-
-        # Copy debug frames if present
-        dbg_dir = Path("outputs/debug_frames")
-        if dbg_dir.exists():
-            for png in dbg_dir.glob("*.png"):
-                try:
-                    shutil.copy2(png, run_dir / "frames" / png.name)
-                except Exception:
-                    pass
 
-        print(f"[OK] Render cache exported to {run_dir}")
-    except Exception as err:
-        print(f"[WARN] Render cache export failed: {err}")
+    try:
+        append_render_log(
+            RENDER_LOG_PATH,
+            {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "version": read_version(),
+                "script": str(args.script),
+                "output": str(output_path),
+                "profile": args.profile or config.render_profile,
+                "workers": args.workers,
+                "dry_run": args.dry_run,
+                "sections": len(timeline.sections),
+                "duration_sec": timeline.total_duration,
+                "timings": timing_report,
+            },
+        )
+    except OSError as err:
+        print(f"[WARN] Render log write failed: {err}")
+    slowest = sorted(timing_report["stages"], key=lambda stage: stage["duration_sec"], reverse=True)[:3]
+    print(
+        f"[INFO] Total {timing_report['total_sec']:.1f}s; slowest stages: "
+        + ", ".join(f"{stage['name']} {stage['duration_sec']:.1f}s" for stage in slowest)
+    )
 
     print(f"[DONE] Video written to {output_path}")
 
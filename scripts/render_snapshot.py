@@ -1,59 +1,108 @@
 """
-Render a single-frame preview (PNG) from a YAML script using the same FFmpeg pipeline.
+Render a single-frame preview (PNG) from a YAML script.
 
 Usage:
   python scripts/render_snapshot.py --script outputs/rendered/foo.yaml --output outputs/previews/foo.png
+  python scripts/render_snapshot.py --script foo.yaml --section-index 2 --json
 
 Notes:
   - 音声生成は行わず、既存の work/audio を利用します。
-  - 背景/BGM の自動取得は generate_video と同じルールで ensure_background_assets/ensure_bgm_track を呼びます。
-  - ffmpeg 実行は -frames:v 1 で 1 フレームのみ書き出します。
+  - 背景の自動取得は generate_video と同じルールで ensure_background_assets を呼びます。
+  - 既定では該当セクションの背景 1 フレームだけを ffmpeg の高速シークで取り出し、
+    テロップ（LayoutPlan のキャッシュ済みレイヤー）・オーバーレイ・透かしを Pillow で合成します。
+  - --full を付けると従来どおり全入力のフィルタグラフを -frames:v 1 で実行します。
 """
 
 import argparse
-import os
+import contextlib
+import json
+import subprocess
+import sys
+import time
 from pathlib import Path
 
-from scripts.generate_video import (
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_video import (  # noqa: E402
     ensure_background_assets,
-    ensure_bgm_track,
     ensure_audio,
     build_timeline,
     build_ffmpeg_command,
+    load_config,
     load_script,
     write_metadata,
 )
+from src.render.snapshot import render_frame, section_at  # noqa: E402
 
 
-def render_snapshot(script_path: Path, output_path: Path, ffmpeg_path: str = "ffmpeg"):
+def render_snapshot(
+    script_path: Path,
+    output_path: Path,
+    ffmpeg_path: str = "ffmpeg",
+    *,
+    config_path: Path | None = None,
+    time_sec: float | None = None,
+    section_index: int | None = None,
+    profile_name: str | None = None,
+    full: bool = False,
+) -> dict:
+    started = time.perf_counter()
     script = load_script(script_path)
+    config = load_config(config_path)
+    profile = config.get_render_profile(profile_name) if profile_name else None
     bg_asset = ensure_background_assets(script)
-    ensure_bgm_track(script)
-    audio_dir = ensure_audio(script, skip_audio=True, force_audio=False)
+    audio_dir = ensure_audio(script, config, skip_audio=True, force_audio=False)
     timeline = build_timeline(script, audio_dir)
 
+    if section_index is not None and timeline.sections:
+        section_tl = timeline.sections[max(0, min(section_index, len(timeline.sections) - 1))]
+        # Middle of the section: past any fade-in, and clear of the credits at the very end.
+        time_sec = section_tl.start_sec + max(section_tl.duration_sec, 0.1) / 2
+    if time_sec is None:
+        time_sec = script.output.thumbnail_time_sec
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    ffmpeg_cmd = build_ffmpeg_command(
-        script=script,
-        timeline=timeline,
-        audio_dir=audio_dir,
-        output_path=output_path,
-        ffmpeg_path=ffmpeg_path,
-    )
-    # 1フレームだけ書き出す
-    ffmpeg_cmd.extend(["-frames:v", "1", "-an"])
-    print("[FFmpeg]", " ".join(ffmpeg_cmd))
-    os.system(" ".join(ffmpeg_cmd))
+    if full:
+        ffmpeg_cmd = build_ffmpeg_command(
+            script=script,
+            timeline=timeline,
+            audio_dir=audio_dir,
+            output_path=output_path,
+            ffmpeg_path=ffmpeg_path,
+            profile=profile,
+            include_audio=False,
+        )
+        # 出力オプションは出力パスの前に置く（-ss で指定時刻のフレームを 1 枚だけ書き出す）
+        ffmpeg_cmd[-1:-1] = ["-ss", f"{time_sec:.3f}", "-frames:v", "1"]
+        print("[FFmpeg]", " ".join(ffmpeg_cmd))
+        subprocess.run(ffmpeg_cmd, check=True)
+    else:
+        frame = render_frame(script, timeline, time_sec, profile=profile, ffmpeg_path=ffmpeg_path)
+        frame.save(output_path, format="PNG")
 
     metadata_path = output_path.with_suffix(".json")
     write_metadata(script, timeline, metadata_path, background_asset=bg_asset)
-    print(f"[DONE] Snapshot written to {output_path}")
+    _, section_tl, _ = section_at(timeline, time_sec)
+    return {
+        "path": str(output_path),
+        "time": round(time_sec, 3),
+        "section": section_tl.id,
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+    }
 
 
 def main():
     parser = argparse.ArgumentParser(description="Render single-frame snapshot from YAML script.")
     parser.add_argument("--script", required=True, help="YAML script path")
     parser.add_argument("--output", required=False, help="PNG output path")
+    parser.add_argument("--config", type=Path, help="オプションの ConfigModel (JSON/YAML)")
+    parser.add_argument("--time", type=float, help="書き出す時刻（秒）。未指定時は output.thumbnail_time_sec")
+    parser.add_argument("--section-index", type=int, help="指定セクションの中央のフレームを書き出す（0 始まり、--time より優先）")
+    parser.add_argument("--profile", help="レンダリングプロファイル名（preview など）。解像度を合わせます")
+    parser.add_argument("--full", action="store_true", help="Pillow 合成ではなく完全な ffmpeg グラフで 1 フレーム書き出す")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で標準出力に書く（デスクトップアプリ用）")
     parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg binary path")
     args = parser.parse_args()
 
@@ -68,7 +117,22 @@ def main():
         previews_dir.mkdir(parents=True, exist_ok=True)
         output_path = previews_dir / f"{script_path.stem}_preview.png"
 
-    render_snapshot(script_path, output_path, ffmpeg_path=args.ffmpeg)
+    # --json の標準出力は結果 1 行だけにする（途中のログは stderr へ）
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        result = render_snapshot(
+            script_path,
+            output_path,
+            ffmpeg_path=args.ffmpeg,
+            config_path=args.config,
+            time_sec=args.time,
+            section_index=args.section_index,
+            profile_name=args.profile,
+            full=args.full,
+        )
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(f"[DONE] Snapshot written to {output_path} ({result['elapsed_sec']:.2f}s, section {result['section']})")
 
 
 if __name__ == "__main__":
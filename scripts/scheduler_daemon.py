@@ -18,6 +18,11 @@ AI_SETTINGS_FILE = SETTINGS_DIR / "ai_settings.json"
 AUTO_TREND_SCRIPT = PROJECT_ROOT / "scripts" / "auto_trend_pipeline.py"
 SCHED_LOG_DIR = PROJECT_ROOT / "logs" / "scheduler"
 
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.render.progress import parse_progress_event  # noqa: E402
+
 
 def load_json(path: Path) -> dict | list | None:
     if not path.exists():
@@ -115,19 +120,39 @@ def build_task_command(task: dict, ai_settings: dict) -> List[str]:
     return args
 
 
+def format_progress(event: dict) -> str:
+    percent = event.get("percent")
+    eta = event.get("eta_sec")
+    speed = event.get("speed")
+    parts = [f"[PROGRESS] {event.get('stage', 'render')}"]
+    parts.append(f"{percent:.1f}%" if isinstance(percent, (int, float)) else "--%")
+    if isinstance(speed, (int, float)):
+        parts.append(f"speed={speed:.2f}x")
+    if isinstance(eta, (int, float)):
+        parts.append(f"ETA {int(eta)}s")
+    return " ".join(parts)
+
+
 def run_task(task: dict, ai_settings: dict) -> Path:
     SCHED_LOG_DIR.mkdir(parents=True, exist_ok=True)
     timestamp = dt.datetime.utcnow().isoformat(timespec="seconds").replace(":", "-")
     log_path = SCHED_LOG_DIR / f"{task.get('id', 'task')}-{timestamp}.log"
     cmd = build_task_command(task, ai_settings)
     print(f"[INFO] Running task {task.get('id')} -> {' '.join(cmd)}")
+    # Latest progress event; its mtime tells a slow render from a hung one.
+    progress_path = log_path.with_suffix(".progress.json")
     with log_path.open("w", encoding="utf-8") as log_file:
         proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
         assert proc.stdout is not None
         for line in proc.stdout:
             log_file.write(line)
             log_file.flush()
-            print(line.rstrip())
+            event = parse_progress_event(line)
+            if event is None:
+                print(line.rstrip())
+                continue
+            progress_path.write_text(json.dumps(event, ensure_ascii=False), encoding="utf-8")
+            print(format_progress(event))
         proc.wait()
     print(f"[INFO] Task {task.get('id')} finished with exit code {proc.returncode}. Log: {log_path}")
     return log_path
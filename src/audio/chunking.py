@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import re
+import wave
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+# A sentence ends at 。！？ (or !?), together with any closing quotes or brackets after it.
+_SENTENCE_END = re.compile(r"[。！？!?]+[」』）)】\"']*")
+
+
+@dataclass
+class NarrationChunk:
+    text: str
+    start_sec: float
+    end_sec: float
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split narration after each Japanese sentence terminator; blank pieces are dropped."""
+    sentences: List[str] = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start : match.end()])
+        start = match.end()
+    sentences.append(text[start:])
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def concat_wavs(parts: Sequence[bytes], gap_msec: int) -> Tuple[bytes, List[Tuple[float, float]]]:
+    """Join PCM WAVs with ``gap_msec`` of silence between them.
+
+    All parts must share channels, sample width and rate (one engine, one
+    speaker). Returns the joined WAV and each part's ``(start, end)`` in
+    seconds, computed from frame counts so they line up with the samples.
+    """
+    params = None
+    frames: List[bytes] = []
+    spans: List[Tuple[float, float]] = []
+    cursor = 0
+    for index, part in enumerate(parts):
+        with contextlib.closing(wave.open(io.BytesIO(part), "rb")) as wf:
+            current = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+            if params is None:
+                params = current
+            elif current != params:
+                raise ValueError(f"WAV chunk {index} format {current} differs from {params}")
+            nframes = wf.getnframes()
+            data = wf.readframes(nframes)
+        channels, sampwidth, rate = params
+        if index:
+            gap_frames = rate * gap_msec // 1000
+            # 8-bit PCM is unsigned, so its silence is the midpoint.
+            frames.append((b"\x80" if sampwidth == 1 else b"\x00") * gap_frames * channels * sampwidth)
+            cursor += gap_frames
+        frames.append(data)
+        spans.append((cursor / rate, (cursor + nframes) / rate))
+        cursor += nframes
+    if params is None:
+        raise ValueError("No WAV chunks to join")
+
+    out = io.BytesIO()
+    with contextlib.closing(wave.open(out, "wb")) as wf:
+        wf.setnchannels(params[0])
+        wf.setsampwidth(params[1])
+        wf.setframerate(params[2])
+        wf.writeframes(b"".join(frames))
+    return out.getvalue(), spans
+
+
+def chunks_path_for(wav_path: Path) -> Path:
+    """``01_intro.wav`` -> ``01_intro.chunks.json``."""
+    return wav_path.with_suffix(".chunks.json")
+
+
+def encode_chunks(chunks: Sequence[NarrationChunk]) -> bytes:
+    return json.dumps([asdict(c) for c in chunks], ensure_ascii=False).encode("utf-8")
+
+
+def load_chunks(wav_path: Path) -> List[NarrationChunk]:
+    """Sentence boundaries recorded next to a section WAV; empty when it was not chunked."""
+    try:
+        raw = json.loads(chunks_path_for(wav_path).read_text(encoding="utf-8"))
+        return [NarrationChunk(text=str(c["text"]), start_sec=float(c["start_sec"]), end_sec=float(c["end_sec"])) for c in raw]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
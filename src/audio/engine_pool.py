@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from src.audio.tts_cache import audio_query_cache_for
+from src.audio.voicevox_client import VoicevoxClient, VoicevoxError
+from src.models import ConfigModel, VoiceSettings
+
+# Weight of the newest sample in the per-engine latency average.
+LATENCY_ALPHA = 0.3
+
+
+@dataclass
+class EngineNode:
+    client: VoicevoxClient
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    latency_sec: Optional[float] = None
+    down_until: float = 0.0
+
+    @property
+    def url(self) -> str:
+        return self.client.base_url
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def load(self) -> tuple:
+        # Unmeasured engines sort first so each one gets probed early.
+        return (self.in_flight, self.latency_sec if self.latency_sec is not None else 0.0)
+
+
+@dataclass
+class EnginePool:
+    """Several VOICEVOX engines behind the ``synthesize`` interface of one client.
+
+    Each request goes to the healthy engine with the fewest requests in flight,
+    ties broken by average latency. An engine that fails is taken out of
+    rotation for ``cooldown_sec`` and the request moves on to the next one; it
+    is admitted again, as a probe, once the cooldown ends. ``retries`` bounds
+    how many failed attempts one request may make, with the client's backoff
+    between rounds once every engine has failed it.
+    """
+
+    nodes: List[EngineNode]
+    retries: int = 3
+    backoff_factor: float = 1.5
+    cooldown_sec: float = 30.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @classmethod
+    def from_config(cls, config: ConfigModel) -> "EnginePool":
+        """One client per ``config.get_voicevox_endpoints()``, sharing the audio_query cache."""
+        query_cache = audio_query_cache_for(config)
+        clients = [
+            VoicevoxClient(
+                base_url=url,
+                timeout_sec=config.timeout_sec,
+                retries=0,
+                pool_size=config.voicevox_concurrency,
+                query_cache=query_cache,
+            )
+            for url in config.get_voicevox_endpoints()
+        ]
+        return cls([EngineNode(client) for client in clients], retries=config.retries)
+
+    def close(self) -> None:
+        for node in self.nodes:
+            node.client.close()
+
+    def warm_up(self, speaker_id: int) -> int:
+        """``/initialize_speaker`` on every engine in parallel; failed engines start out of rotation.
+
+        Returns the number of engines ready to take requests.
+        """
+
+        def init(node: EngineNode) -> bool:
+            try:
+                node.client.initialize_speaker(speaker_id)
+            except VoicevoxError as err:
+                print(f"[WARN] VOICEVOX engine {node.url} unavailable: {err}")
+                with self._lock:
+                    self._mark_down(node)
+                return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self.nodes))) as pool:
+            ready = sum(pool.map(init, self.nodes))
+        return ready
+
+    def _acquire(self, tried: Set[int]) -> EngineNode:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [n for i, n in enumerate(self.nodes) if i not in tried and n.healthy(now)]
+            if candidates:
+                node = min(candidates, key=EngineNode.load)
+            else:
+                # Nothing healthy left for this request: probe the engine that recovers first.
+                node = min((n for i, n in enumerate(self.nodes) if i not in tried), key=lambda n: n.down_until)
+            node.in_flight += 1
+            return node
+
+    def _mark_down(self, node: EngineNode) -> None:
+        node.failures += 1
+        node.down_until = time.monotonic() + self.cooldown_sec
+
+    def _finish(self, node: EngineNode, latency_sec: Optional[float]) -> None:
+        with self._lock:
+            node.in_flight = max(0, node.in_flight - 1)
+            node.requests += 1
+            if latency_sec is None:
+                self._mark_down(node)
+            else:
+                node.down_until = 0.0
+                node.latency_sec = (
+                    latency_sec
+                    if node.latency_sec is None
+                    else LATENCY_ALPHA * latency_sec + (1 - LATENCY_ALPHA) * node.latency_sec
+                )
+
+    def synthesize(self, text: str, voice: VoiceSettings) -> bytes:
+        """Same contract as :meth:`VoicevoxClient.synthesize`, spread over the engines."""
+        if not text.strip():
+            raise VoicevoxError("Cannot synthesize empty text")
+        tried: Set[int] = set()
+        errors: List[str] = []
+        for attempt in range(self.retries + 1):
+            if len(tried) == len(self.nodes):
+                tried.clear()
+                time.sleep(self.backoff_factor ** (attempt - 1))
+            node = self._acquire(tried)
+            tried.add(self.nodes.index(node))
+            started = time.perf_counter()
+            try:
+                wav = node.client.synthesize(text, voice)
+            except VoicevoxError as err:
+                self._finish(node, None)
+                errors.append(str(err))
+                continue
+            self._finish(node, time.perf_counter() - started)
+            return wav
+        raise VoicevoxError("; ".join(errors[-len(self.nodes):]))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "url": node.url,
+                    "requests": node.requests,
+                    "failures": node.failures,
+                    "latency_sec": round(node.latency_sec, 3) if node.latency_sec is not None else None,
+                    "healthy": node.healthy(now),
+                }
+                for node in self.nodes
+            ]
+
+    def describe(self) -> List[str]:
+        lines = []
+        for stat in self.stats():
+            latency = f"{stat['latency_sec']:.2f}s avg" if stat["latency_sec"] is not None else "no samples"
+            state = "" if stat["healthy"] else ", out of rotation"
+            lines.append(f"[INFO] VOICEVOX {stat['url']}: {stat['requests']} requests, {stat['failures']} failed, {latency}{state}")
+        return lines
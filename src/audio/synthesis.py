@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+from src import timing
+from src.audio.chunking import NarrationChunk, chunks_path_for, concat_wavs, encode_chunks, split_sentences
+from src.audio.engine_pool import EnginePool
+from src.audio.tts_cache import TTSCache, tts_cache_key
+from src.audio.voicevox_client import VoicevoxClient, VoicevoxError
+from src.models import ScriptModel, VoiceSettings
+
+
+@dataclass
+class SectionAudioJob:
+    section_id: str
+    text: str
+    path: Path
+
+
+@dataclass
+class SectionAudioResult:
+    section_id: str
+    path: Path
+    latency_sec: float = 0.0
+    skipped: bool = False
+    cached: bool = False
+    chunks: int = 1
+
+
+def section_audio_jobs(script: ScriptModel, audio_dir: Path) -> List[SectionAudioJob]:
+    """One job per section with narration, at the path ``build_timeline`` reads."""
+    jobs: List[SectionAudioJob] = []
+    for idx, section in enumerate(script.sections, start=1):
+        text = (section.narration or "").strip()
+        if text:
+            jobs.append(SectionAudioJob(section.id, text, audio_dir / f"{idx:02d}_{section.id}.wav"))
+    return jobs
+
+
+def write_wav_atomic(path: Path, data: bytes, chunks: Optional[bytes] = None) -> None:
+    """Write next to ``path`` and rename, so an interrupted run never leaves a truncated WAV.
+
+    ``chunks`` is the sentence-boundary sidecar; without it a stale one is removed.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if chunks is None:
+        chunks_path_for(path).unlink(missing_ok=True)
+    else:
+        _replace_bytes(chunks_path_for(path), chunks)
+    _replace_bytes(path, data)
+
+
+def _replace_bytes(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _reuse(job: SectionAudioJob, key: Optional[str], cache: Optional[TTSCache]) -> Optional[SectionAudioResult]:
+    if cache is None or key is None:
+        return SectionAudioResult(job.section_id, job.path, skipped=True) if job.path.exists() else None
+    if cache.is_linked(key, job.path):
+        return SectionAudioResult(job.section_id, job.path, skipped=True)
+    if cache.lookup(key) is not None and cache.link_into(key, job.path):
+        return SectionAudioResult(job.section_id, job.path, cached=True)
+    return None
+
+
+def synthesize_sections(
+    client: Union[VoicevoxClient, EnginePool],
+    jobs: List[SectionAudioJob],
+    voice: VoiceSettings,
+    *,
+    concurrency: int = 1,
+    force: bool = False,
+    cache: Optional[TTSCache] = None,
+    sentence_gap_msec: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+    on_result: Optional[Callable[[SectionAudioResult], None]] = None,
+) -> List[SectionAudioResult]:
+    """Synthesize ``jobs`` with up to ``concurrency`` requests in flight.
+
+    With a ``cache`` each job is keyed by its text and voice: a WAV that is
+    already linked to the current entry is skipped, a cached entry is linked
+    into place, and anything else (including a WAV left over from older
+    narration) is synthesized and stored. Without one, existing WAVs are kept.
+    ``force`` ignores both.
+
+    When ``sentence_gap_msec`` is set, narration with several sentences is
+    split at 。！？, the sentences are synthesized in parallel and joined with
+    that much silence, and the sentence boundaries are written next to the WAV
+    (see :func:`src.audio.chunking.load_chunks`). Either way at most
+    ``concurrency`` engine requests are in flight.
+
+    Setting ``cancel`` stops the run before its next engine request.
+    ``on_result`` is called from the worker thread as each section finishes.
+    The first failure cancels the jobs that have not started and is re-raised
+    as :class:`VoicevoxError` naming the section. Results are returned in job
+    order.
+    """
+
+    def request(text: str) -> bytes:
+        if cancel is not None and cancel.is_set():
+            raise VoicevoxError("cancelled")
+        with timing.span("tts.synthesize"):
+            return client.synthesize(text, voice)
+
+    def synthesize(sentences: List[str]) -> tuple[bytes, Optional[bytes]]:
+        futures = [requests_pool.submit(request, sentence) for sentence in sentences]
+        try:
+            parts = [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+        if len(parts) == 1:
+            return parts[0], None
+        wav_bytes, spans = concat_wavs(parts, sentence_gap_msec or 0)
+        chunks = [NarrationChunk(text, round(start, 6), round(end, 6)) for text, (start, end) in zip(sentences, spans)]
+        return wav_bytes, encode_chunks(chunks)
+
+    def run(job: SectionAudioJob) -> SectionAudioResult:
+        sentences = split_sentences(job.text) if sentence_gap_msec is not None else []
+        if len(sentences) < 2:
+            sentences = [job.text]
+        variant = f"sentences:{sentence_gap_msec}" if len(sentences) > 1 else ""
+        key = tts_cache_key(job.text, voice, variant) if cache is not None else None
+        result = None if force else _reuse(job, key, cache)
+        if result is None:
+            started = time.perf_counter()
+            try:
+                wav_bytes, chunks = synthesize(sentences)
+            except (VoicevoxError, ValueError) as err:
+                raise VoicevoxError(f"section {job.section_id}: {err}") from err
+            if cache is None or key is None:
+                write_wav_atomic(job.path, wav_bytes, chunks)
+            else:
+                cache.store(key, wav_bytes, chunks)
+                if not cache.link_into(key, job.path):
+                    write_wav_atomic(job.path, wav_bytes, chunks)
+            result = SectionAudioResult(
+                job.section_id, job.path, latency_sec=time.perf_counter() - started, chunks=len(sentences)
+            )
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    workers = max(1, concurrency)
+    # Sections wait on their sentences in ``requests_pool``, which alone bounds engine load.
+    with ThreadPoolExecutor(max_workers=workers) as requests_pool, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, job) for job in jobs]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in pending:
+            future.cancel()
+        for future in futures:
+            if future in done and future.exception() is not None:
+                raise future.exception()
+        return [future.result() for future in futures]
+
+
+def print_result(result: SectionAudioResult) -> None:
+    if result.skipped:
+        print(f"[SKIP] {result.path.name} (exists)")
+    elif result.cached:
+        print(f"[OK] {result.path} (cache hit)")
+    else:
+        detail = f", {result.chunks} sentences" if result.chunks > 1 else ""
+        print(f"[OK] {result.path} ({result.latency_sec:.2f}s{detail})")
+
+
+def summarize(results: List[SectionAudioResult], wall_sec: float) -> str:
+    synthesized = [r for r in results if not r.skipped and not r.cached]
+    hits = sum(1 for r in results if r.cached)
+    if not synthesized:
+        return f"[INFO] VOICEVOX: all {len(results)} sections reused ({hits} from cache)"
+    total = sum(r.latency_sec for r in synthesized)
+    slowest = max(synthesized, key=lambda r: r.latency_sec)
+    return (
+        f"[INFO] VOICEVOX: {len(synthesized)} sections in {wall_sec:.2f}s wall "
+        f"({total:.2f}s summed latency, slowest {slowest.section_id} {slowest.latency_sec:.2f}s, {hits} cache hits)"
+    )
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.audio.chunking import chunks_path_for
+from src.models import ConfigModel, VoiceSettings
+
+# Bump when the synthesis request changes so old WAVs are not reused.
+TTS_CACHE_VERSION = 1
+
+
+def tts_cache_key(text: str, voice: VoiceSettings, variant: str = "") -> str:
+    """Key over everything the engine sees; ``pause_msec`` is applied later and excluded.
+
+    ``variant`` distinguishes different assemblies of the same narration, such
+    as sentence-chunked output with a given gap.
+    """
+    parts = [
+        f"v{TTS_CACHE_VERSION}",
+        text,
+        str(voice.speaker_id),
+        repr(float(voice.speedScale)),
+        repr(float(voice.pitchScale)),
+        repr(float(voice.intonationScale)),
+        repr(float(voice.volumeScale)),
+    ]
+    if variant:
+        parts.append(variant)
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def _link_or_copy(src: Path, dest: Path) -> bool:
+    """Atomically replace ``dest`` with a hardlink to ``src``; False if ``src`` is gone."""
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(src, tmp_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Cross-device work dir or a filesystem without hardlinks.
+            shutil.copyfile(src, tmp_path)
+    except FileNotFoundError:
+        return False
+    os.replace(tmp_path, dest)
+    return True
+
+
+class TTSCache:
+    """Content-addressed narration WAVs shared by every render.
+
+    ``tts_<key>.wav`` is published with ``os.replace`` and per-render files are
+    hardlinks to it (a copy where the filesystem refuses links), so a repeated
+    line costs one ``link`` instead of a VOICEVOX round trip. The file mtime is
+    the LRU clock; once the directory grows past ``max_bytes`` the least
+    recently used entries are unlinked. Renders that already linked an evicted
+    entry keep their copy.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"tts_{key}.wav"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def store(self, key: str, data: bytes, chunks: Optional[bytes] = None) -> Path:
+        """Publish a WAV and, for chunked narration, its ``.chunks.json`` boundaries (sidecar first)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        if chunks is not None:
+            self._write_atomic(chunks_path_for(path), chunks)
+        self._write_atomic(path, data)
+        self._account(len(data))
+        return path
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def is_linked(self, key: str, dest: Path) -> bool:
+        """True when ``dest`` is already a hardlink to the entry for ``key``."""
+        try:
+            return os.path.samefile(self.path_for(key), dest)
+        except OSError:
+            return False
+
+    def link_into(self, key: str, dest: Path) -> bool:
+        """Publish the entry at ``dest``; False if it was evicted in the meantime.
+
+        The chunk sidecar travels with the WAV, and a stale one at ``dest`` is
+        removed when the entry has none.
+        """
+        src = self.path_for(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        src_chunks, dest_chunks = chunks_path_for(src), chunks_path_for(dest)
+        if not (src_chunks.exists() and _link_or_copy(src_chunks, dest_chunks)):
+            dest_chunks.unlink(missing_ok=True)
+        return _link_or_copy(src, dest)
+
+    def _account(self, size: int) -> None:
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self.disk_usage()
+            else:
+                self._approx_bytes += size
+            over = self.max_bytes > 0 and self._approx_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def disk_usage(self) -> int:
+        total = 0
+        for path in self.root.glob("tts_*.wav"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def evict(self) -> int:
+        """Unlink least recently used entries until usage is below 90% of the budget."""
+        entries = []
+        for path in self.root.glob("tts_*.wav"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        usage = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if usage <= target:
+                break
+            chunks_path_for(path).unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+            usage -= size
+            removed += 1
+        with self._lock:
+            self._approx_bytes = usage
+        return removed
+
+
+def audio_query_key(text: str, speaker_id: int, engine_version: str) -> str:
+    raw = "|".join([text, str(speaker_id), engine_version])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+class AudioQueryCache:
+    """Persistent ``/audio_query`` results, one JSON file per key.
+
+    The accent-phrase analysis depends only on text, speaker and the engine
+    build, so voice-parameter changes can skip straight to ``/synthesis``.
+    Entries are small and are not evicted.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"query_{key}.json"
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            query = json.loads(self.path_for(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return query if isinstance(query, dict) else None
+
+    def store(self, key: str, query: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(query, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def tts_cache_for(config: ConfigModel) -> TTSCache:
+    """``<work_dir>/tts_cache`` by default, outside the per-run dirs that ``--clear-cache`` wipes."""
+    return TTSCache(config.get_tts_cache_dir(), config.tts_cache_max_mb * 1024 * 1024)
+
+
+def audio_query_cache_for(config: ConfigModel) -> AudioQueryCache:
+    return AudioQueryCache(config.get_tts_cache_dir() / "queries")
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from src.audio.tts_cache import AudioQueryCache, audio_query_key
 from src.models import VoiceSettings
 
 
@@ -19,44 +22,92 @@ class VoicevoxClient:
     timeout_sec: int = 60
     retries: int = 3
     backoff_factor: float = 1.5
+    # Keep-alive connections held open to the engine; size it to the synthesis concurrency.
+    pool_size: int = 4
+    session: requests.Session = field(default_factory=requests.Session, repr=False)
+    query_cache: Optional[AudioQueryCache] = field(default=None, repr=False)
 
-    def _post_json(self, path: str, params: Dict[str, Any] | None = None, json_data: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    def __post_init__(self) -> None:
+        self._version: Optional[str] = None
+        self._version_lock = threading.Lock()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.pool_size, 1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _post(
+        self,
+        path: str,
+        params: Dict[str, Any] | None,
+        json_data: Dict[str, Any] | None,
+        failure: str,
+    ) -> requests.Response:
         url = f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
         attempt = 0
         while True:
             try:
-                response = requests.post(url, params=params, json=json_data, timeout=self.timeout_sec)
+                response = self.session.post(url, params=params, json=json_data, timeout=self.timeout_sec)
                 response.raise_for_status()
-                return response.json()
+                return response
             except Exception as exc:  # broad to surface context
                 attempt += 1
                 if attempt > self.retries:
-                    raise VoicevoxError(f"VOICEVOX request failed ({url}): {exc}") from exc
+                    raise VoicevoxError(f"{failure} ({url}): {exc}") from exc
                 time.sleep(self.backoff_factor ** (attempt - 1))
 
+    def _post_json(self, path: str, params: Dict[str, Any] | None = None, json_data: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        return self._post(path, params, json_data, "VOICEVOX request failed").json()
+
     def _post_binary(self, path: str, params: Dict[str, Any] | None, json_data: Dict[str, Any]) -> bytes:
-        url = f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
-        attempt = 0
-        while True:
-            try:
-                response = requests.post(url, params=params, json=json_data, timeout=self.timeout_sec)
-                response.raise_for_status()
-                return response.content
-            except Exception as exc:
-                attempt += 1
-                if attempt > self.retries:
-                    raise VoicevoxError(f"VOICEVOX synthesis failed ({url}): {exc}") from exc
-                time.sleep(self.backoff_factor ** (attempt - 1))
+        return self._post(path, params, json_data, "VOICEVOX synthesis failed").content
+
+    def initialize_speaker(self, speaker_id: int) -> None:
+        """Load the speaker model now so the first synthesis does not pay for it."""
+        self._post(
+            "/initialize_speaker",
+            {"speaker": speaker_id, "skip_reinit": "true"},
+            None,
+            "VOICEVOX speaker initialization failed",
+        )
+
+    def engine_version(self) -> str:
+        """``GET /version``, fetched once per client; ``""`` when the engine does not report one.
+
+        A failure is remembered too, so an older or unreachable engine costs
+        one timeout per client instead of one per section.
+        """
+        with self._version_lock:
+            if self._version is None:
+                url = f"{self.base_url.rstrip('/')}/version"
+                try:
+                    response = self.session.get(url, timeout=self.timeout_sec)
+                    response.raise_for_status()
+                    self._version = str(response.json())
+                except Exception as exc:
+                    print(f"[WARN] VOICEVOX version unavailable ({url}): {exc}; audio_query cache disabled")
+                    self._version = ""
+            return self._version
+
+    def audio_query(self, text: str, speaker_id: int) -> Dict[str, Any]:
+        """Accent-phrase analysis for ``text``, served from ``query_cache`` when possible."""
+        version = self.engine_version() if self.query_cache is not None else ""
+        if not version:
+            return self._post_json("/audio_query", params={"text": text, "speaker": speaker_id})
+        key = audio_query_key(text, speaker_id, version)
+        query = self.query_cache.lookup(key)
+        if query is None:
+            query = self._post_json("/audio_query", params={"text": text, "speaker": speaker_id})
+            self.query_cache.store(key, query)
+        return query
 
     def synthesize(self, text: str, voice: VoiceSettings) -> bytes:
         """Generate WAV bytes for the given text."""
         if not text.strip():
             raise VoicevoxError("Cannot synthesize empty text")
 
-        query = self._post_json(
-            "/audio_query",
-            params={"text": text, "speaker": voice.speaker_id},
-        )
+        query = self.audio_query(text, voice.speaker_id)
         query["speedScale"] = voice.speedScale
         query["pitchScale"] = voice.pitchScale
         query["intonationScale"] = voice.intonationScale
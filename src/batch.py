@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class BatchJob:
+    id: str
+    script_path: str
+    command: List[str]
+    status: str = JOB_PENDING
+    attempts: int = 0
+    wall_sec: float = 0.0
+    returncode: Optional[int] = None
+    error: Optional[str] = None
+    log_path: Optional[str] = None
+    work_dir: Optional[str] = None
+
+
+@dataclass
+class BatchSummary:
+    started_at: str
+    finished_at: str
+    wall_sec: float
+    workers: int
+    threads_per_job: int
+    jobs: List[BatchJob] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[BatchJob]:
+        return [job for job in self.jobs if job.status != JOB_DONE]
+
+    def to_dict(self) -> Dict[str, object]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        data = asdict(self)
+        data["counts"] = counts
+        return data
+
+
+def _total_memory_bytes() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def plan_workers(
+    threads_per_job: int,
+    memory_per_job_gb: float,
+    *,
+    max_workers: Optional[int] = None,
+    cpu_count: Optional[int] = None,
+    memory_bytes: Optional[int] = None,
+) -> int:
+    """Number of concurrent renders that fit the CPU and memory budget.
+
+    Each render gets ``threads_per_job`` ffmpeg threads and is assumed to peak at
+    ``memory_per_job_gb``. Unknown memory only limits by CPU.
+    """
+    cpu = cpu_count or os.cpu_count() or 1
+    workers = max(1, cpu // max(threads_per_job, 1))
+    memory = memory_bytes if memory_bytes is not None else _total_memory_bytes()
+    if memory and memory_per_job_gb > 0:
+        workers = min(workers, max(1, int(memory // (memory_per_job_gb * 1024**3))))
+    if max_workers:
+        workers = min(workers, max_workers)
+    return workers
+
+
+def job_id_for(script_path: Path) -> str:
+    digest = hashlib.sha1(str(script_path.resolve()).encode("utf-8")).hexdigest()[:8]
+    stem = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in script_path.stem)
+    return f"{stem}-{digest}"
+
+
+def build_render_jobs(
+    scripts: Sequence[Path],
+    command: str,
+    *,
+    work_root: Path,
+    config_path: Optional[Path] = None,
+    threads_per_job: int = 0,
+) -> List[BatchJob]:
+    """One job per script, each with its own work dir under ``work_root``.
+
+    Renders write narration to ``<work_dir>/audio/NN_<section id>.wav`` and
+    intermediates under ``<work_dir>/ffmpeg`` and ``<work_dir>/segments``, so
+    concurrent jobs sharing a work dir would overwrite each other whenever
+    section ids or output names collide.
+    """
+    jobs: List[BatchJob] = []
+    for script_path in scripts:
+        job_id = job_id_for(script_path)
+        argv: List[str] = command.split()
+        argv.extend(["--script", str(script_path)])
+        if config_path:
+            argv.extend(["--config", str(config_path)])
+        work_dir: Optional[Path] = None
+        # Only generate_video.py understands --threads/--work-dir; custom commands get the bare arguments.
+        if "generate_video" in command:
+            work_dir = work_root / job_id
+            argv.extend(["--work-dir", str(work_dir)])
+            if threads_per_job:
+                argv.extend(["--threads", str(threads_per_job)])
+        jobs.append(
+            BatchJob(id=job_id, script_path=str(script_path), command=argv, work_dir=str(work_dir) if work_dir else None)
+        )
+    return jobs
+
+
+class BatchState:
+    """Job table persisted as JSON after every transition so a batch can resume."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.jobs: Dict[str, BatchJob] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                for item in raw.get("jobs", []):
+                    job = BatchJob(**item)
+                    if job.status == JOB_RUNNING:
+                        # Interrupted mid-render: run it again.
+                        job.status = JOB_PENDING
+                    self.jobs[job.id] = job
+            except (OSError, ValueError, TypeError) as err:
+                print(f"[WARN] Batch state を読み込めませんでした（新規に開始します）: {path} ({err})")
+                self.jobs = {}
+
+    def merge(self, jobs: List[BatchJob]) -> List[BatchJob]:
+        """Adopt ``jobs``, keeping recorded progress for ids already in the state."""
+        merged: List[BatchJob] = []
+        for job in jobs:
+            previous = self.jobs.get(job.id)
+            if previous is not None:
+                previous.command = job.command
+                previous.work_dir = job.work_dir
+                job = previous
+            self.jobs[job.id] = job
+            merged.append(job)
+        return merged
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"updated_at": _now(), "jobs": [asdict(job) for job in self.jobs.values()]}
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _tail(path: Path, lines: int = 20) -> str:
+    try:
+        return "\n".join(path.read_text(encoding="utf-8", errors="replace").strip().splitlines()[-lines:])
+    except OSError:
+        return ""
+
+
+def _run_job(job: BatchJob, state: BatchState, log_dir: Path, retries: int) -> BatchJob:
+    log_path = log_dir / f"{job.id}.log"
+    job.log_path = str(log_path)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    while True:
+        job.attempts += 1
+        job.status = JOB_RUNNING
+        state.save()
+        with log_path.open("a", encoding="utf-8") as log_file:
+            log_file.write(f"# attempt {job.attempts}: {' '.join(job.command)}\n")
+            log_file.flush()
+            try:
+                proc = subprocess.run(job.command, stdout=log_file, stderr=subprocess.STDOUT)
+                job.returncode = proc.returncode
+            except OSError as err:
+                log_file.write(f"{err}\n")
+                job.returncode = -1
+        if job.returncode == 0:
+            job.status = JOB_DONE
+            job.error = None
+            break
+        job.error = _tail(log_path)
+        if job.attempts > retries:
+            job.status = JOB_FAILED
+            break
+        print(f"[Batch] {job.id} failed (exit {job.returncode}); retrying ({job.attempts}/{retries + 1})")
+    job.wall_sec = round(job.wall_sec + time.monotonic() - started, 2)
+    state.save()
+    return job
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    *,
+    state_path: Path,
+    log_dir: Path,
+    workers: int = 1,
+    threads_per_job: int = 0,
+    retries: int = 0,
+    continue_on_error: bool = True,
+) -> BatchSummary:
+    """Run ``jobs`` on a worker pool and return the per-job summary.
+
+    Jobs already recorded as done in ``state_path`` are skipped, so rerunning an
+    interrupted batch resumes where it stopped. Failed jobs are retried up to
+    ``retries`` times; without ``continue_on_error`` the first final failure
+    stops scheduling the remaining jobs.
+    """
+    state = BatchState(state_path)
+    jobs = state.merge(jobs)
+    pending = [job for job in jobs if job.status != JOB_DONE]
+    for job in pending:
+        job.status = JOB_PENDING
+        job.attempts = 0
+    state.save()
+
+    skipped = len(jobs) - len(pending)
+    if skipped:
+        print(f"[Batch] {skipped} job(s) already done; resuming with {len(pending)}")
+
+    started_at = _now()
+    started = time.monotonic()
+    stop = threading.Event()
+
+    def worker(job: BatchJob) -> BatchJob:
+        if stop.is_set():
+            return job
+        print(f"[Batch] Running {job.id}: {' '.join(job.command)}")
+        _run_job(job, state, log_dir, retries)
+        if job.status == JOB_FAILED and not continue_on_error:
+            stop.set()
+        return job
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = [pool.submit(worker, job) for job in pending]
+        for future in as_completed(futures):
+            job = future.result()
+            if job.status == JOB_DONE:
+                print(f"[Batch] {job.id} done in {job.wall_sec:.1f}s")
+            elif job.status == JOB_FAILED:
+                print(f"[Batch] {job.id} failed after {job.attempts} attempt(s); log: {job.log_path}")
+
+    return BatchSummary(
+        started_at=started_at,
+        finished_at=_now(),
+        wall_sec=round(time.monotonic() - started, 2),
+        workers=workers,
+        threads_per_job=threads_per_job,
+        jobs=jobs,
+    )
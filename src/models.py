@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -10,6 +10,9 @@ class VideoConfig(BaseModel):
     width: int = 1920
     height: int = 1080
     fps: int = 30
+    static_fps: Optional[int] = Field(
+        default=None, description="Filter-graph frame rate for sections with a still-image background"
+    )
     bg: str
     bg_fit: Literal["cover", "contain", "stretch"] = "cover"
     short_mode: Literal["off", "auto", "short"] = "off"  # auto: 60秒以下なら縦長化、short: 強制縦長
@@ -135,13 +138,82 @@ class ScriptModel(BaseModel):
         return value
 
 
+class RenderProfile(BaseModel):
+    resolution: Optional[int] = Field(default=None, description="Short-side height in px; None keeps the script size")
+    fps: Optional[int] = Field(default=None, description="Output frame rate cap; None keeps video.fps")
+    preset: str = "medium"
+    crf: int = 18
+    audio_bitrate: Optional[str] = None
+    extra_args: List[str] = Field(default_factory=list)
+
+
+def _default_render_profiles() -> Dict[str, RenderProfile]:
+    return {
+        "draft": RenderProfile(resolution=540, fps=15, preset="ultrafast", crf=28, audio_bitrate="96k"),
+        "preview": RenderProfile(resolution=720, preset="veryfast", crf=23, audio_bitrate="128k"),
+        # Low-resolution proxy streamed to the desktop preview while it renders (--preview-stream).
+        "proxy": RenderProfile(resolution=480, preset="ultrafast", crf=30, audio_bitrate="96k"),
+        "final": RenderProfile(
+            preset="medium",
+            crf=18,
+            audio_bitrate="192k",
+            extra_args=["-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+        ),
+    }
+
+
 class ConfigModel(BaseModel):
     work_dir: Path = Path("work")
     outputs_dir: Path = Path("outputs/rendered")
     voicevox_endpoint: str = "http://localhost:50021"
+    voicevox_endpoints: List[str] = Field(
+        default_factory=list, description="Several VOICEVOX engines to spread synthesis over; overrides voicevox_endpoint"
+    )
     ffmpeg_path: str = "ffmpeg"
     timeout_sec: int = 60
     retries: int = 3
+    voicevox_concurrency: int = Field(default=4, ge=1, description="Sections synthesized in parallel by VOICEVOX")
+    tts_sentence_chunking: bool = Field(
+        default=False, description="Split narration at 。！？ and synthesize the sentences in parallel"
+    )
+    tts_sentence_gap_msec: int = Field(default=150, ge=0, description="Silence inserted between chunked sentences")
+    prerender_timeout_sec: float = Field(
+        default=900, gt=0, description="Limit for each pre-render stage (asset fetch, BGM, VOICEVOX)"
+    )
+    tts_cache_dir: Optional[Path] = Field(default=None, description="Shared narration cache; defaults to <work_dir>/tts_cache")
+    tts_cache_max_mb: int = Field(default=1024, ge=0, description="Disk budget for the shared narration WAV cache; 0 = unbounded")
+    render_profile: str = "final"
+    render_profiles: Dict[str, RenderProfile] = Field(default_factory=_default_render_profiles)
+    text_cache_max_mb: int = Field(default=512, ge=0, description="Disk budget for cached caption PNGs; 0 = unbounded")
+    section_cache_max_mb: int = Field(default=8192, ge=0, description="Disk budget for cached section clips; 0 = unbounded")
+    normalized_cache_max_mb: int = Field(default=4096, ge=0, description="Disk budget for normalized backgrounds; 0 = unbounded")
+
+    @field_validator("render_profiles", mode="after")
+    @classmethod
+    def merge_default_profiles(cls, value: Dict[str, RenderProfile]) -> Dict[str, RenderProfile]:
+        """Configured profiles extend the built-in ones; fields set on a built-in name override only those fields."""
+        merged = _default_render_profiles()
+        for name, profile in value.items():
+            base = merged.get(name)
+            merged[name] = base.model_copy(update=profile.model_dump(exclude_unset=True)) if base else profile
+        return merged
+
+    def get_voicevox_endpoints(self) -> List[str]:
+        return list(self.voicevox_endpoints) or [self.voicevox_endpoint]
+
+    def get_tts_cache_dir(self) -> Path:
+        return self.tts_cache_dir or self.work_dir / "tts_cache"
+
+    def get_sentence_gap_msec(self) -> Optional[int]:
+        """Gap for sentence-chunked synthesis, or ``None`` when chunking is off."""
+        return self.tts_sentence_gap_msec if self.tts_sentence_chunking else None
+
+    def get_render_profile(self, name: Optional[str] = None) -> RenderProfile:
+        key = name or self.render_profile
+        if key not in self.render_profiles:
+            available = ", ".join(sorted(self.render_profiles))
+            raise ValueError(f"Unknown render profile '{key}' (available: {available})")
+        return self.render_profiles[key]
 
 
 class RankingSettings(BaseModel):
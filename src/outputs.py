@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Mapping
 
 from src.assets.types import DownloadedAsset
 from src.models import ScriptModel
@@ -20,21 +21,36 @@ def _format_timestamp(seconds: float) -> str:
     return f"{hours:02}:{mins:02}:{secs:02},{ms:03}"
 
 
+def _srt_cues(section: SectionTimeline) -> List[tuple[float, float, str]]:
+    """One cue per section, or one per narrated sentence when the audio was chunked."""
+    if section.chunks:
+        cues = []
+        for i, chunk in enumerate(section.chunks):
+            start = section.start_sec + (chunk.start_sec if i else 0.0)
+            # Hold each sentence until the next one starts so captions never blink off.
+            end = section.start_sec + (section.chunks[i + 1].start_sec if i + 1 < len(section.chunks) else section.duration_sec)
+            text = "\n".join(part for part in (section.on_screen_text, chunk.text) if part)
+            cues.append((start, end, text))
+        return cues
+    caption_lines = []
+    if section.on_screen_text:
+        caption_lines.append(section.on_screen_text)
+    if section.narration:
+        caption_lines.append(section.narration)
+    text = "\n".join(caption_lines) or "(no text)"
+    return [(section.start_sec, section.start_sec + section.duration_sec, text)]
+
+
 def write_srt(timeline: TimelineSummary, output_path: Path) -> None:
     lines: List[str] = []
-    for index, section in enumerate(timeline.sections, start=1):
-        start = _format_timestamp(section.start_sec)
-        end = _format_timestamp(section.start_sec + section.duration_sec)
-        caption_lines = []
-        if section.on_screen_text:
-            caption_lines.append(section.on_screen_text)
-        if section.narration:
-            caption_lines.append(section.narration)
-        text = "\n".join(caption_lines) or "(no text)"
-        lines.append(str(index))
-        lines.append(f"{start} --> {end}")
-        lines.append(text)
-        lines.append("")
+    index = 0
+    for section in timeline.sections:
+        for start_sec, end_sec, text in _srt_cues(section):
+            index += 1
+            lines.append(str(index))
+            lines.append(f"{_format_timestamp(start_sec)} --> {_format_timestamp(end_sec)}")
+            lines.append(text)
+            lines.append("")
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text("\n".join(lines), encoding="utf-8")
 
@@ -48,6 +64,7 @@ def write_metadata(
     section_assets: Dict[str, DownloadedAsset] | None = None,
     text_cache_dir: Path | None = None,
     bgm_asset: str | None = None,
+    timings: Mapping[str, Any] | None = None,
 ) -> None:
     data: Dict[str, Any] = {
         "project": script.project,
@@ -67,6 +84,7 @@ def write_metadata(
                 "audio_path": str(section.audio_path) if section.audio_path else None,
                 "on_screen_text": section.on_screen_text,
                 "narration": section.narration,
+                "chunks": [asdict(chunk) for chunk in section.chunks],
             }
             for section in timeline.sections
         ],
@@ -117,5 +135,9 @@ def write_metadata(
                 "files": [str(p.relative_to(text_cache_dir.parent)) for p in caption_pngs],
             }
     
+    # Stage timings (see src.timing.Timings.to_dict)
+    if timings:
+        data["timings"] = dict(timings)
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
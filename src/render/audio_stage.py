@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from src.models import RenderProfile, ScriptModel
+from src.render.ffmpeg_runner import (
+    _InputRegistry,
+    _add_audio_inputs,
+    _audio_encoder_args,
+    _build_audio_filters,
+    _cache_dir,
+    _optimized_graph,
+)
+from src.timeline import TimelineSummary
+
+# Bump when the audio filter chain changes in a way the fingerprint cannot see.
+AUDIO_CACHE_VERSION = 1
+
+
+class AudioStageError(RuntimeError):
+    """Raised when the audio track cannot be rendered."""
+
+
+@dataclass
+class AudioTrackPlan:
+    path: Path
+    command: List[str]
+    cached: bool
+
+
+def _file_token(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return f"{path}|missing"
+    return f"{path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+def audio_fingerprint(script: ScriptModel, timeline: TimelineSummary, profile: RenderProfile | None = None) -> str:
+    """Content address of the mixed narration/BGM track.
+
+    Covers exactly what the audio filters read: the narration WAVs in timeline
+    order, the BGM file, ``volume_db``, ``ducking_db``, ``pause_msec`` (through
+    the total duration the BGM is padded to) and the AAC bitrate.
+    """
+    parts = [f"v{AUDIO_CACHE_VERSION}", f"pause={script.voice.pause_msec}", f"total={timeline.total_duration:.3f}"]
+    for section in timeline.sections:
+        if section.audio_path and section.audio_path.exists():
+            parts.append(f"voice|{_file_token(section.audio_path)}")
+    if script.bgm and script.bgm.file:
+        parts.append(f"bgm|{_file_token(Path(script.bgm.file))}")
+        parts.append(f"volume_db={script.bgm.volume_db}|ducking_db={script.bgm.ducking_db}")
+    parts.append(" ".join(_audio_encoder_args(profile)))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def build_audio_command(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    output_path: Path,
+    ffmpeg_path: str = "ffmpeg",
+    profile: RenderProfile | None = None,
+) -> List[str]:
+    """Audio-only ffmpeg command: narration concat plus BGM ducking mix, encoded to AAC.
+
+    Output is cut at the timeline length: with no video stream to stop on, the
+    silent ``anullsrc`` fallback and the ``amix=duration=longest`` BGM mix would
+    otherwise never end.
+    """
+    inputs = _InputRegistry()
+    voice_inputs, bgm_input = _add_audio_inputs(script, timeline, inputs)
+    filter_parts: List[str] = []
+    audio_label = _build_audio_filters(script, timeline, voice_inputs, bgm_input, filter_parts)
+    return [
+        ffmpeg_path,
+        "-y",
+        *inputs.args,
+        "-filter_complex",
+        _optimized_graph(inputs, filter_parts, [audio_label]).serialize(),
+        "-map",
+        audio_label,
+        "-vn",
+        "-t",
+        f"{max(timeline.total_duration, 1.0):.3f}",
+        *_audio_encoder_args(profile),
+        str(output_path),
+    ]
+
+
+def plan_audio_track(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    *,
+    ffmpeg_path: str = "ffmpeg",
+    profile: RenderProfile | None = None,
+    cache_dir: Optional[Path] = None,
+) -> AudioTrackPlan:
+    """Locate the cached track for these inputs, or the command that would create it."""
+    cache_dir = cache_dir or _cache_dir("audio")
+    path = cache_dir / f"audio_{audio_fingerprint(script, timeline, profile)}.m4a"
+    command = build_audio_command(script, timeline, path, ffmpeg_path=ffmpeg_path, profile=profile)
+    return AudioTrackPlan(path=path, command=command, cached=path.exists())
+
+
+def run_audio_track(plan: AudioTrackPlan) -> Path:
+    """Render ``plan`` unless it is already cached; publish the file atomically."""
+    if plan.cached or plan.path.exists():
+        return plan.path
+    plan.path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = plan.path.with_name(f".{plan.path.stem}.{os.getpid()}.tmp.m4a")
+    command = [*plan.command[:-1], str(tmp_path)]
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    except FileNotFoundError as err:
+        raise AudioStageError(f"ffmpeg not found while rendering audio: {err}") from err
+    except subprocess.CalledProcessError as err:
+        tmp_path.unlink(missing_ok=True)
+        tail = "\n".join((err.stderr or "").strip().splitlines()[-10:])
+        raise AudioStageError(f"ffmpeg failed for audio track (exit {err.returncode})\n{tail}") from err
+    os.replace(tmp_path, plan.path)
+    return plan.path
+
+
+def build_mux_command(video_path: Path, audio_path: Path, output_path: Path, ffmpeg_path: str = "ffmpeg") -> List[str]:
+    """Combine a video-only file and the cached audio track without re-encoding either."""
+    return [
+        ffmpeg_path,
+        "-y",
+        "-i",
+        str(video_path),
+        "-i",
+        str(audio_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "1:a:0",
+        "-c",
+        "copy",
+        "-movflags",
+        "+faststart",
+        "-shortest",
+        str(output_path),
+    ]
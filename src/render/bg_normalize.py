@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.models import RenderProfile, ScriptModel
+from src.render.cache_budget import prune_lru, touch
+from src.render.ffmpeg_runner import (
+    IMAGE_EXTENSIONS,
+    _cache_dir,
+    _output_fps,
+    background_fit_filter,
+    output_frame_size,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the normalization command changes in a way the cache key cannot see.
+NORMALIZE_CACHE_VERSION = 2
+DEFAULT_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """``outputs/cache/normalized``, next to the other render caches."""
+    return _cache_dir("normalized")
+
+
+def source_hash(path: Path) -> str:
+    """Cheap content hash: size plus the first and last MiB of the file.
+
+    Stock clips are large, so hashing the whole file on every render would cost
+    more than it saves; head/tail/size is enough to tell re-downloads apart.
+    """
+    size = path.stat().st_size
+    digest = hashlib.sha1(str(size).encode("utf-8"))
+    with path.open("rb") as fh:
+        digest.update(fh.read(_HASH_CHUNK))
+        if size > _HASH_CHUNK:
+            fh.seek(max(size - _HASH_CHUNK, _HASH_CHUNK))
+            digest.update(fh.read(_HASH_CHUNK))
+    return digest.hexdigest()
+
+
+def normalized_path(source: Path, width: int, height: int, fps: int, cache_dir: Path) -> Path:
+    key = f"v{NORMALIZE_CACHE_VERSION}|{source_hash(source)}|{width}x{height}|{fps}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    suffix = ".png" if source.suffix.lower() in IMAGE_EXTENSIONS else ".mp4"
+    return cache_dir / f"{source.stem[:40]}_{width}x{height}_{fps}_{digest}{suffix}"
+
+
+def build_normalize_command(
+    source: Path,
+    output_path: Path,
+    width: int,
+    height: int,
+    fps: int,
+    ffmpeg_path: str = "ffmpeg",
+) -> List[str]:
+    """Transcode ``source`` once to the render size, frame rate and pixel format.
+
+    Images become a single PNG frame; videos become a silent, near-lossless
+    H.264 clip with a keyframe every second so looped reads stay cheap.
+    """
+    fit = background_fit_filter(width, height)
+    if source.suffix.lower() in IMAGE_EXTENSIONS:
+        return [ffmpeg_path, "-y", "-i", str(source), "-vf", fit, "-frames:v", "1", str(output_path)]
+    return [
+        ffmpeg_path,
+        "-y",
+        "-i",
+        str(source),
+        "-an",
+        "-vf",
+        f"{fit},fps={fps},format=yuv420p",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "14",
+        "-g",
+        str(fps),
+        "-movflags",
+        "+faststart",
+        str(output_path),
+    ]
+
+
+def _normalize_one(source: Path, target: Path, command: List[str]) -> Optional[Path]:
+    tmp_path = target.with_name(f".{target.stem}.{os.getpid()}.tmp{target.suffix}")
+    command = [*command[:-1], str(tmp_path)]
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    except (FileNotFoundError, subprocess.CalledProcessError) as err:
+        tmp_path.unlink(missing_ok=True)
+        stderr = getattr(err, "stderr", "") or ""
+        logger.warning("background normalization failed for %s: %s", source, stderr.strip()[-300:] or err)
+        return None
+    os.replace(tmp_path, target)
+    return target
+
+
+def normalize_backgrounds(
+    script: ScriptModel,
+    *,
+    profile: Optional[RenderProfile] = None,
+    ffmpeg_path: str = "ffmpeg",
+    cache_dir: Optional[Path] = None,
+    workers: int = 2,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> Dict[str, str]:
+    """Return ``{background path: normalized path}`` for every background the script uses.
+
+    Missing entries are transcoded once into ``cache_dir`` keyed by (source hash,
+    width, height, fps). Backgrounds that cannot be read or transcoded are
+    left out of the mapping, and the renderer scales those per frame as before.
+    After new transcodes the least recently used files are pruned until the
+    cache fits ``cache_max_bytes`` (``0`` keeps everything).
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    width, height = output_frame_size(script, profile)
+    fps = _output_fps(script, profile)
+
+    sources = [script.video.bg, *(section.bg for section in script.sections if section.bg)]
+    mapping: Dict[str, str] = {}
+    jobs: List[tuple[str, Path, Path, List[str]]] = []
+    for raw in dict.fromkeys(str(item) for item in sources if item):
+        source = Path(raw)
+        if not source.is_file():
+            continue
+        target = normalized_path(source, width, height, fps, cache_dir)
+        if target.exists():
+            touch(target)
+            mapping[raw] = str(target)
+            continue
+        command = build_normalize_command(source, target, width, height, fps, ffmpeg_path)
+        jobs.append((raw, source, target, command))
+
+    if jobs:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            results = pool.map(lambda job: (job[0], _normalize_one(*job[1:])), jobs)
+            for raw, target in results:
+                if target is not None:
+                    mapping[raw] = str(target)
+                    print(f"[INFO] 背景素材を正規化しました: {Path(raw).name} -> {target.name}")
+        prune_lru(cache_dir, "[!.]*", cache_max_bytes)
+    return mapping
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Optional
+
+# Entries used more recently than this are never pruned: a concurrent render
+# may have them on its ffmpeg command line or concat list and not opened them yet.
+PRUNE_GRACE_SEC = 600
+
+
+def touch(path: Path) -> None:
+    """Mark a cache hit as recently used (the file mtime is the LRU clock)."""
+    try:
+        path.touch()
+    except OSError:
+        pass
+
+
+def prune_lru(root: Path, pattern: str, max_bytes: int, *, now: Optional[float] = None) -> int:
+    """Delete the least recently used ``root/pattern`` files until usage is below 90% of ``max_bytes``.
+
+    ``max_bytes <= 0`` means unbounded. Returns the number of files removed.
+    """
+    if max_bytes <= 0:
+        return 0
+    now = time.time() if now is None else now
+    entries = []
+    for path in root.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    usage = sum(size for _, size, _ in entries)
+    if usage <= max_bytes:
+        return 0
+    target = int(max_bytes * 0.9)
+    removed = 0
+    for mtime, size, path in sorted(entries):
+        if usage <= target or now - mtime < PRUNE_GRACE_SEC:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        usage -= size
+        removed += 1
+    return removed
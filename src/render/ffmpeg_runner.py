@@ -1,17 +1,31 @@
 from __future__ import annotations
 
 import os
-import subprocess
 import hashlib
+import logging
 import tempfile
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
 
-from src.models import ScriptModel, TextPosition, TextStyle
-from src.timeline import TimelineSummary
+from src import timing
+from src.models import RenderProfile, ScriptModel, Section, TextPosition, TextStyle
+from src.render.filter_graph import FilterGraph
+from src.render.font_index import get_font_index
+from src.render.font_metrics import get_font_metrics
+from src.render.text_cache import get_text_cache, text_cache_key
+from src.timeline import SectionTimeline, TimelineSummary
+
+if TYPE_CHECKING:
+    from src.render.layout_plan import LayoutPlan, SectionLayout
+
+logger = logging.getLogger(__name__)
 
 _TEXT_LAYOUTS_CACHE = None
 _FONT_CACHE = {}
+# Root of the persistent render caches; None means <project>/outputs/cache.
+_CACHE_ROOT: Optional[Path] = None
+# Inputs with these suffixes are single frames that overlay merging may flatten.
+_STILL_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
 
 
 def _load_text_layouts() -> dict:
@@ -42,6 +56,7 @@ def _get_layout(layout_id: str | None) -> dict:
     return layouts.get("hero_center", {})
 
 
+@timing.timed("font.resolve")
 def _resolve_font_path(font_name: str) -> str:
     """Resolve font name to actual font file path for FFmpeg."""
     if font_name in _FONT_CACHE:
@@ -53,49 +68,192 @@ def _resolve_font_path(font_name: str) -> str:
         _FONT_CACHE[font_name] = font_name
         return font_name
     
-    # Try fc-match on Linux/macOS
-    try:
-        result = subprocess.run(
-            ["fc-match", "-f", "%{file}", font_name],
-            capture_output=True,
-            text=True,
-            timeout=2,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            resolved_path = result.stdout.strip()
-            # If fc-match returned a non-Japanese font for Japanese font name, use fallback
-            if Path(resolved_path).exists():
-                # Check if the font looks like it's not appropriate (e.g., Verdana for "Noto Sans JP")
-                if "Noto Sans" in font_name or "Hiragino" in font_name or "ヒラギノ" in font_name:
-                    # If fc-match gave us Verdana/Arial for Japanese font, skip to fallback
-                    if "Verdana" not in resolved_path and "Arial" not in resolved_path:
-                        _FONT_CACHE[font_name] = resolved_path
-                        return resolved_path
-                else:
-                    _FONT_CACHE[font_name] = resolved_path
-                    return resolved_path
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
-    
-    # Fallback to common Japanese fonts on macOS
-    macos_fallbacks = [
-        f"/System/Library/Fonts/ヒラギノ角ゴシック W4.ttc",
-        f"/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
-        f"/System/Library/Fonts/Hiragino Sans GB.ttc",
-        f"/Library/Fonts/Arial Unicode.ttf",
-    ]
-    
-    for fallback in macos_fallbacks:
-        if Path(fallback).exists():
-            _FONT_CACHE[font_name] = fallback
-            return fallback
-    
+    # In-memory lookup in the persisted fc-list index (rebuilt when fontconfig's cache changes)
+    resolved = get_font_index(_cache_dir("fonts") / "font_index.json").resolve(font_name)
+    if resolved and Path(resolved).exists():
+        _FONT_CACHE[font_name] = resolved
+        return resolved
+
     # Last resort: return as-is and let FFmpeg fail with a clear error
     _FONT_CACHE[font_name] = font_name
     return font_name
 
 
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
+_SCALE_FLAGS = "lanczos+accurate_rnd+full_chroma_int"
+
+
+def background_fit_filter(width: int, height: int) -> str:
+    """Scale-and-pad chain that letterboxes a background into ``width``x``height``.
+
+    The renderer has always letterboxed regardless of ``VideoConfig.bg_fit``;
+    normalization and previews use the same chain so the frame stays unchanged.
+    """
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease:flags={_SCALE_FLAGS},"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+    )
+
+
+class _InputRegistry:
+    """Collect ffmpeg inputs, opening each distinct source only once.
+
+    Every :meth:`use` returns its own placeholder label. :meth:`finalize` rewrites
+    single-use placeholders to plain ``[N:v]`` references and fans shared inputs
+    out with ``split``/``asplit``. Branches of a looped input are trimmed at the
+    running offset, so each consumer continues where the previous one stopped and
+    the split does not have to buffer frames for sections that have not started.
+    """
+
+    def __init__(self, first_index: int = 0) -> None:
+        self.args: List[str] = []
+        self.requested = 0
+        self._indices: Dict[Tuple[str, ...], int] = {}
+        self._uses: Dict[Tuple[int, str], List[Tuple[str, float | None]]] = {}
+        self._first_index = first_index
+        self._next_index = first_index
+        self._released: Set[int] = set()
+
+    def add(self, args: List[str]) -> int:
+        """Register input args and return the ffmpeg input index (deduplicated)."""
+        self.requested += 1
+        return self._open(args)
+
+    def _open(self, args: List[str]) -> int:
+        key = tuple(args)
+        if key not in self._indices:
+            self._indices[key] = self._next_index
+            self._next_index += 1
+            self.args.extend(args)
+        return self._indices[key]
+
+    def use(self, args: List[str], stream: str = "v", duration: float | None = None) -> str:
+        """Return a label for one consumer of ``args``' stream.
+
+        ``duration`` marks a looped input consumed for that long; later consumers
+        of the same input are trimmed to start after it.
+        """
+        idx = self.add(args)
+        uses = self._uses.setdefault((idx, stream), [])
+        label = f"[in{idx}{stream}{len(uses)}]"
+        uses.append((label, duration))
+        return label
+
+    def finalize(self, filter_parts: List[str]) -> List[str]:
+        fan_out: List[str] = []
+        replacements: Dict[str, str] = {}
+        for (idx, stream), uses in self._uses.items():
+            source = f"[{idx}:{stream}]"
+            if len(uses) == 1:
+                replacements[uses[0][0]] = source
+                continue
+            split = "asplit" if stream == "a" else "split"
+            trim = "atrim" if stream == "a" else "trim"
+            setpts = "asetpts" if stream == "a" else "setpts"
+            outputs: List[str] = []
+            branches: List[str] = []
+            offset = 0.0
+            for k, (label, duration) in enumerate(uses):
+                if offset > 0:
+                    branch = f"[in{idx}{stream}s{k}]"
+                    branches.append(f"{branch}{trim}=start={offset:.3f},{setpts}=PTS-STARTPTS{label}")
+                    outputs.append(branch)
+                else:
+                    outputs.append(label)
+                if duration is not None:
+                    offset += duration
+            fan_out.append(f"{source}{split}={len(uses)}{''.join(outputs)}")
+            fan_out.extend(branches)
+
+        finalized = []
+        for part in filter_parts:
+            for placeholder, label in replacements.items():
+                part = part.replace(placeholder, label)
+            finalized.append(part)
+        return fan_out + finalized
+
+    def still_image(self, label: str) -> str | None:
+        """Path of the still image behind ``label`` when nothing else reads that input."""
+        head, _, stream = label.partition(":")
+        if stream != "v" or not head.isdigit():
+            return None
+        idx = int(head)
+        if len(self._uses.get((idx, "v"), [])) != 1 or (idx, "a") in self._uses:
+            return None
+        args = next((list(key) for key, index in self._indices.items() if index == idx), [])
+        if "-i" not in args:
+            return None
+        path = args[args.index("-i") + 1]
+        return path if Path(path).suffix.lower() in _STILL_IMAGE_SUFFIXES else None
+
+    def merge_images(self, pieces: List[Tuple[str, int, int]]) -> Tuple[str, int, int] | None:
+        """Flatten still-image overlays into one looped input (``FilterGraph.merge_overlays``).
+
+        The inputs that were merged are released; :meth:`drop_released` removes them.
+        """
+        layers = []
+        for label, x, y in pieces:
+            path = self.still_image(label)
+            if path is None:
+                return None
+            try:
+                width, height = _image_size(path)
+            except OSError:
+                return None
+            layers.append((path, x, y, width, height))
+        path, x, y = _composite_layers(layers, _file_token, "overlays")
+        self._released.update(int(label.partition(":")[0]) for label, _, _ in pieces)
+        return f"{self._open(['-loop', '1', '-i', path])}:v", x, y
+
+    def drop_released(self) -> Dict[str, str]:
+        """Remove released inputs and renumber the rest; returns the stream label mapping."""
+        if not self._released:
+            return {}
+        mapping: Dict[str, str] = {}
+        indices: Dict[Tuple[str, ...], int] = {}
+        self.args = []
+        next_index = self._first_index
+        for key, idx in sorted(self._indices.items(), key=lambda item: item[1]):
+            if idx in self._released:
+                continue
+            if idx != next_index:
+                mapping.update({f"{idx}:{stream}": f"{next_index}:{stream}" for stream in ("v", "a")})
+            indices[key] = next_index
+            self.args.extend(key)
+            next_index += 1
+        self._uses = {
+            (int(mapping.get(f"{idx}:v", f"{idx}:v").partition(":")[0]), stream): uses
+            for (idx, stream), uses in self._uses.items()
+            if idx not in self._released
+        }
+        self._indices = indices
+        self._next_index = next_index
+        self._released = set()
+        return mapping
+
+    def stats(self) -> Dict[str, int]:
+        opened = len(self._indices)
+        consumers = sum(len(uses) for uses in self._uses.values())
+        return {
+            "inputs_requested": self.requested,
+            "inputs_opened": opened,
+            "inputs_saved": self.requested - opened,
+            "decoders_saved": consumers - len(self._uses),
+        }
+
+
+def _cache_dir(name: str) -> Path:
+    """Return (and create) outputs/cache/<name>, falling back to the temp dir."""
+    # Use outputs/cache/ as persistent cache (prefer project-local)
+    # Fall back to /tmp if project root not available
+    try:
+        root = _CACHE_ROOT or Path(__file__).resolve().parents[2] / "outputs" / "cache"
+        out_dir = root / name
+        out_dir.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        out_dir = Path(tempfile.gettempdir()) / f"avgen_{name}_cache"
+        out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir
 
 
 def _fit_font_size(
@@ -107,66 +265,28 @@ def _fit_font_size(
     stroke_width: int = 0,
 ) -> int:
     """
-    Use Pillow to shrink fontsize until text fits within max_width.
-    
+    Largest fontsize (down to min_fontsize) at which every line fits max_width.
+
     Args:
         text: テキスト（複数行対応: \n で分割）
         font_path: フォントファイルのパス
         fontsize: 初期フォントサイズ
         max_width: 最大幅（px）
         min_fontsize: 最小フォントサイズ（デフォルト: 40。視認性確保）
-    
-    戻り値: 調整後のフォントサイズ
+
+    戻り値: 調整後のフォントサイズ（フォントが読めない場合は fontsize のまま）
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        from PIL import ImageFont, Image, ImageDraw
-    except Exception:
-        return fontsize
     try:
-        current = max(fontsize, min_fontsize)
-        # Pillow can raise OSError if the font is invalid
-        font = ImageFont.truetype(font_path, size=current)
-        # textbbox requires a drawing context
-        dummy = Image.new("RGB", (8, 8))
-        draw = ImageDraw.Draw(dummy)
-        lines = text.split("\n")
-        
-        iteration = 0
-        logger.debug(f"[_fit_font_size] Starting: fontsize={current}pt max_width={max_width}px lines={len(lines)}")
-        
-        while current > min_fontsize:
-            iteration += 1
-            widths = []
-            for line in lines:
-                if not line.strip():
-                    widths.append(0)
-                    continue
-                try:
-                    # Include stroke width in measurement to avoid underestimation
-                    bbox = draw.textbbox((0, 0), line, font=font, stroke_width=max(0, stroke_width))
-                    widths.append(bbox[2] - bbox[0])
-                except Exception:
-                    widths.append(0)
-            
-            max_line = max(widths) if widths else 0
-            logger.debug(f"[_fit_font_size] iter={iteration} fontsize={current}pt max_line_width={max_line:.1f}px")
-            
-            if max_line <= max_width:
-                logger.info(f"✅ [_fit_font_size] Fits! fontsize={current}pt width={max_line:.1f}px <= {max_width}px")
-                break
-            
-            current = max(min_fontsize, int(round(current * 0.9)))
-            font = ImageFont.truetype(font_path, size=current)
-        
-        if current == min_fontsize:
-            logger.warning(f"⚠️ [_fit_font_size] Reached min_fontsize={min_fontsize}pt, final width may exceed")
-        
-        return current
+        fitted = get_font_metrics().fit_font_size(
+            text, font_path, fontsize, max_width, min_fontsize=min_fontsize, stroke_width=stroke_width
+        )
     except Exception:
         return fontsize
+    if fitted == min_fontsize and fitted < fontsize:
+        logger.warning(f"⚠️ [_fit_font_size] Reached min_fontsize={min_fontsize}pt, final width may exceed")
+    else:
+        logger.debug(f"[_fit_font_size] fontsize={fontsize}pt -> {fitted}pt (max_width={max_width}px)")
+    return fitted
 
 
 def _hex_to_rgba(color: str, alpha: int = 255) -> Tuple[int, int, int, int]:
@@ -237,6 +357,7 @@ def _split_text_to_lines(text: str, max_lines: int = 3) -> str:
     return result
 
 
+@timing.timed("text.rasterize")
 def _render_text_image(
     text: str,
     font_path: str,
@@ -248,58 +369,49 @@ def _render_text_image(
     max_width: int | None = None,
 ) -> tuple[str, int, int]:
     """Render text into a transparent PNG and return (path, w, h).
-    
+
+    The cache key covers the requested parameters, so a cached caption is
+    returned from its sidecar metadata without running the fit loop or
+    importing Pillow.
+
     Args:
         max_width: If provided, will reduce fontsize to fit within this width
     """
-    from PIL import Image, ImageDraw, ImageFont
-    import logging
-    logger = logging.getLogger(__name__)
+    cache = get_text_cache(_cache_dir("text"))
+    key = text_cache_key(text, font_path, fontsize, fill, stroke_color, stroke_width, line_gap, max_width)
+    cached = cache.lookup(key)
+    if cached is not None:
+        return cached.path, cached.width, cached.height
 
+    from PIL import Image, ImageDraw
+
+    metrics = get_font_metrics()
     original_fontsize = fontsize
-    original_text = text
 
     # If max_width specified, ensure text fits by reducing fontsize if needed
     if max_width:
         logger.debug(f"[_render_text_image] Input: fontsize={fontsize}pt max_width={max_width}px text_len={len(text)} lines={text.count(chr(10))+1}")
-        
+
         # First attempt: reduce fontsize with current line breaks
         fontsize = _fit_font_size(text, font_path, fontsize, max_width, min_fontsize=30, stroke_width=stroke_width)
-        
-        # Check if it actually fits
-        font_test = ImageFont.truetype(font_path, fontsize)
-        dummy_test = Image.new("RGBA", (8, 8))
-        draw_test = ImageDraw.Draw(dummy_test)
-        lines_test = [ln for ln in text.split("\n") if ln.strip()]
-        if not lines_test:
-            lines_test = [""]
-        
-        widths_test = []
-        for ln in lines_test:
-            bbox = draw_test.textbbox((0, 0), ln, font=font_test, stroke_width=max(0, stroke_width))
-            widths_test.append(bbox[2] - bbox[0])
-        
-        max_line_width = max(widths_test) if widths_test else 0
-        
+        max_line_width = metrics.max_line_width(text, font_path, fontsize, stroke_width)
+        line_count = len([ln for ln in text.split("\n") if ln.strip()]) or 1
+
         # If still exceeds and has fewer than 3 lines, try splitting
-        if max_line_width > max_width and len(lines_test) < 3:
+        if max_line_width > max_width and line_count < 3:
             logger.warning(f"⚠️ [_render_text_image] Still exceeds: {max_line_width:.1f}px > {max_width}px, trying 3-line split")
             text = _split_text_to_lines(text, max_lines=3)
             # Re-fit with split text
             fontsize = _fit_font_size(text, font_path, original_fontsize, max_width, min_fontsize=30, stroke_width=stroke_width)
 
-    font = ImageFont.truetype(font_path, fontsize)
+    font = metrics.face(font_path, fontsize)
     lines = [ln for ln in text.split("\n") if ln.strip()]
     if not lines:
         lines = [""]
 
-    draw_dummy = ImageDraw.Draw(Image.new("RGBA", (8, 8)))
-    widths = []
-    heights = []
-    for ln in lines:
-        bbox = draw_dummy.textbbox((0, 0), ln, font=font, stroke_width=max(0, stroke_width))
-        widths.append(bbox[2] - bbox[0])
-        heights.append(bbox[3] - bbox[1])
+    sizes = [metrics.line_size(ln, font_path, fontsize, stroke_width) for ln in lines]
+    widths = [w for w, _ in sizes]
+    heights = [h for _, h in sizes]
 
     total_height = sum(heights) + line_gap * (len(lines) - 1)
     canvas_w = max(widths) if widths else 1
@@ -321,24 +433,64 @@ def _render_text_image(
         draw.text((0, y), ln, font=font, fill=fill_rgba, stroke_width=max(0, stroke_width), stroke_fill=stroke_rgba)
         y += h + line_gap
 
-    # Include max_width in hash so different resolutions get separate cache entries
-    hash_key = hashlib.sha1(
-        f"{text}|{font_path}|{fontsize}|{fill}|{stroke_color}|{stroke_width}|{line_gap}|{max_width or 0}".encode("utf-8")
-    ).hexdigest()[:16]
-    
-    # Use outputs/cache/text/ as persistent cache (prefer project-local)
-    # Fall back to /tmp if project root not available
-    try:
-        project_root = Path(__file__).resolve().parents[2]
-        out_dir = project_root / "outputs" / "cache" / "text"
-    except Exception:
-        # Fall back to /tmp if we can't determine project root
-        out_dir = Path(tempfile.gettempdir()) / "avgen_text_cache"
-    
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"text_{hash_key}.png"
-    img.save(out_path, format="PNG")
-    return str(out_path), canvas_w, canvas_h
+    entry = cache.store(key, img, fontsize=fontsize, lines=lines)
+    return entry.path, canvas_w, canvas_h
+
+
+@timing.timed("text.composite")
+def _composite_text_layer(pieces: List[Tuple[str, int, int, int, int]]) -> tuple[str, int, int]:
+    """Paste rendered caption PNGs onto one transparent canvas.
+
+    ``pieces`` are ``(path, x, y, w, h)`` in frame coordinates. The canvas covers
+    the bounding box of all pieces; returns ``(path, x, y)`` where ``x/y`` is the
+    canvas origin in the frame. The layer is cached next to the text PNGs under a
+    key derived from the (content-addressed) piece names and their offsets.
+    """
+    if len(pieces) == 1:
+        path, x, y, _, _ = pieces[0]
+        return path, x, y
+    return _composite_layers(pieces, lambda path: Path(path).name, "layer")
+
+
+def _file_token(path: str) -> str:
+    """Cache-key token for a user image, which may be replaced in place."""
+    stat = Path(path).stat()
+    return f"{Path(path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _image_size(path: str) -> tuple[int, int]:
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return image.size
+
+
+def _composite_layers(
+    pieces: List[Tuple[str, int, int, int, int]], token: Callable[[str], str], prefix: str
+) -> tuple[str, int, int]:
+    min_x = min(x for _, x, _, _, _ in pieces)
+    min_y = min(y for _, _, y, _, _ in pieces)
+    max_x = max(x + w for _, x, _, w, _ in pieces)
+    max_y = max(y + h for _, _, y, _, h in pieces)
+    canvas_w = max(max_x - min_x, 1)
+    canvas_h = max(max_y - min_y, 1)
+
+    key_src = "|".join(f"{token(path)}@{x - min_x},{y - min_y}" for path, x, y, _, _ in pieces)
+    hash_key = hashlib.sha1(f"{prefix}|{canvas_w}x{canvas_h}|{key_src}".encode("utf-8")).hexdigest()[:16]
+    cache = get_text_cache(_cache_dir("text"))
+    out_path = cache.png_path(hash_key, prefix=prefix)
+    if out_path.exists():
+        cache.touch(out_path)
+    else:
+        from PIL import Image
+
+        canvas = Image.new("RGBA", (canvas_w, canvas_h), (0, 0, 0, 0))
+        for path, x, y, _, _ in pieces:
+            with Image.open(path) as piece:
+                layer = piece.convert("RGBA")
+            canvas.alpha_composite(layer, (x - min_x, y - min_y))
+        cache.save_image(out_path, canvas)
+    return str(out_path), min_x, min_y
 
 
 def _format_position(value: TextPosition, axis: str, scale: float = 1.0) -> str:
@@ -416,6 +568,49 @@ def _short_scale(script: ScriptModel) -> float:
     return 1.0
 
 
+def _profile_scale(script: ScriptModel, profile: RenderProfile | None) -> float:
+    """Downscale factor a render profile applies to the script resolution (never upscales)."""
+    if not profile or not profile.resolution:
+        return 1.0
+    short_side = min(script.video.width, script.video.height)
+    if short_side <= 0 or profile.resolution >= short_side:
+        return 1.0
+    return profile.resolution / short_side
+
+
+def _render_size(script: ScriptModel, render_scale: float) -> tuple[int, int]:
+    """Output frame size for ``render_scale`` (rounded to even numbers for yuv420p)."""
+    if render_scale == 1.0:
+        return script.video.width, script.video.height
+    width = max(2, int(round(script.video.width * render_scale / 2)) * 2)
+    height = max(2, int(round(script.video.height * render_scale / 2)) * 2)
+    return width, height
+
+
+def output_frame_size(script: ScriptModel, profile: RenderProfile | None = None) -> tuple[int, int]:
+    """Frame size the render will produce for ``profile``."""
+    return _render_size(script, _profile_scale(script, profile))
+
+
+def _output_fps(script: ScriptModel, profile: RenderProfile | None) -> int:
+    if profile and profile.fps:
+        return min(profile.fps, script.video.fps)
+    return script.video.fps
+
+
+def _section_fps(script: ScriptModel, bg_path: str, output_fps: int) -> int:
+    """Frame rate a section's filters run at.
+
+    Sections over a still image only change at text/effect boundaries, so they
+    may run at ``video.static_fps``; the output ``-r`` duplicates frames back to
+    the delivery rate.
+    """
+    static_fps = script.video.static_fps
+    if static_fps and Path(bg_path).suffix.lower() in IMAGE_EXTENSIONS:
+        return max(1, min(static_fps, output_fps))
+    return output_fps
+
+
 def _segment_style(base: TextStyle, segment_style: TextStyle | None) -> TextStyle:
     if not segment_style:
         return base
@@ -497,216 +692,148 @@ def _apply_section_effects(video_label: str, script: ScriptModel, timeline: Time
     return label, filters
 
 
+def _build_section_chain(
+    idx: int,
+    section_tl: SectionTimeline,
+    section: Section | None,
+    script: ScriptModel,
+    inputs: _InputRegistry,
+    filters: List[str],
+    render_scale: float = 1.0,
+    backgrounds: Dict[str, str] | None = None,
+    output_fps: int | None = None,
+    text_layout: SectionLayout | None = None,
+) -> str:
+    """Append the filters for one section (background, text, effects, overlays) and return its label.
+
+    ``render_scale`` shrinks the frame, fonts and layout offsets together for
+    reduced-resolution render profiles. ``backgrounds`` maps source backgrounds
+    to clips already normalized to the output size (see ``bg_normalize``); those
+    are used as-is without a per-frame scale. ``text_layout`` is the section's
+    entry from the script's :class:`~src.render.layout_plan.LayoutPlan`.
+    """
+    target_w, target_h = _render_size(script, render_scale)
+    bg_path = section.bg if section and section.bg else script.video.bg
+    normalized_bg = (backgrounds or {}).get(str(bg_path))
+    if normalized_bg:
+        bg_path = normalized_bg
+    duration = max(section_tl.duration_sec, 0.1)
+    fps = _section_fps(script, bg_path, output_fps or script.video.fps)
+
+    # Sections sharing a background share one decoder; the registry offsets each use.
+    if Path(bg_path).suffix.lower() in IMAGE_EXTENSIONS:
+        base_label = inputs.use(["-loop", "1", "-framerate", str(fps), "-i", bg_path], "v", duration=duration)
+    else:
+        base_label = inputs.use(["-stream_loop", "-1", "-i", bg_path], "v", duration=duration)
+
+    # Trim/loop per section duration, then fix the frame rate before any scaling or
+    # overlay so 60fps stock footage does not double the per-frame work.
+    section_label = f"[vscaled{idx}]"
+    retime = f"trim=duration={duration:.3f},setpts=PTS-STARTPTS,fps={fps}"
+    if normalized_bg:
+        filters.append(f"{base_label}{retime}{section_label}")
+    else:
+        trimmed_label = f"[vsec{idx}]"
+        filters.append(f"{base_label}{retime}{trimmed_label}")
+        # Scale/crop to target video dimensions upfront so drawtext uses final resolution.
+        filters.append(
+            f"{trimmed_label}{background_fit_filter(target_w, target_h)}{section_label}"
+        )
+
+    # Captions come from the layout plan; sections missing from the script are laid out here.
+    if text_layout is None:
+        from src.render.layout_plan import layout_section
+
+        text_layout = layout_section(
+            script,
+            section_tl.id,
+            section.on_screen_text if section else section_tl.on_screen_text,
+            section.on_screen_segments if section else None,
+            section.text_layout if section else None,
+            render_scale,
+        )
+    img_label = inputs.use(["-loop", "1", "-i", text_layout.layer], "v", duration=duration)
+    # Don't use enable= because each section is trimmed; overlay throughout section duration
+    filters.append(
+        f"{section_label}{img_label}overlay={text_layout.x}:{text_layout.y}:shortest=1[vtxt{idx}]"
+    )
+    section_label = f"[vtxt{idx}]"
+
+    # Effects per section (uses 0..duration window)
+    if section and section.effects:
+        current_label = section_label
+        for effect in section.effects:
+            filt = _effect_filter(effect, 0.0, duration)
+            if not filt:
+                continue
+            out_label = f"[vfx{idx}_{effect}]"
+            filters.append(f"{current_label}{filt}{out_label}")
+            current_label = out_label
+        section_label = current_label
+
+    # Overlay images (foreground) per section
+    if section and section.overlays:
+        for ov_idx, overlay in enumerate(section.overlays):
+            ov_path = Path(overlay.file)
+            if not ov_path.exists():
+                continue
+            overlay_label = inputs.use(["-i", str(ov_path)], "v")
+            xpos = _format_position(overlay.position, "x", render_scale)
+            ypos = _format_position(overlay.position, "y", render_scale)
+            current = overlay_label
+            ov_scale = (overlay.scale or 1.0) * render_scale
+            if ov_scale != 1.0:
+                current_label = f"[ov{idx}_{ov_idx}_scaled]"
+                filters.append(f"{overlay_label}scale=iw*{ov_scale:g}:ih*{ov_scale:g}{current_label}")
+                current = current_label
+            if overlay.opacity is not None:
+                alpha_label = f"[ov{idx}_{ov_idx}_alpha]"
+                filters.append(f"{current}format=rgba,colorchannelmixer=aa={overlay.opacity}{alpha_label}")
+                current = alpha_label
+            out_label = f"[vov{idx}_{ov_idx}]"
+            filters.append(f"{section_label}{current}overlay=x={xpos}:y={ypos}:format=auto:shortest=1{out_label}")
+            section_label = out_label
+
+    return section_label
+
+
+def _layout_plan(script: ScriptModel, render_scale: float) -> LayoutPlan:
+    # Imported here: the layout stage builds on the text helpers in this module.
+    from src.render.layout_plan import get_layout_plan
+
+    return get_layout_plan(script, render_scale)
+
+
 def _build_section_videos(
     script: ScriptModel,
     timeline: TimelineSummary,
-    add_input,
+    inputs: _InputRegistry,
+    render_scale: float = 1.0,
+    backgrounds: Dict[str, str] | None = None,
+    output_fps: int | None = None,
+    layout: LayoutPlan | None = None,
 ) -> tuple[str, List[str]]:
     filters: List[str] = []
     labels: List[str] = []
     section_map = {section.id: section for section in script.sections}
-    target_w, target_h = script.video.width, script.video.height
+    layout = layout or _layout_plan(script, render_scale)
 
     for idx, section_tl in enumerate(timeline.sections):
         section = section_map.get(section_tl.id)
-        bg_path = section.bg if section and section.bg else script.video.bg
-        duration = max(section_tl.duration_sec, 0.1)
-        input_idx = None
-
-        if Path(bg_path).suffix.lower() in IMAGE_EXTENSIONS:
-            input_idx = add_input(["-loop", "1", "-t", f"{duration:.2f}", "-i", bg_path])
-        else:
-            input_idx = add_input(["-stream_loop", "-1", "-i", bg_path])
-
-        base_label = f"[{input_idx}:v]"
-        # Trim/loop per section duration. Using trim to avoid excessive length.
-        trimmed_label = f"[vsec{idx}]"
-        filters.append(f"{base_label}trim=duration={duration:.3f},setpts=PTS-STARTPTS{trimmed_label}")
-
-        # Scale/crop to target video dimensions upfront so drawtext uses final resolution.
-        section_label = f"[vscaled{idx}]"
-        filters.append(
-            f"{trimmed_label}scale={target_w}:{target_h}:force_original_aspect_ratio=decrease:flags=lanczos+accurate_rnd+full_chroma_int,"
-            f"pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2,setsar=1{section_label}"
-        )
-
-        # Drawtext for this section only (supports segments)
-        style = script.text_style
-        layout = _get_layout(getattr(section, "text_layout", None) if section else None)
-        base_pos = TextPosition(
-            x=str(layout.get("base_position", {}).get("x", "center")),
-            y=str(layout.get("base_position", {}).get("y", "center-120")),
-        )
-        line_gap = int(layout.get("line_gap", 24))
-        align = layout.get("align", "center")
-        rank_offset = layout.get("rank_offset", {})
-        body_offset = layout.get("body_offset", {})
-
-        if section and section.on_screen_segments:
-            current_label = section_label
-            line_offset = 0
-            for seg_idx, seg in enumerate(section.on_screen_segments):
-                tier = "emphasis" if seg_idx == 0 else "body"
-                # Normalize segment that may be a dict loaded from YAML
-                if isinstance(seg, dict):
-                    seg_text = str(seg.get("text", "") or "")
-                    seg_style_raw = seg.get("style")
-                    try:
-                        seg_style_obj = TextStyle.model_validate(seg_style_raw) if seg_style_raw else None
-                    except Exception:
-                        seg_style_obj = None
-                else:
-                    seg_text = str(getattr(seg, "text", "") or "")
-                    seg_style_obj = getattr(seg, "style", None)
-
-                seg_style = _apply_tier_style(_segment_style(style, seg_style_obj), tier)
-                offset = rank_offset if seg_idx == 0 else body_offset
-                off_x = offset.get("x", 0)
-                off_y = offset.get("y", 0)
-
-                scale = _short_scale(script)
-                if scale != 1.0:
-                    seg_style.fontsize = int(round((seg_style.fontsize or 0) * scale))
-                    if seg_style.stroke and seg_style.stroke.width is not None:
-                        seg_style.stroke.width = max(1, int(round(seg_style.stroke.width * scale)))
-                font_path = _resolve_font_path(seg_style.font)
-                line_gap_px = int(round(8 * scale))
-                
-                # Ensure text fits within video width
-                target_w = script.video.width
-                max_text_width = int(target_w * 0.9)
-                
-                text_img, img_w, img_h = _render_text_image(
-                    _escape_text(seg_text),
-                    font_path,
-                    seg_style.fontsize,
-                    seg_style.fill,
-                    seg_style.stroke.color,
-                    seg_style.stroke.width or 0,
-                    line_gap_px,
-                    max_width=max_text_width,
-                )
-                if align == "left":
-                    xpos = off_x + 60
-                elif align == "right":
-                    xpos = target_w - img_w - (off_x + 60)
-                else:
-                    xpos = int((target_w - img_w) / 2) + off_x
-
-                base_y = 0
-                if isinstance(base_pos.y, int):
-                    base_y = int(round(base_pos.y * scale))
-                elif isinstance(base_pos.y, str) and base_pos.y.startswith("center"):
-                    delta = 0
-                    token = base_pos.y[len("center"):]
-                    if token:
-                        try:
-                            delta = int(token)
-                        except Exception:
-                            delta = 0
-                    base_y = int(target_h / 2 - img_h / 2 + delta)
-                else:
-                    try:
-                        base_y = int(float(base_pos.y))
-                    except Exception:
-                        base_y = 0
-                ypos = base_y + line_offset + off_y
-
-                img_idx = add_input(["-loop", "1", "-i", text_img])
-                out_label = f"[vtxt{idx}_{seg_idx}_{line_offset}]"
-                # Don't use enable= because each section is trimmed; overlay throughout section duration
-                filters.append(
-                    f"{current_label}[{img_idx}:v]overlay={xpos}:{ypos}:shortest=1{out_label}"
-                )
-                current_label = out_label
-                line_offset += img_h + line_gap_px
-            section_label = current_label
-        else:
-            scale = _short_scale(script)
-            base_style = style.model_copy(deep=True)
-            if scale != 1.0:
-                base_style.fontsize = int(round((base_style.fontsize or 0) * scale))
-                if base_style.stroke and base_style.stroke.width is not None:
-                    base_style.stroke.width = max(1, int(round(base_style.stroke.width * scale)))
-            font_path = _resolve_font_path(base_style.font)
-            line_gap_px = int(round(8 * scale))
-            text_img, img_w, img_h = _render_text_image(
-                _escape_text(section_tl.on_screen_text),
-                font_path,
-                base_style.fontsize,
-                base_style.fill,
-                base_style.stroke.color,
-                base_style.stroke.width or 0,
-                line_gap_px,
+        labels.append(
+            _build_section_chain(
+                idx,
+                section_tl,
+                section,
+                script,
+                inputs,
+                filters,
+                render_scale,
+                backgrounds,
+                output_fps,
+                layout.section(section_tl.id),
             )
-            if align == "left":
-                xpos = 60
-            elif align == "right":
-                xpos = target_w - img_w - 60
-            else:
-                xpos = int((target_w - img_w) / 2)
-
-            base_y = 0
-            if isinstance(base_pos.y, int):
-                base_y = int(round(base_pos.y * scale))
-            elif isinstance(base_pos.y, str) and base_pos.y.startswith("center"):
-                delta = 0
-                token = base_pos.y[len("center"):]
-                if token:
-                    try:
-                        delta = int(token)
-                    except Exception:
-                        delta = 0
-                base_y = int(target_h / 2 - img_h / 2 + delta)
-            else:
-                try:
-                    base_y = int(float(base_pos.y))
-                except Exception:
-                    base_y = 0
-
-            img_idx = add_input(["-loop", "1", "-i", text_img])
-            # Don't use enable= because each section is trimmed; overlay throughout section duration
-            filters.append(
-                f"{section_label}[{img_idx}:v]overlay={xpos}:{base_y}:shortest=1[vtxt{idx}]"
-            )
-            section_label = f"[vtxt{idx}]"
-
-        # Effects per section (uses 0..duration window)
-        if section and section.effects:
-            current_label = section_label
-            for effect in section.effects:
-                filt = _effect_filter(effect, 0.0, duration)
-                if not filt:
-                    continue
-                out_label = f"[vfx{idx}_{effect}]"
-                filters.append(f"{current_label}{filt}{out_label}")
-                current_label = out_label
-            section_label = current_label
-
-        # Overlay images (foreground) per section
-        if section and section.overlays:
-            for ov_idx, overlay in enumerate(section.overlays):
-                ov_path = Path(overlay.file)
-                if not ov_path.exists():
-                    continue
-                ov_input_idx = add_input(["-i", str(ov_path)])
-                xpos = _format_position(overlay.position, "x")
-                ypos = _format_position(overlay.position, "y")
-                overlay_label = f"[{ov_input_idx}:v]"
-                current = overlay_label
-                if overlay.scale:
-                    current_label = f"[ov{idx}_{ov_idx}_scaled]"
-                    filters.append(f"{overlay_label}scale=iw*{overlay.scale}:ih*{overlay.scale}{current_label}")
-                    current = current_label
-                if overlay.opacity is not None:
-                    alpha_label = f"[ov{idx}_{ov_idx}_alpha]"
-                    filters.append(f"{current}format=rgba,colorchannelmixer=aa={overlay.opacity}{alpha_label}")
-                    current = alpha_label
-                out_label = f"[vov{idx}_{ov_idx}]"
-                filters.append(f"{section_label}{current}overlay=x={xpos}:y={ypos}:format=auto:shortest=1{out_label}")
-                section_label = out_label
-
-        labels.append(section_label)
+        )
 
     if not labels:
         return "", []
@@ -716,18 +843,38 @@ def _build_section_videos(
     return concat_label, filters
 
 
+def _shift_window(start: float, end: float, offset: float, span: float | None) -> tuple[float, float] | None:
+    """Translate an absolute [start, end] window into clip-local time, or None if it misses the clip."""
+    local_start = start - offset
+    local_end = end - offset
+    if span is not None and (local_end <= 0.0 or local_start >= span):
+        return None
+    return max(local_start, 0.0), local_end
+
+
 def _add_credits_overlay(
     base_label: str,
     script: ScriptModel,
     timeline: TimelineSummary,
+    *,
+    offset: float = 0.0,
+    span: float | None = None,
+    render_scale: float = 1.0,
 ) -> tuple[str, str]:
     credits = script.credits
     if not credits or not credits.enabled or not credits.text:
         return base_label, ""
 
-    start = max(timeline.total_duration - 4.0, 0.0)
-    end = timeline.total_duration + 0.5
-    font_size = max(int(script.text_style.fontsize * 0.75), 32)
+    window = _shift_window(
+        max(timeline.total_duration - 4.0, 0.0),
+        timeline.total_duration + 0.5,
+        offset,
+        span,
+    )
+    if window is None:
+        return base_label, ""
+    start, end = window
+    font_size = int(round(max(int(script.text_style.fontsize * 0.75), 32) * render_scale))
     text = _escape_text(credits.text)
     label = "[vcred]"
     filter_chain = (
@@ -738,82 +885,69 @@ def _add_credits_overlay(
         f"fontcolor=white:"
         f"borderw=2:"
         f"bordercolor=black:"
-        f"x={_format_position(credits.position, 'x')}:"
-        f"y={_format_position(credits.position, 'y')}:"
+        f"x={_format_position(credits.position, 'x', render_scale)}:"
+        f"y={_format_position(credits.position, 'y', render_scale)}:"
         f"enable='between(t,{start:.2f},{end:.2f})'{label}"
     )
     return label, filter_chain
 
 
-def build_ffmpeg_command(
-    script: ScriptModel,
-    timeline: TimelineSummary,
-    audio_dir: Path,
-    output_path: Path,
-    ffmpeg_path: str = "ffmpeg",
-) -> List[str]:
-    input_args: List[str] = []
-    input_index = 0
-
-    def add_input(args: List[str]) -> int:
-        nonlocal input_index
-        input_args.extend(args)
-        idx = input_index
-        input_index += 1
-        return idx
-
-    bg_path = script.video.bg
-    total_duration = max(timeline.total_duration, 1.0)
-
-    # Section narration WAV inputs
-    voice_indices: List[int] = []
-    for section in timeline.sections:
-        if section.audio_path and section.audio_path.exists():
-            voice_indices.append(add_input(["-i", str(section.audio_path)]))
-
-    # Optional BGM input
-    bgm_index = None
-    if script.bgm and script.bgm.file:
-        bgm_path = Path(script.bgm.file)
-        if bgm_path.exists():
-            bgm_index = add_input(["-stream_loop", "-1", "-i", str(bgm_path)])
-
-    # Optional watermark input (as image)
+def _add_watermark_input(script: ScriptModel, inputs: _InputRegistry) -> str | None:
     watermark_cfg = script.watermark
-    watermark_index = None
     if watermark_cfg and watermark_cfg.file:
         wm_path = Path(watermark_cfg.file)
         if wm_path.exists():
-            watermark_index = add_input(["-i", str(wm_path)])
+            return inputs.use(["-i", str(wm_path)], "v")
+    return None
 
-    filter_parts: List[str] = []
-    video_label = ""
 
-    video_label, section_filters = _build_section_videos(script, timeline, add_input)
-    filter_parts.extend(section_filters)
+def _apply_global_overlays(
+    video_label: str,
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    watermark_input: str | None,
+    filter_parts: List[str],
+    *,
+    offset: float = 0.0,
+    span: float | None = None,
+    render_scale: float = 1.0,
+) -> str:
+    """Watermark image/text and credits, which are timed against the whole video.
+
+    ``offset``/``span`` describe the clip being rendered when a single section is
+    encoded on its own, so the enable windows line up after the clips are joined.
+    """
+    watermark_cfg = script.watermark
+    total_duration = max(timeline.total_duration, 1.0)
 
     # Watermark overlay (if available)
-    if watermark_index is not None:
-        x_pos = _format_position(watermark_cfg.position, "x")  # type: ignore[arg-type]
-        y_pos = _format_position(watermark_cfg.position, "y")  # type: ignore[arg-type]
-        watermark_label = f"[{watermark_index}:v]"
+    if watermark_input is not None:
+        x_pos = _format_position(watermark_cfg.position, "x", render_scale)  # type: ignore[union-attr]
+        y_pos = _format_position(watermark_cfg.position, "y", render_scale)  # type: ignore[union-attr]
+        if render_scale != 1.0:
+            filter_parts.append(f"{watermark_input}scale=iw*{render_scale:g}:ih*{render_scale:g}[wmscaled]")
+            watermark_input = "[wmscaled]"
         filter_parts.append(
-            f"{video_label}{watermark_label}overlay=x={x_pos}:y={y_pos}:format=auto:shortest=1[vwm]"
+            f"{video_label}{watermark_input}overlay=x={x_pos}:y={y_pos}:format=auto:shortest=1[vwm]"
         )
         video_label = "[vwm]"
 
     if watermark_cfg:
         wm_text = watermark_cfg.text or (script.bgm.license if script.bgm and script.bgm.license else None)
-        if wm_text:
+        end_time = min(max(watermark_cfg.duration_sec, 0.1), total_duration)
+        window = _shift_window(0.0, end_time, offset, span)
+        if wm_text and window is not None:
             text = _escape_text(wm_text)
             font_path = _resolve_font_path(watermark_cfg.font or script.text_style.font)
-            font_size = watermark_cfg.fontsize
+            font_size = int(round(watermark_cfg.fontsize * render_scale))
             font_color = watermark_cfg.fill
             stroke_color = watermark_cfg.stroke_color or script.text_style.stroke.color
             stroke_width = watermark_cfg.stroke_width if watermark_cfg.stroke_width is not None else script.text_style.stroke.width
-            x_pos = _format_position(watermark_cfg.position, "x")
-            y_pos = _format_position(watermark_cfg.position, "y")
-            end_time = min(max(watermark_cfg.duration_sec, 0.1), total_duration)
+            if render_scale != 1.0 and stroke_width:
+                stroke_width = max(1, int(round(stroke_width * render_scale)))
+            x_pos = _format_position(watermark_cfg.position, "x", render_scale)
+            y_pos = _format_position(watermark_cfg.position, "y", render_scale)
+            start_time, end_time = window
             filter_parts.append(
                 f"{video_label}drawtext="
                 f"fontfile='{font_path}':"
@@ -824,23 +958,55 @@ def build_ffmpeg_command(
                 f"bordercolor={stroke_color}:"
                 f"x={x_pos}:"
                 f"y={y_pos}:"
-                f"enable='between(t,0.00,{end_time:.2f})'[vwmtext]"
+                f"enable='between(t,{start_time:.2f},{end_time:.2f})'[vwmtext]"
             )
             video_label = "[vwmtext]"
 
     # Credits overlay (appears near the end)
-    credit_label, credit_filter = _add_credits_overlay(video_label, script, timeline)
+    credit_label, credit_filter = _add_credits_overlay(
+        video_label, script, timeline, offset=offset, span=span, render_scale=render_scale
+    )
     if credit_filter:
         filter_parts.append(credit_filter)
         video_label = credit_label
+    return video_label
+
+
+def _add_audio_inputs(
+    script: ScriptModel, timeline: TimelineSummary, inputs: _InputRegistry
+) -> tuple[List[str], str | None]:
+    # Section narration WAV inputs
+    voice_inputs: List[str] = []
+    for section in timeline.sections:
+        if section.audio_path and section.audio_path.exists():
+            voice_inputs.append(inputs.use(["-i", str(section.audio_path)], "a"))
+
+    # Optional BGM input
+    bgm_input = None
+    if script.bgm and script.bgm.file:
+        bgm_path = Path(script.bgm.file)
+        if bgm_path.exists():
+            bgm_input = inputs.use(["-stream_loop", "-1", "-i", str(bgm_path)], "a")
+    return voice_inputs, bgm_input
+
+
+def _build_audio_filters(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    voice_inputs: List[str],
+    bgm_input: str | None,
+    filter_parts: List[str],
+) -> str:
+    """Narration concat (or silence) plus optional BGM ducking mix. Returns the output label."""
+    total_duration = max(timeline.total_duration, 1.0)
 
     # Audio – narration concat or silent fallback
-    if voice_indices:
+    if voice_inputs:
         normalized_voice_labels: List[str] = []
-        for v_idx in voice_indices:
+        for voice_input in voice_inputs:
             norm_label = f"[voice_norm{len(normalized_voice_labels)}]"
             filter_parts.append(
-                f"[{v_idx}:a]asetpts=PTS-STARTPTS,aformat=sample_rates=44100:channel_layouts=mono{norm_label}"
+                f"{voice_input}asetpts=PTS-STARTPTS,aformat=sample_rates=44100:channel_layouts=mono{norm_label}"
             )
             normalized_voice_labels.append(norm_label)
         labels = "".join(normalized_voice_labels)
@@ -853,13 +1019,13 @@ def build_ffmpeg_command(
     audio_output_label = voice_label
 
     # BGM + ducking mix
-    if bgm_index is not None:
+    if bgm_input is not None:
         voice_mix_label = voice_label
         voice_side_label = voice_label
         bgm_volume = _db_to_linear(script.bgm.volume_db)
         duration_pad = total_duration + 1.0
         filter_parts.append(
-            f"[{bgm_index}:a]apad=pad_dur={duration_pad},atrim=duration={duration_pad},"
+            f"{bgm_input}apad=pad_dur={duration_pad},atrim=duration={duration_pad},"
             f"asetpts=PTS-STARTPTS,volume={bgm_volume:.4f}[bgm]"
         )
         bgm_label = "[bgm]"
@@ -879,28 +1045,280 @@ def build_ffmpeg_command(
             f"{bgm_label}{voice_mix_label}amix=inputs=2:duration=longest:dropout_transition=0[aout]"
         )
         audio_output_label = "[aout]"
+    return audio_output_label
+
+
+def _optimized_graph(inputs: _InputRegistry, filter_parts: List[str], keep: List[str]) -> FilterGraph:
+    """Parse the built chains into a :class:`FilterGraph` and run its optimization passes."""
+    with timing.span("filter_graph.optimize"):
+        graph = FilterGraph.parse(inputs.finalize(filter_parts))
+        stats = graph.optimize(keep, compose_overlays=inputs.merge_images)
+        graph.relabel(inputs.drop_released())
+    logger.debug(
+        "filter graph: %d filters after optimize (%d dead, %d no-op, %d fused, %d overlays merged)",
+        len(graph.nodes),
+        stats["dead_removed"],
+        stats["noops_dropped"],
+        stats["filters_fused"],
+        stats["overlays_merged"],
+    )
+    return graph
+
+
+def _filter_graph_args(graph: FilterGraph, script_path: Path | None) -> List[str]:
+    if script_path is None:
+        return ["-filter_complex", graph.serialize()]
+    return ["-filter_complex_script", str(graph.write_script(script_path))]
+
 
-    filter_complex = ";".join(filter_parts)
+def _video_encoder_args(profile: RenderProfile | None = None) -> List[str]:
+    if profile is None:
+        return ["-c:v", "libx264", "-preset", "medium", "-crf", "18"]
+    return ["-c:v", "libx264", "-preset", profile.preset, "-crf", str(profile.crf), *profile.extra_args]
 
+
+def _without_options(args: List[str], names: Set[str]) -> List[str]:
+    """Drop ``-name value`` pairs for every option in ``names``."""
+    kept: List[str] = []
+    skip = False
+    for token in args:
+        if skip:
+            skip = False
+        elif token in names:
+            skip = True
+        else:
+            kept.append(token)
+    return kept
+
+
+def _audio_encoder_args(profile: RenderProfile | None = None) -> List[str]:
+    args = ["-c:a", "aac"]
+    if profile and profile.audio_bitrate:
+        args.extend(["-b:a", profile.audio_bitrate])
+    return args
+
+
+def build_ffmpeg_command(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    audio_dir: Path,
+    output_path: Path,
+    ffmpeg_path: str = "ffmpeg",
+    input_stats: Dict[str, int] | None = None,
+    profile: RenderProfile | None = None,
+    backgrounds: Dict[str, str] | None = None,
+    filter_script_path: Path | None = None,
+    include_audio: bool = True,
+    threads: int | None = None,
+    layout: LayoutPlan | None = None,
+    output_args: Optional[List[str]] = None,
+) -> List[str]:
+    """Build the single-graph render command.
+
+    Pass a dict as ``input_stats`` to receive how many inputs/decoders the
+    input registry saved by opening shared files once. ``profile`` selects
+    resolution, frame rate and encoder settings (draft/preview/final).
+    ``backgrounds`` maps background paths to pre-normalized clips. With
+    ``filter_script_path`` the optimized graph is written to that file and passed
+    via ``-filter_complex_script`` instead of inline on the command line.
+    ``include_audio=False`` renders video only, for muxing with the cached track
+    from ``audio_stage``. ``layout`` is the script's caption layout plan; it is
+    looked up (or built) for the profile's scale when omitted. ``output_args``
+    are muxer options for a container other than MP4 (e.g. HLS): they go right
+    before the output path, the profile's MP4-only ``-movflags`` is left out and
+    encoder options they repeat (such as ``-pix_fmt``) appear only once.
+    """
+    inputs = _InputRegistry()
+    render_scale = _profile_scale(script, profile)
+
+    voice_inputs: List[str] = []
+    bgm_input = None
+    if include_audio:
+        voice_inputs, bgm_input = _add_audio_inputs(script, timeline, inputs)
+
+    # Optional watermark input (as image)
+    watermark_input = _add_watermark_input(script, inputs)
+
+    filter_parts: List[str] = []
+    video_label = ""
+
+    with timing.span("filter_graph.build"):
+        video_label, section_filters = _build_section_videos(
+            script, timeline, inputs, render_scale, backgrounds, _output_fps(script, profile), layout
+        )
+        filter_parts.extend(section_filters)
+
+        video_label = _apply_global_overlays(
+            video_label, script, timeline, watermark_input, filter_parts, render_scale=render_scale
+        )
+        audio_output_label = None
+        if include_audio:
+            audio_output_label = _build_audio_filters(script, timeline, voice_inputs, bgm_input, filter_parts)
+
+    graph = _optimized_graph(inputs, filter_parts, [video_label, audio_output_label or ""])
+    stats = inputs.stats()
+    logger.info(
+        "ffmpeg inputs: %d requested, %d opened (saved %d inputs, %d decoders)",
+        stats["inputs_requested"],
+        stats["inputs_opened"],
+        stats["inputs_saved"],
+        stats["decoders_saved"],
+    )
+    if input_stats is not None:
+        input_stats.update(stats)
+
+    command = [
+        ffmpeg_path,
+        "-y",
+        *inputs.args,
+        *_filter_graph_args(graph, filter_script_path),
+        "-map",
+        video_label,
+    ]
+    video_args = _video_encoder_args(profile)
+    if output_args is not None:
+        video_args = _without_options(video_args, {"-movflags", *(t for t in output_args if t.startswith("-"))})
+    if audio_output_label:
+        command.extend(["-map", audio_output_label, *video_args, *_audio_encoder_args(profile)])
+    else:
+        command.extend(["-an", *video_args])
+    command.extend(["-r", str(_output_fps(script, profile))])
+    if audio_output_label:
+        command.append("-shortest")
+    if threads:
+        command.extend(["-threads", str(threads)])
+    command.extend(output_args or [])
+    command.append(str(output_path))
+    return command
+
+
+def build_section_command(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    section_index: int,
+    output_path: Path,
+    ffmpeg_path: str = "ffmpeg",
+    threads: int | None = None,
+    profile: RenderProfile | None = None,
+    backgrounds: Dict[str, str] | None = None,
+    layout: LayoutPlan | None = None,
+) -> List[str]:
+    """Build a video-only ffmpeg command that renders ``timeline.sections[section_index]``.
+
+    The clips produced for every section share codec, pixel format and frame rate so
+    that :func:`build_concat_command` can join them with stream copy.
+    """
+    inputs = _InputRegistry()
+    render_scale = _profile_scale(script, profile)
+
+    section_tl = timeline.sections[section_index]
+    section_map = {section.id: section for section in script.sections}
+    layout = layout or _layout_plan(script, render_scale)
+    watermark_input = _add_watermark_input(script, inputs)
+
+    filter_parts: List[str] = []
+    # The graph is standalone, so labels do not carry the section index and
+    # identical sections produce identical commands (one cache entry).
+    video_label = _build_section_chain(
+        0,
+        section_tl,
+        section_map.get(section_tl.id),
+        script,
+        inputs,
+        filter_parts,
+        render_scale,
+        backgrounds,
+        _output_fps(script, profile),
+        layout.section(section_tl.id),
+    )
+    video_label = _apply_global_overlays(
+        video_label,
+        script,
+        timeline,
+        watermark_input,
+        filter_parts,
+        offset=section_tl.start_sec,
+        span=max(section_tl.duration_sec, 0.1),
+        render_scale=render_scale,
+    )
+
+    # Optimized first: merging overlays can change the input list.
+    graph = _optimized_graph(inputs, filter_parts, [video_label])
+    encoder_args = _video_encoder_args(profile)
+    if "-pix_fmt" not in encoder_args:
+        # Every clip needs the same pixel format for the stream-copy concat.
+        encoder_args.extend(["-pix_fmt", "yuv420p"])
     command = [
         ffmpeg_path,
         "-y",
-        *input_args,
+        *inputs.args,
         "-filter_complex",
-        filter_complex,
+        graph.serialize(),
         "-map",
         video_label,
+        "-an",
+        *encoder_args,
+        "-r",
+        str(_output_fps(script, profile)),
+    ]
+    if threads:
+        command.extend(["-threads", str(threads)])
+    command.append(str(output_path))
+    return command
+
+
+def build_concat_command(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    concat_list_path: Path,
+    output_path: Path,
+    ffmpeg_path: str = "ffmpeg",
+    profile: RenderProfile | None = None,
+    audio_track: Path | None = None,
+) -> List[str]:
+    """Join section clips listed in ``concat_list_path`` with stream copy and mux narration/BGM.
+
+    With ``audio_track`` (a pre-rendered track from ``audio_stage``) both streams
+    are copied and no filter graph runs at all.
+    """
+    inputs = _InputRegistry()
+    inputs.add(["-f", "concat", "-safe", "0", "-i", str(concat_list_path)])
+    if audio_track is not None:
+        return [
+            ffmpeg_path,
+            "-y",
+            *inputs.args,
+            "-i",
+            str(audio_track),
+            "-map",
+            "0:v",
+            "-map",
+            "1:a:0",
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            "-shortest",
+            str(output_path),
+        ]
+
+    voice_inputs, bgm_input = _add_audio_inputs(script, timeline, inputs)
+    filter_parts: List[str] = []
+    audio_output_label = _build_audio_filters(script, timeline, voice_inputs, bgm_input, filter_parts)
+
+    return [
+        ffmpeg_path,
+        "-y",
+        *inputs.args,
+        "-filter_complex",
+        _optimized_graph(inputs, filter_parts, [audio_output_label]).serialize(),
+        "-map",
+        "0:v",
         "-map",
         audio_output_label,
         "-c:v",
-        "libx264",
-        "-preset",
-        "medium",
-        "-crf",
-        "18",
-        "-c:a",
-        "aac",
+        "copy",
+        *_audio_encoder_args(profile),
         "-shortest",
         str(output_path),
     ]
-    return command
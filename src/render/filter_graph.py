@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Filters that leave the sample aspect ratio of their (main) input untouched.
+_SAR_PRESERVING = {
+    "trim", "setpts", "fps", "format", "null", "split", "crop", "pad", "overlay", "drawtext",
+    "eq", "hue", "gblur", "vignette", "colorchannelmixer",
+}
+# Filters where applying the same arguments twice in a row equals applying them once.
+_IDEMPOTENT = {"setsar", "format", "fps", "setpts", "asetpts", "aformat"}
+_NOOP = {
+    ("setpts", "PTS"),
+    ("asetpts", "PTS"),
+    ("null", ""),
+    ("anull", ""),
+    ("scale", "iw:ih"),
+    ("scale", "iw*1:ih*1"),
+    ("volume", "1"),
+    ("volume", "1.0"),
+    ("volume", "0dB"),
+}
+# Options that compose multiplicatively (m) or additively (a) when two filters are chained.
+_FUSABLE = {
+    "eq": {"contrast": "m", "saturation": "m"},
+    "hue": {"s": "m", "h": "a"},
+}
+# Overlay options a merged overlay can carry over; anything else keeps the overlays apart.
+_OVERLAY_OPTIONS = {"format", "shortest", "eof_action", "enable"}
+
+# Flattens ``(label, x, y)`` overlay streams into one; returns its label and position, or None.
+OverlayComposer = Callable[[List[Tuple[str, int, int]]], Optional[Tuple[str, int, int]]]
+
+
+def _split_top_level(text: str, separators: str) -> List[str]:
+    """Split ``text`` on ``separators`` the way ffmpeg's av_get_token does.
+
+    Outside quotes a backslash escapes the next character; inside single quotes
+    everything is literal up to the closing quote.
+    """
+    parts: List[str] = []
+    current: List[str] = []
+    quoted = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quoted:
+            current.append(ch)
+            if ch == "'":
+                quoted = False
+        elif ch == "\\" and i + 1 < len(text):
+            current.append(text[i : i + 2])
+            i += 1
+        elif ch == "'":
+            quoted = True
+            current.append(ch)
+        elif ch in separators:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    parts.append("".join(current))
+    return parts
+
+
+def _read_labels(text: str, pos: int) -> Tuple[List[str], int]:
+    labels: List[str] = []
+    while pos < len(text) and text[pos] == "[":
+        end = text.index("]", pos)
+        labels.append(text[pos + 1 : end])
+        pos = end + 1
+    return labels, pos
+
+
+def _overlay_placement(node: "FilterNode") -> Optional[Tuple[int, int, Dict[str, str]]]:
+    """Integer ``x``/``y`` of an ``overlay`` and its remaining options, or None."""
+    options: Dict[str, str] = {}
+    positional: List[str] = []
+    for item in _split_top_level(node.args, ":") if node.args else []:
+        key, sep, value = item.partition("=")
+        if sep:
+            options[key] = value
+        else:
+            positional.append(item)
+    if len(positional) > 2:
+        return None
+    for key, value in zip(("x", "y"), positional):
+        options.setdefault(key, value)
+    try:
+        x, y = int(options.pop("x")), int(options.pop("y"))
+    except (KeyError, ValueError):
+        return None
+    if not set(options) <= _OVERLAY_OPTIONS:
+        return None
+    return x, y, options
+
+
+def _args_end(text: str, pos: int) -> int:
+    """Index of the first unquoted, unescaped ``[`` at or after ``pos``."""
+    quoted = False
+    while pos < len(text):
+        ch = text[pos]
+        if quoted:
+            quoted = ch != "'"
+        elif ch == "\\":
+            pos += 1
+        elif ch == "'":
+            quoted = True
+        elif ch == "[":
+            return pos
+        pos += 1
+    return len(text)
+
+
+@dataclass
+class FilterNode:
+    """One filter instance with its input and output pad labels (in pad order)."""
+
+    name: str
+    args: str = ""
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+    def render(self) -> str:
+        return f"{self.name}={self.args}" if self.args else self.name
+
+    def options(self) -> Optional[Dict[str, str]]:
+        """``key=value`` options, or None when the filter uses positional arguments."""
+        result: Dict[str, str] = {}
+        for item in _split_top_level(self.args, ":") if self.args else []:
+            key, sep, value = item.partition("=")
+            if not sep:
+                return None
+            result[key] = value
+        return result
+
+
+@dataclass
+class FilterGraph:
+    """Small object model of a ``-filter_complex`` graph.
+
+    Every link between filters is a named label; links that were implicit in the
+    source string (``a,b``) get internal ``@N`` names and are folded back into
+    chains by :meth:`serialize`.
+    """
+
+    nodes: List[FilterNode] = field(default_factory=list)
+    _anon: int = 0
+
+    # -- construction -------------------------------------------------
+
+    @classmethod
+    def parse(cls, chains: Iterable[str]) -> "FilterGraph":
+        graph = cls()
+        for statement in chains:
+            for chain in _split_top_level(statement, ";"):
+                chain = chain.strip()
+                if chain:
+                    graph._parse_chain(chain)
+        return graph
+
+    def _new_label(self) -> str:
+        self._anon += 1
+        return f"@{self._anon}"
+
+    def _parse_chain(self, chain: str) -> None:
+        previous: Optional[FilterNode] = None
+        for segment in _split_top_level(chain, ","):
+            segment = segment.strip()
+            inputs, pos = _read_labels(segment, 0)
+            end = _args_end(segment, pos)
+            spec = segment[pos:end]
+            outputs, _ = _read_labels(segment, end)
+            name, _, args = spec.partition("=")
+            node = FilterNode(name=name.strip(), args=args, inputs=inputs, outputs=outputs)
+            if previous is not None and not previous.outputs:
+                link = self._new_label()
+                previous.outputs.append(link)
+                node.inputs.append(link)
+            self.nodes.append(node)
+            previous = node
+
+    # -- queries --------------------------------------------------------
+
+    def _consumers(self) -> Dict[str, List[FilterNode]]:
+        consumers: Dict[str, List[FilterNode]] = {}
+        for node in self.nodes:
+            for label in node.inputs:
+                consumers.setdefault(label, []).append(node)
+        return consumers
+
+    def _producers(self) -> Dict[str, FilterNode]:
+        return {label: node for node in self.nodes for label in node.outputs}
+
+    # -- passes -----------------------------------------------------------
+
+    def optimize(self, keep: Iterable[str], compose_overlays: Optional[OverlayComposer] = None) -> Dict[str, int]:
+        """Run all passes; ``keep`` are the labels passed to ``-map``.
+
+        Overlays are only merged when ``compose_overlays`` is given, because
+        flattening images needs the inputs behind the labels.
+        """
+        keep_set = {label.strip("[]") for label in keep}
+        stats = {
+            "dead_removed": self.remove_dead(keep_set),
+            "noops_dropped": self.drop_noops(keep_set),
+            "filters_fused": self.fuse_color_filters(keep_set),
+            "overlays_merged": self.merge_overlays(keep_set, compose_overlays) if compose_overlays else 0,
+        }
+        stats["dead_removed"] += self.remove_dead(keep_set)
+        return stats
+
+    def remove_dead(self, keep: Set[str]) -> int:
+        """Drop filters whose outputs nobody consumes, trimming unused split branches."""
+        removed = 0
+        changed = True
+        while changed:
+            changed = False
+            consumers = self._consumers()
+            for node in list(self.nodes):
+                live = [label for label in node.outputs if label in consumers or label in keep]
+                if len(live) == len(node.outputs):
+                    continue
+                if node.name in {"split", "asplit"} and live:
+                    node.outputs = live
+                    node.args = str(len(live))
+                    if len(live) == 1:
+                        self._bypass(node)
+                        removed += 1
+                    changed = True
+                    continue
+                if not live and node.outputs:
+                    self.nodes.remove(node)
+                    removed += 1
+                    changed = True
+        return removed
+
+    def _bypass(self, node: FilterNode) -> None:
+        source = node.inputs[0]
+        for other in self.nodes:
+            other.inputs = [source if label == node.outputs[0] else label for label in other.inputs]
+        self.nodes.remove(node)
+
+    def _can_bypass(self, node: FilterNode, keep: Set[str]) -> bool:
+        if len(node.inputs) != 1 or len(node.outputs) != 1:
+            return False
+        if node.outputs[0] not in keep:
+            return True
+        # A mapped output can only move upstream when a filter (not an input stream) feeds it.
+        producer = self._producers().get(node.inputs[0])
+        return producer is not None and len(self._consumers().get(node.inputs[0], [])) == 1
+
+    def _drop(self, node: FilterNode, keep: Set[str]) -> None:
+        if node.outputs[0] in keep:
+            producer = self._producers()[node.inputs[0]]
+            producer.outputs = [node.outputs[0] if label == node.inputs[0] else label for label in producer.outputs]
+            self.nodes.remove(node)
+        else:
+            self._bypass(node)
+
+    def _sar_already_square(self, label: str, producers: Dict[str, FilterNode]) -> bool:
+        node = producers.get(label)
+        while node is not None:
+            if node.name == "setsar" and node.args in {"1", "1/1", "sar=1"}:
+                return True
+            if node.name not in _SAR_PRESERVING or not node.inputs:
+                return False
+            node = producers.get(node.inputs[0])
+        return False
+
+    def drop_noops(self, keep: Set[str]) -> int:
+        """Remove identity filters, repeated idempotent filters and redundant ``setsar=1``."""
+        dropped = 0
+        for node in list(self.nodes):
+            if not self._can_bypass(node, keep):
+                continue
+            producers = self._producers()
+            upstream = producers.get(node.inputs[0])
+            redundant = (node.name, node.args) in _NOOP
+            if not redundant and upstream is not None and node.name in _IDEMPOTENT:
+                redundant = upstream.name == node.name and upstream.args == node.args
+            if not redundant and node.name == "setsar" and node.args in {"1", "1/1", "sar=1"}:
+                redundant = self._sar_already_square(node.inputs[0], producers)
+            if redundant:
+                self._drop(node, keep)
+                dropped += 1
+        return dropped
+
+    def fuse_color_filters(self, keep: Set[str]) -> int:
+        """Fold back-to-back ``eq``/``hue`` filters with the same ``enable`` window into one."""
+        fused = 0
+        for node in list(self.nodes):
+            rules = _FUSABLE.get(node.name)
+            if rules is None or not self._can_bypass(node, keep):
+                continue
+            producers = self._producers()
+            upstream = producers.get(node.inputs[0])
+            if upstream is None or upstream.name != node.name or len(upstream.outputs) != 1:
+                continue
+            if len(self._consumers().get(node.inputs[0], [])) != 1:
+                continue
+            first, second = upstream.options(), node.options()
+            if first is None or second is None or first.get("enable") != second.get("enable"):
+                continue
+            keys = (set(first) | set(second)) - {"enable"}
+            if not keys <= set(rules):
+                continue
+            merged: Dict[str, str] = {}
+            try:
+                for key in sorted(keys):
+                    identity = 1.0 if rules[key] == "m" else 0.0
+                    a = float(first.get(key, identity))
+                    b = float(second.get(key, identity))
+                    merged[key] = f"{a * b if rules[key] == 'm' else a + b:g}"
+            except ValueError:
+                continue
+            if "enable" in first:
+                merged["enable"] = first["enable"]
+            upstream.args = ":".join(f"{key}={value}" for key, value in merged.items())
+            self._drop(node, keep)
+            fused += 1
+        return fused
+
+    def merge_overlays(self, keep: Set[str], compose: OverlayComposer) -> int:
+        """Collapse runs of back-to-back overlays into one overlay of a flattened image.
+
+        A run is a chain of ``overlay`` filters, each feeding the next one's main
+        pad, with integer positions and the same options (``format`` aside).
+        ``compose`` receives the overlaid labels with their positions and returns
+        the label and position of one stream holding them all, or None to leave
+        the run alone. Blending is associative, so the frame is unchanged while
+        each merged image saves a full-frame blend per frame.
+        """
+        merged = 0
+        for node in list(self.nodes):
+            if node not in self.nodes or node.name != "overlay" or len(node.inputs) != 2:
+                continue
+            placement = _overlay_placement(node)
+            if placement is None:
+                continue
+            options = {k: v for k, v in placement[2].items() if k != "format"}
+            run = [(node, placement)]
+            consumers = self._consumers()
+            current = node
+            while len(current.outputs) == 1 and current.outputs[0] not in keep:
+                users = consumers.get(current.outputs[0], [])
+                if len(users) != 1 or users[0].name != "overlay" or users[0].inputs[:1] != current.outputs:
+                    break
+                following = _overlay_placement(users[0])
+                if following is None or len(users[0].inputs) != 2:
+                    break
+                if {k: v for k, v in following[2].items() if k != "format"} != options:
+                    break
+                run.append((users[0], following))
+                current = users[0]
+            if len(run) < 2:
+                continue
+            composed = compose([(n.inputs[1], x, y) for n, (x, y, _) in run])
+            if composed is None:
+                continue
+            label, x, y = composed
+            last = run[-1][0]
+            node.inputs = [node.inputs[0], label]
+            node.args = ":".join([f"x={x}", f"y={y}", *(f"{k}={v}" for k, v in placement[2].items())])
+            node.outputs = list(last.outputs)
+            for other, _ in run[1:]:
+                self.nodes.remove(other)
+            merged += len(run) - 1
+        return merged
+
+    def relabel(self, mapping: Dict[str, str]) -> None:
+        """Rename pad labels, e.g. input streams after inputs were renumbered."""
+        for node in self.nodes:
+            node.inputs = [mapping.get(label, label) for label in node.inputs]
+            node.outputs = [mapping.get(label, label) for label in node.outputs]
+
+    # -- output -------------------------------------------------------------
+
+    def serialize(self, separator: str = ";") -> str:
+        """Render the graph, folding single-use links back into ``a,b`` chains."""
+        consumers = self._consumers()
+        chains: List[List[FilterNode]] = []
+        for node in self.nodes:
+            previous = chains[-1][-1] if chains else None
+            if (
+                previous is not None
+                and len(previous.outputs) == 1
+                and node.inputs == previous.outputs
+                and len(consumers.get(node.inputs[0], [])) == 1
+            ):
+                chains[-1].append(node)
+            else:
+                chains.append([node])
+        return separator.join(
+            "".join(f"[{label}]" for label in chain[0].inputs)
+            + ",".join(node.render() for node in chain)
+            + "".join(f"[{label}]" for label in chain[-1].outputs)
+            for chain in chains
+        )
+
+    def digest(self) -> str:
+        """Stable hash of the optimized graph (for caching and benchmarks)."""
+        return hashlib.sha1(self.serialize().encode("utf-8")).hexdigest()
+
+    def write_script(self, path: Path) -> Path:
+        """Write the graph for ``-filter_complex_script`` (one chain per line)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.serialize(separator=";\n") + "\n", encoding="utf-8")
+        return path
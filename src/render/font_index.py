@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+FONT_INDEX_VERSION = 1
+FONT_SUFFIXES = {".ttf", ".ttc", ".otf"}
+_FC_FORMAT = "%{file}\\t%{index}\\t%{family}\\t%{style}\\t%{lang}\\n"
+
+# Where fontconfig keeps its caches; any change there means fonts were added or removed.
+FONTCONFIG_CACHE_DIRS = [
+    Path.home() / ".cache" / "fontconfig",
+    Path.home() / ".fontconfig",
+    Path("/var/cache/fontconfig"),
+    Path("/usr/lib/fontconfig/cache"),
+    Path("/opt/homebrew/var/cache/fontconfig"),
+    Path("/usr/local/var/cache/fontconfig"),
+]
+# Scanned directly when fc-list is not installed (stock macOS).
+SYSTEM_FONT_DIRS = [
+    Path("/System/Library/Fonts"),
+    Path("/Library/Fonts"),
+    Path.home() / "Library" / "Fonts",
+    Path("/usr/share/fonts"),
+    Path.home() / ".fonts",
+    Path.home() / ".local" / "share" / "fonts",
+]
+# Preferred when a Japanese name has no exact match (previous macOS fallbacks first).
+_JAPANESE_PREFERENCE = ["hiraginosans", "ヒラギノ角ゴシック", "notosanscjkjp", "notosansjp", "ipaexgothic", "arialunicodems"]
+_JAPANESE_NAME_HINTS = ("jp", "cjk", "hiragino", "ipaex", "ipagothic", "ipamincho", "meiryo")
+_REGULAR_STYLES = ("regular", "normal", "book", "w4", "w3", "medium", "roman")
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[\s\-_]+", "", name).casefold()
+
+
+def _looks_japanese(name: str) -> bool:
+    normalized = _normalize(name)
+    return any(ord(ch) > 0x2E7F for ch in name) or any(hint in normalized for hint in _JAPANESE_NAME_HINTS)
+
+
+@dataclass
+class FontRecord:
+    path: str
+    families: List[str]
+    style: str = ""
+    index: int = 0
+    japanese: bool = False
+
+
+@dataclass
+class FontIndex:
+    """Name -> file lookup built from one ``fc-list`` scan (or a font directory walk).
+
+    ``fingerprint`` captures the fontconfig cache directories; a stored index is
+    reused until it changes, so resolving a font name never spawns a process.
+    """
+
+    fingerprint: str
+    records: List[FontRecord] = field(default_factory=list)
+    _by_name: Dict[str, List[FontRecord]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for record in self.records:
+            for family in record.families:
+                self._by_name.setdefault(_normalize(family), []).append(record)
+                if record.style:
+                    self._by_name.setdefault(_normalize(f"{family} {record.style}"), []).append(record)
+
+    @staticmethod
+    def _pick(candidates: Iterable[FontRecord]) -> Optional[FontRecord]:
+        ranked = sorted(
+            candidates,
+            key=lambda r: (
+                next((i for i, s in enumerate(_REGULAR_STYLES) if s in r.style.casefold()), len(_REGULAR_STYLES)),
+                r.index,
+                r.path,
+            ),
+        )
+        return ranked[0] if ranked else None
+
+    def japanese_fallback(self) -> Optional[FontRecord]:
+        japanese = [r for r in self.records if r.japanese]
+        for preferred in _JAPANESE_PREFERENCE:
+            match = self._pick(r for r in japanese if any(preferred in _normalize(f) for f in r.families))
+            if match:
+                return match
+        return self._pick(japanese)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Path for a family (optionally "Family Style") name.
+
+        Japanese-looking names only match fonts that cover Japanese, so "Noto
+        Sans JP" never silently becomes a Latin-only font. Unknown names fall
+        back to the best Japanese face (captions are Japanese), then to any font.
+        """
+        candidates = self._by_name.get(_normalize(name), [])
+        if _looks_japanese(name):
+            candidates = [r for r in candidates if r.japanese]
+        match = self._pick(candidates) or self.japanese_fallback() or self._pick(self.records)
+        return match.path if match else None
+
+    def to_json(self) -> str:
+        payload = {
+            "version": FONT_INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "records": [asdict(record) for record in self.records],
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def fontconfig_fingerprint(dirs: Optional[List[Path]] = None) -> str:
+    parts = [f"v{FONT_INDEX_VERSION}", sys.platform]
+    for directory in dirs if dirs is not None else FONTCONFIG_CACHE_DIRS + SYSTEM_FONT_DIRS:
+        try:
+            parts.append(f"{directory}|{directory.stat().st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def parse_fc_list(output: str) -> List[FontRecord]:
+    records: List[FontRecord] = []
+    for line in output.splitlines():
+        fields = line.split("\t")
+        if len(fields) < 5 or Path(fields[0]).suffix.lower() not in FONT_SUFFIXES:
+            continue
+        path, index, families, style, langs = fields[:5]
+        records.append(
+            FontRecord(
+                path=path,
+                families=[f for f in families.split(",") if f],
+                style=style.split(",")[0],
+                index=int(index) if index.isdigit() else 0,
+                japanese="ja" in langs.split("|"),
+            )
+        )
+    return records
+
+
+def _scan_directories(dirs: List[Path]) -> List[FontRecord]:
+    try:
+        from PIL import ImageFont
+    except ImportError:
+        ImageFont = None  # type: ignore[assignment]
+    records: List[FontRecord] = []
+    for directory in dirs:
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.rglob("*")):
+            if path.suffix.lower() not in FONT_SUFFIXES:
+                continue
+            family, style = path.stem, ""
+            if ImageFont is not None:
+                try:
+                    family, style = ImageFont.truetype(str(path), size=12).getname()
+                except Exception:
+                    pass
+            families = list(dict.fromkeys([family, path.stem]))
+            # Without fontconfig there is no lang list; go by the names.
+            japanese = any(_looks_japanese(name) for name in families)
+            records.append(FontRecord(path=str(path), families=families, style=style or "", japanese=japanese))
+    return records
+
+
+def scan_fonts(fc_list: str = "fc-list") -> List[FontRecord]:
+    """One ``fc-list`` call; falls back to walking the system font directories."""
+    try:
+        result = subprocess.run([fc_list, "--format", _FC_FORMAT], capture_output=True, text=True, timeout=30)
+        if result.returncode == 0 and result.stdout.strip():
+            return parse_fc_list(result.stdout)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        pass
+    return _scan_directories(SYSTEM_FONT_DIRS)
+
+
+def load_font_index(
+    index_path: Path,
+    *,
+    fingerprint: Optional[str] = None,
+    scan=scan_fonts,
+) -> FontIndex:
+    """Stored index if its fingerprint still matches, else a fresh scan (saved atomically)."""
+    fingerprint = fingerprint or fontconfig_fingerprint()
+    try:
+        payload = json.loads(index_path.read_text(encoding="utf-8"))
+        if payload.get("version") == FONT_INDEX_VERSION and payload.get("fingerprint") == fingerprint:
+            return FontIndex(fingerprint, [FontRecord(**item) for item in payload.get("records", [])])
+    except (OSError, ValueError, TypeError):
+        pass
+
+    index = FontIndex(fingerprint, scan())
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(index.to_json(), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+    return index
+
+
+_INDEX: Optional[FontIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_font_index(index_path: Path) -> FontIndex:
+    """Process-wide index, loaded (or built) on first use."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = load_font_index(index_path)
+    return _INDEX
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class _LRU:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FontMetrics:
+    """Cached FreeType faces and text measurements shared by the renderers.
+
+    Faces are kept per ``(path, size)`` and line boxes per
+    ``(text, path, size, stroke)``, so fitting many segments in the same font
+    loads each face once. Widths include the stroke, matching what
+    ``ImageDraw.text`` draws.
+    """
+
+    def __init__(self, max_faces: int = 64, max_lines: int = 8192) -> None:
+        self._faces = _LRU(max_faces)
+        self._boxes = _LRU(max_lines)
+
+    def face(self, font_path: str, size: int) -> Any:
+        key = (font_path, size)
+        font = self._faces.get(key)
+        if font is None:
+            from PIL import ImageFont
+
+            font = ImageFont.truetype(font_path, size=size)
+            self._faces.put(key, font)
+        return font
+
+    def line_size(self, line: str, font_path: str, size: int, stroke_width: int = 0) -> Tuple[int, int]:
+        """(width, height) of one line's bounding box; same as ``ImageDraw.textbbox`` at (0, 0)."""
+        stroke = max(0, stroke_width)
+        key = (line, font_path, size, stroke)
+        box = self._boxes.get(key)
+        if box is None:
+            left, top, right, bottom = self.face(font_path, size).getbbox(line, stroke_width=stroke)
+            box = (right - left, bottom - top)
+            self._boxes.put(key, box)
+        return box
+
+    def max_line_width(self, text: str, font_path: str, size: int, stroke_width: int = 0) -> int:
+        widths = [self.line_size(line, font_path, size, stroke_width)[0] for line in text.split("\n") if line.strip()]
+        return max(widths) if widths else 0
+
+    def fits(self, text: str, font_path: str, size: int, max_width: int, stroke_width: int = 0) -> bool:
+        return self.max_line_width(text, font_path, size, stroke_width) <= max_width
+
+    def fit_font_size(
+        self,
+        text: str,
+        font_path: str,
+        fontsize: int,
+        max_width: int,
+        *,
+        min_fontsize: int = 40,
+        stroke_width: int = 0,
+    ) -> int:
+        """Largest size in ``[min_fontsize, fontsize]`` whose widest line fits ``max_width``.
+
+        Binary search, so about log2(fontsize - min_fontsize) measurements
+        instead of one per 10% step. Returns ``min_fontsize`` when nothing fits.
+        """
+        high = max(fontsize, min_fontsize)
+        if self.fits(text, font_path, high, max_width, stroke_width):
+            return high
+        low = min_fontsize
+        best: Optional[int] = None
+        while low <= high:
+            mid = (low + high) // 2
+            if self.fits(text, font_path, mid, max_width, stroke_width):
+                best = mid
+                low = mid + 1
+            else:
+                high = mid - 1
+        return best if best is not None else min_fontsize
+
+
+_DEFAULT: Optional[FontMetrics] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_font_metrics() -> FontMetrics:
+    """Process-wide :class:`FontMetrics` instance."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        with _DEFAULT_LOCK:
+            if _DEFAULT is None:
+                _DEFAULT = FontMetrics()
+    return _DEFAULT
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import timing
+from src.models import ScriptModel, TextPosition, TextStyle
+from src.render import ffmpeg_runner
+from src.render.text_cache import _font_token
+
+# Bump when the placement rules below change so stored plans are not reused.
+LAYOUT_PLAN_VERSION = 1
+
+
+@dataclass
+class CaptionLayout:
+    """One rasterized caption: final fontsize/line breaks, canvas size and frame position."""
+
+    text: str
+    lines: List[str]
+    fontsize: int
+    width: int
+    height: int
+    x: int
+    y: int
+    image: str
+    font_path: str
+    fill: str
+    stroke_color: str
+    stroke_width: int
+
+
+@dataclass
+class SectionLayout:
+    """Captions of one section plus the single layer the renderer overlays."""
+
+    section_id: str
+    captions: List[CaptionLayout] = field(default_factory=list)
+    layer: str = ""
+    x: int = 0
+    y: int = 0
+
+    def pieces(self) -> List[Tuple[str, int, int, int, int]]:
+        return [(c.image, c.x, c.y, c.width, c.height) for c in self.captions]
+
+
+@dataclass
+class LayoutPlan:
+    """Caption layout for a whole script at one render scale.
+
+    Built once per script (see :func:`get_layout_plan`) and shared by the
+    single-graph render, section clips and the snapshot tool, so text is
+    measured and rasterized in one place.
+    """
+
+    key: str
+    width: int
+    height: int
+    render_scale: float
+    sections: List[SectionLayout] = field(default_factory=list)
+
+    def section(self, section_id: str) -> Optional[SectionLayout]:
+        return next((s for s in self.sections if s.section_id == section_id), None)
+
+    def images(self) -> List[str]:
+        paths = [c.image for s in self.sections for c in s.captions]
+        paths.extend(s.layer for s in self.sections)
+        return paths
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": LAYOUT_PLAN_VERSION, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LayoutPlan":
+        sections = [
+            SectionLayout(
+                section_id=s["section_id"],
+                captions=[CaptionLayout(**c) for c in s.get("captions", [])],
+                layer=s.get("layer", ""),
+                x=s.get("x", 0),
+                y=s.get("y", 0),
+            )
+            for s in data.get("sections", [])
+        ]
+        return cls(
+            key=data["key"],
+            width=data["width"],
+            height=data["height"],
+            render_scale=data["render_scale"],
+            sections=sections,
+        )
+
+
+def _scaled_style(style: TextStyle, scale: float) -> TextStyle:
+    styled = style.model_copy(deep=True)
+    if scale != 1.0:
+        styled.fontsize = int(round((styled.fontsize or 0) * scale))
+        if styled.stroke and styled.stroke.width is not None:
+            styled.stroke.width = max(1, int(round(styled.stroke.width * scale)))
+    return styled
+
+
+def _segment_parts(seg: Any) -> Tuple[str, Optional[TextStyle]]:
+    # Segments may still be plain dicts when the YAML bypassed validation.
+    if isinstance(seg, dict):
+        seg_style_raw = seg.get("style")
+        try:
+            seg_style = TextStyle.model_validate(seg_style_raw) if seg_style_raw else None
+        except Exception:
+            seg_style = None
+        return str(seg.get("text", "") or ""), seg_style
+    return str(getattr(seg, "text", "") or ""), getattr(seg, "style", None)
+
+
+def _base_y(base_pos: TextPosition, target_h: int, img_h: int, scale: float, render_scale: float) -> int:
+    if isinstance(base_pos.y, int):
+        return int(round(base_pos.y * scale))
+    if isinstance(base_pos.y, str) and base_pos.y.startswith("center"):
+        delta = 0
+        token = base_pos.y[len("center"):]
+        if token:
+            try:
+                delta = int(round(int(token) * render_scale))
+            except Exception:
+                delta = 0
+        return int(target_h / 2 - img_h / 2 + delta)
+    try:
+        return int(float(base_pos.y) * render_scale)
+    except Exception:
+        return 0
+
+
+def _caption_x(align: str, target_w: int, img_w: int, margin: int, off_x: int) -> int:
+    if align == "left":
+        return off_x + margin
+    if align == "right":
+        return target_w - img_w - (off_x + margin)
+    return int((target_w - img_w) / 2) + off_x
+
+
+def _rasterize(
+    text: str, style: TextStyle, line_gap_px: int, max_width: int | None, escape: bool = True
+) -> CaptionLayout:
+    font_path = ffmpeg_runner._resolve_font_path(style.font)
+    stroke_width = style.stroke.width or 0
+    image, width, height = ffmpeg_runner._render_text_image(
+        ffmpeg_runner._escape_text(text) if escape else text,
+        font_path,
+        style.fontsize,
+        style.fill,
+        style.stroke.color,
+        stroke_width,
+        line_gap_px,
+        max_width=max_width,
+    )
+    # The text cache sidecar records the fitted size and line breaks.
+    fontsize, lines = style.fontsize, ffmpeg_runner._split_lines(text)
+    try:
+        meta = json.loads(Path(image).with_suffix(".json").read_text(encoding="utf-8"))
+        fontsize, lines = int(meta["fontsize"]), list(meta["lines"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return CaptionLayout(
+        text=text,
+        lines=lines,
+        fontsize=fontsize,
+        width=width,
+        height=height,
+        x=0,
+        y=0,
+        image=image,
+        font_path=font_path,
+        fill=style.fill,
+        stroke_color=style.stroke.color,
+        stroke_width=stroke_width,
+    )
+
+
+def layout_section(
+    script: ScriptModel,
+    section_id: str,
+    on_screen_text: str,
+    segments: List[Any] | None = None,
+    text_layout: str | None = None,
+    render_scale: float = 1.0,
+) -> SectionLayout:
+    """Measure, rasterize and place the captions of one section.
+
+    With ``segments`` the first is styled as the emphasis tier and the rest as
+    body, stacked from the layout's base position and fitted to 90% of the frame
+    width; otherwise ``on_screen_text`` is drawn with the script's text style.
+    """
+    target_w, target_h = ffmpeg_runner._render_size(script, render_scale)
+    margin = int(round(60 * render_scale))
+    layout = ffmpeg_runner._get_layout(text_layout)
+    base_pos = TextPosition(
+        x=str(layout.get("base_position", {}).get("x", "center")),
+        y=str(layout.get("base_position", {}).get("y", "center-120")),
+    )
+    align = layout.get("align", "center")
+    rank_offset = layout.get("rank_offset", {})
+    body_offset = layout.get("body_offset", {})
+    scale = ffmpeg_runner._short_scale(script) * render_scale
+    line_gap_px = int(round(8 * scale))
+
+    result = SectionLayout(section_id=section_id)
+    if segments:
+        line_offset = 0
+        for seg_idx, seg in enumerate(segments):
+            tier = "emphasis" if seg_idx == 0 else "body"
+            seg_text, seg_style_obj = _segment_parts(seg)
+            seg_style = ffmpeg_runner._apply_tier_style(
+                ffmpeg_runner._segment_style(script.text_style, seg_style_obj), tier
+            )
+            offset = rank_offset if seg_idx == 0 else body_offset
+            off_x = int(round(offset.get("x", 0) * render_scale))
+            off_y = int(round(offset.get("y", 0) * render_scale))
+
+            caption = _rasterize(seg_text, _scaled_style(seg_style, scale), line_gap_px, int(target_w * 0.9))
+            caption.x = _caption_x(align, target_w, caption.width, margin, off_x)
+            caption.y = _base_y(base_pos, target_h, caption.height, scale, render_scale) + line_offset + off_y
+            result.captions.append(caption)
+            line_offset += caption.height + line_gap_px
+    else:
+        caption = _rasterize(on_screen_text, _scaled_style(script.text_style, scale), line_gap_px, None)
+        caption.x = _caption_x(align, target_w, caption.width, margin, 0)
+        caption.y = _base_y(base_pos, target_h, caption.height, scale, render_scale)
+        result.captions.append(caption)
+
+    # All captions go onto one RGBA layer so the section costs a single overlay pass.
+    result.layer, result.x, result.y = ffmpeg_runner._composite_text_layer(result.pieces())
+    return result
+
+
+def layout_text_block(
+    lines: List[str], style: TextStyle, width: int, height: int, line_gap_px: int, margin: int = 0
+) -> List[CaptionLayout]:
+    """Rasterize ``lines`` one caption each and center them as a block in a ``width``x``height`` frame.
+
+    For text outside a script, such as title thumbnails; the captions come from
+    the same text cache as the plan's, so repeated titles are not re-measured.
+    """
+    captions = [_rasterize(line, style, line_gap_px, None, escape=False) for line in lines if line.strip()]
+    total = sum(c.height for c in captions) + line_gap_px * max(len(captions) - 1, 0)
+    y = max(margin, (height - total) // 2)
+    for caption in captions:
+        caption.x = max(margin, (width - caption.width) // 2)
+        caption.y = y
+        y += caption.height + line_gap_px
+    return captions
+
+
+def _segment_payload(seg: Any) -> Any:
+    return seg if isinstance(seg, dict) else seg.model_dump(mode="json")
+
+
+def layout_plan_key(script: ScriptModel, render_scale: float) -> str:
+    """Content hash over everything that affects caption pixels or positions."""
+    fonts = {script.text_style.font}
+    sections = []
+    for section in script.sections:
+        segments = [_segment_payload(seg) for seg in section.on_screen_segments]
+        for seg in segments:
+            font = (seg.get("style") or {}).get("font")
+            if font:
+                fonts.add(font)
+        sections.append(
+            {
+                "id": section.id,
+                "text": section.on_screen_text,
+                "segments": segments,
+                "layout": ffmpeg_runner._get_layout(section.text_layout),
+            }
+        )
+    payload = {
+        "version": LAYOUT_PLAN_VERSION,
+        "size": [script.video.width, script.video.height],
+        "render_scale": render_scale,
+        "text_style": script.text_style.model_dump(mode="json"),
+        "sections": sections,
+        "fonts": sorted(_font_token(ffmpeg_runner._resolve_font_path(font)) for font in fonts),
+        # Plans point at PNGs in the text cache, so they belong to that cache.
+        "text_cache": str(ffmpeg_runner._cache_dir("text")),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@timing.timed("layout.plan")
+def build_layout_plan(script: ScriptModel, render_scale: float = 1.0, key: str | None = None) -> LayoutPlan:
+    width, height = ffmpeg_runner._render_size(script, render_scale)
+    plan = LayoutPlan(
+        key=key or layout_plan_key(script, render_scale),
+        width=width,
+        height=height,
+        render_scale=render_scale,
+    )
+    for section in script.sections:
+        plan.sections.append(
+            layout_section(
+                script,
+                section.id,
+                section.on_screen_text,
+                section.on_screen_segments,
+                section.text_layout,
+                render_scale,
+            )
+        )
+    return plan
+
+
+def _complete(plan: LayoutPlan) -> bool:
+    # Text cache eviction may have removed a PNG the plan points at.
+    return all(Path(path).exists() for path in plan.images())
+
+
+def _load_plan(path: Path) -> Optional[LayoutPlan]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != LAYOUT_PLAN_VERSION:
+            return None
+        return LayoutPlan.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_plan(path: Path, plan: LayoutPlan) -> None:
+    try:
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(plan.to_dict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+_PLANS: Dict[str, LayoutPlan] = {}
+_PLANS_LOCK = threading.Lock()
+
+
+def get_layout_plan(script: ScriptModel, render_scale: float = 1.0) -> LayoutPlan:
+    """Layout plan for ``script``, reused from memory or ``outputs/cache/layout``.
+
+    Plans are keyed by :func:`layout_plan_key`; a stored plan whose images were
+    evicted from the text cache is rebuilt.
+    """
+    key = layout_plan_key(script, render_scale)
+    with _PLANS_LOCK:
+        plan = _PLANS.get(key)
+    if plan is not None and _complete(plan):
+        return plan
+
+    plan_path = ffmpeg_runner._cache_dir("layout") / f"plan_{key}.json"
+    plan = _load_plan(plan_path)
+    if plan is None or plan.key != key or not _complete(plan):
+        plan = build_layout_plan(script, render_scale, key=key)
+        _save_plan(plan_path, plan)
+    with _PLANS_LOCK:
+        _PLANS[key] = plan
+    return plan
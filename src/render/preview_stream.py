@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.models import RenderProfile, ScriptModel
+from src.render.ffmpeg_runner import _output_fps, build_ffmpeg_command
+from src.timeline import TimelineSummary
+
+PLAYLIST_NAME = "stream.m3u8"
+INIT_SEGMENT_NAME = "init.mp4"
+DEFAULT_SEGMENT_SEC = 2.0
+
+
+def stream_dir_for(previews_dir: Path, output_path: Path) -> Path:
+    """``outputs/previews/<output stem>_stream``: one proxy stream per output file."""
+    return previews_dir / f"{output_path.stem}_stream"
+
+
+def stream_output_args(stream_dir: Path, fps: int, segment_sec: float = DEFAULT_SEGMENT_SEC) -> List[str]:
+    """HLS output options for a playlist that can be played while it is written.
+
+    Segments are fragmented MP4 (``init.mp4`` + ``seg_NNNNN.m4s``) so a player can
+    append them to a MediaSource as they appear. Keyframes are forced on every
+    segment boundary, ``event`` keeps earlier segments in the playlist and
+    ``temp_file`` publishes each segment only once it is complete.
+    """
+    gop = max(1, int(round(fps * segment_sec)))
+    return [
+        "-pix_fmt",
+        "yuv420p",
+        "-g",
+        str(gop),
+        "-keyint_min",
+        str(gop),
+        "-sc_threshold",
+        "0",
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{segment_sec:g})",
+        "-f",
+        "hls",
+        "-hls_time",
+        f"{segment_sec:g}",
+        "-hls_playlist_type",
+        "event",
+        "-hls_segment_type",
+        "fmp4",
+        "-hls_fmp4_init_filename",
+        INIT_SEGMENT_NAME,
+        "-hls_segment_filename",
+        str(stream_dir / "seg_%05d.m4s"),
+        "-hls_flags",
+        "independent_segments+temp_file",
+    ]
+
+
+def build_preview_stream_command(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    audio_dir: Path,
+    stream_dir: Path,
+    *,
+    ffmpeg_path: str = "ffmpeg",
+    profile: Optional[RenderProfile] = None,
+    backgrounds: Optional[Dict[str, str]] = None,
+    threads: Optional[int] = None,
+    segment_sec: float = DEFAULT_SEGMENT_SEC,
+) -> List[str]:
+    """Single-graph render command that writes an HLS proxy into ``stream_dir``.
+
+    Same graph as :func:`build_ffmpeg_command` (use a small profile such as
+    ``proxy``); only the muxer differs. Any previous stream in ``stream_dir`` is
+    removed so the player never mixes segments from two renders.
+    """
+    if stream_dir.exists():
+        shutil.rmtree(stream_dir)
+    stream_dir.mkdir(parents=True, exist_ok=True)
+    return build_ffmpeg_command(
+        script=script,
+        timeline=timeline,
+        audio_dir=audio_dir,
+        output_path=stream_dir / PLAYLIST_NAME,
+        ffmpeg_path=ffmpeg_path,
+        profile=profile,
+        backgrounds=backgrounds,
+        threads=threads,
+        output_args=stream_output_args(stream_dir, _output_fps(script, profile), segment_sec),
+    )
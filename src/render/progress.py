@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# JSON-lines progress events share stdout with the regular log; consumers pick
+# them out by their "event" field (see parse_progress_event).
+PROGRESS_EVENT = "progress"
+
+ProgressCallback = Callable[[Dict[str, object]], None]
+
+
+def emit_progress(event: Dict[str, object]) -> None:
+    """Write one progress event as a JSON line on stdout."""
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def parse_progress_event(line: str) -> Optional[Dict[str, object]]:
+    """Return the event dict if ``line`` is a progress JSON line, else None."""
+    text = line.strip()
+    if not text.startswith("{") or f'"{PROGRESS_EVENT}"' not in text:
+        return None
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and payload.get("event") == PROGRESS_EVENT:
+        return payload
+    return None
+
+
+def _parse_out_time(fields: Dict[str, str]) -> Optional[float]:
+    # out_time_us is authoritative; older builds misreport out_time_ms in microseconds too.
+    for key in ("out_time_us", "out_time_ms"):
+        raw = fields.get(key)
+        if raw and raw.lstrip("-").isdigit():
+            return max(int(raw), 0) / 1_000_000
+    raw = fields.get("out_time")
+    if raw and ":" in raw:
+        try:
+            hours, minutes, seconds = raw.split(":")
+            return max(int(hours) * 3600 + int(minutes) * 60 + float(seconds), 0.0)
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value.rstrip("x"))
+    except ValueError:
+        return None
+
+
+class ProgressTracker:
+    """Turn ffmpeg ``-progress`` key=value blocks into progress events.
+
+    ffmpeg writes one block per stats period, terminated by ``progress=continue``
+    (or ``progress=end``). Percent and ETA are computed against ``total_duration``,
+    the expected output length in seconds.
+    """
+
+    def __init__(self, total_duration: float, stage: str = "render", clock: Callable[[], float] = time.monotonic) -> None:
+        self.total_duration = max(total_duration, 0.0)
+        self.stage = stage
+        self._clock = clock
+        self._started = clock()
+        self._fields: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[Dict[str, object]]:
+        line = line.strip()
+        if "=" not in line:
+            return None
+        key, value = line.split("=", 1)
+        self._fields[key.strip()] = value.strip()
+        if key.strip() != "progress":
+            return None
+        fields, self._fields = self._fields, {}
+        return self._event(fields, done=value.strip() == "end")
+
+    def _event(self, fields: Dict[str, str], done: bool) -> Dict[str, object]:
+        return self.snapshot(
+            _parse_out_time(fields) or 0.0,
+            fps=_parse_float(fields.get("fps")),
+            speed=_parse_float(fields.get("speed")),
+            done=done,
+        )
+
+    def snapshot(
+        self,
+        out_time: float,
+        *,
+        fps: Optional[float] = None,
+        speed: Optional[float] = None,
+        done: bool = False,
+    ) -> Dict[str, object]:
+        """Build an event for ``out_time`` seconds of output rendered so far."""
+        elapsed = max(self._clock() - self._started, 0.0)
+        if done and self.total_duration:
+            out_time = max(out_time, self.total_duration)
+        if not speed and elapsed > 0 and out_time > 0:
+            speed = out_time / elapsed
+
+        percent = None
+        eta = None
+        if self.total_duration:
+            percent = min(out_time / self.total_duration * 100.0, 100.0)
+            remaining = max(self.total_duration - out_time, 0.0)
+            eta = 0.0 if done else (remaining / speed if speed else None)
+        return {
+            "event": PROGRESS_EVENT,
+            "stage": self.stage,
+            "status": "end" if done else "running",
+            "percent": round(percent, 1) if percent is not None else None,
+            "out_time_sec": round(out_time, 2),
+            "total_sec": round(self.total_duration, 2),
+            "fps": fps,
+            "speed": round(speed, 3) if speed else None,
+            "elapsed_sec": round(elapsed, 1),
+            "eta_sec": round(eta, 1) if eta is not None else None,
+        }
+
+
+def with_progress_flags(command: List[str]) -> List[str]:
+    """Insert ``-progress pipe:1 -nostats`` right after the ffmpeg binary."""
+    if "-progress" in command:
+        return list(command)
+    return [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+
+
+def run_with_progress(
+    command: List[str],
+    total_duration: float,
+    *,
+    stage: str = "render",
+    on_progress: ProgressCallback = emit_progress,
+) -> None:
+    """Run ffmpeg, reporting progress events through ``on_progress``.
+
+    stderr is left attached to the parent so warnings and errors still reach the
+    log. Raises ``subprocess.CalledProcessError`` on a non-zero exit.
+    """
+    command = with_progress_flags(command)
+    tracker = ProgressTracker(total_duration, stage=stage)
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        event = tracker.feed(line)
+        if event is not None:
+            on_progress(event)
+    returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src import timing
+from src.models import RenderProfile, ScriptModel
+from src.render.audio_stage import AudioStageError, plan_audio_track, run_audio_track
+from src.render.cache_budget import prune_lru, touch
+from src.render.ffmpeg_runner import _cache_dir, build_concat_command, build_section_command
+from src.render.progress import ProgressCallback, ProgressTracker
+from src.timeline import TimelineSummary
+
+
+# Bump when the section command layout changes in a way the fingerprint cannot see.
+SECTION_CACHE_VERSION = 1
+DEFAULT_CACHE_MAX_BYTES = 8 * 1024 * 1024 * 1024
+
+
+class SegmentRenderError(RuntimeError):
+    """Raised when a section clip or the final concat step fails."""
+
+
+@dataclass
+class SegmentRenderResult:
+    output_path: Path
+    clip_paths: List[Path] = field(default_factory=list)
+    commands: List[List[str]] = field(default_factory=list)
+    cache_hits: List[str] = field(default_factory=list)
+
+
+def _threads_per_worker(workers: int, budget: Optional[int] = None) -> int:
+    cpu = budget or os.cpu_count() or 1
+    return max(1, cpu // max(workers, 1))
+
+
+def _safe_name(value: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in value) or "section"
+
+
+def section_fingerprint(command: List[str]) -> str:
+    """Content address of a section clip.
+
+    The section command already encodes everything that affects the pixels: the
+    background path, content-hashed text PNGs (text + resolved style), layout
+    positions, effect and overlay filters, duration, video size and encoder
+    settings. Input files are added with their mtime/size so replacing an asset
+    in place invalidates the clip. ``-threads`` and the output path are excluded
+    because they do not change the result.
+    """
+    tokens: List[str] = []
+    inputs: List[str] = []
+    skip_next = False
+    body = command[1:-1]  # drop ffmpeg binary and output path
+    for i, token in enumerate(body):
+        if skip_next:
+            skip_next = False
+            continue
+        if token == "-threads":
+            skip_next = True
+            continue
+        tokens.append(token)
+        if token == "-i" and i + 1 < len(body):
+            inputs.append(body[i + 1])
+
+    digest = hashlib.sha1(f"v{SECTION_CACHE_VERSION}".encode("utf-8"))
+    digest.update("\0".join(tokens).encode("utf-8"))
+    for item in inputs:
+        try:
+            stat = Path(item).stat()
+            digest.update(f"|{item}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8"))
+        except OSError:
+            digest.update(f"|{item}|missing".encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def write_concat_list(clip_paths: List[Path], list_path: Path) -> Path:
+    """Write an ffmpeg concat demuxer list (absolute paths, single quotes escaped)."""
+    lines = []
+    for clip in clip_paths:
+        escaped = str(clip.resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+    list_path.parent.mkdir(parents=True, exist_ok=True)
+    list_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return list_path
+
+
+def _run(command: List[str], label: str) -> None:
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    except FileNotFoundError as err:
+        raise SegmentRenderError(f"ffmpeg not found while rendering {label}: {err}") from err
+    except subprocess.CalledProcessError as err:
+        tail = "\n".join((err.stderr or "").strip().splitlines()[-10:])
+        raise SegmentRenderError(f"ffmpeg failed for {label} (exit {err.returncode})\n{tail}") from err
+
+
+def render_segments(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    output_path: Path,
+    *,
+    work_dir: Path,
+    ffmpeg_path: str = "ffmpeg",
+    workers: int = 2,
+    dry_run: bool = False,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    profile: Optional[RenderProfile] = None,
+    backgrounds: Optional[Dict[str, str]] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    audio_stage: bool = False,
+    thread_budget: Optional[int] = None,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> SegmentRenderResult:
+    """Render every section in its own ffmpeg process, then join the clips with ``-c copy``.
+
+    With ``use_cache`` (default) clips are content-addressed under
+    ``outputs/cache/sections`` and only sections whose fingerprint changed are
+    re-encoded. Otherwise clips are written to ``work_dir/segments/<output stem>/``.
+    Narration and BGM are mixed in the final concat step, so the audio track is
+    identical to the single-graph render. ``on_progress`` receives a progress
+    event (see ``src.render.progress``) as each section clip finishes. With
+    ``audio_stage`` the narration/BGM track is rendered (or reused) from the
+    audio cache alongside the section clips and the concat step copies it.
+    ``thread_budget`` caps the ffmpeg threads shared by all workers (defaults to
+    the CPU count), e.g. when several renders run side by side in a batch.
+    Once the output is joined, the least recently used clips are pruned until
+    the cache fits ``cache_max_bytes`` (``0`` keeps everything).
+    """
+    if not timeline.sections:
+        raise SegmentRenderError("timeline has no sections to render")
+
+    clip_dir = work_dir / "segments" / output_path.stem
+    clip_dir.mkdir(parents=True, exist_ok=True)
+    if use_cache and cache_dir is None:
+        cache_dir = _cache_dir("sections")
+    threads = _threads_per_worker(workers, thread_budget)
+
+    result = SegmentRenderResult(output_path=output_path)
+    # (section id, command, cache path, seconds of timeline it covers)
+    jobs: List[list] = []
+    queued: Dict[Path, list] = {}
+    for idx, section_tl in enumerate(timeline.sections):
+        duration = max(section_tl.duration_sec, 0.1)
+        clip_path = clip_dir / f"{idx + 1:02d}_{_safe_name(section_tl.id)}.mp4"
+        command = build_section_command(
+            script=script,
+            timeline=timeline,
+            section_index=idx,
+            output_path=clip_path,
+            ffmpeg_path=ffmpeg_path,
+            threads=threads,
+            profile=profile,
+            backgrounds=backgrounds,
+        )
+        final_path: Optional[Path] = None
+        if use_cache and cache_dir is not None:
+            final_path = cache_dir / f"section_{section_fingerprint(command)}.mp4"
+            if final_path.exists():
+                touch(final_path)
+                result.clip_paths.append(final_path)
+                result.cache_hits.append(section_tl.id)
+                print(f"[Segment] {section_tl.id} unchanged, reusing {final_path.name}")
+                continue
+            if final_path in queued:
+                # Identical section: one encode produces the clip for both.
+                queued[final_path][3] += duration
+                result.clip_paths.append(final_path)
+                print(f"[Segment] {section_tl.id} identical to {queued[final_path][0]}, encoding once")
+                continue
+            # Encode next to the cache entry so the final rename stays on one filesystem.
+            command[-1] = str(final_path.with_name(f".{final_path.stem}.{os.getpid()}.{idx}.tmp.mp4"))
+        result.clip_paths.append(final_path or clip_path)
+        result.commands.append(command)
+        job = [section_tl.id, command, final_path, duration]
+        jobs.append(job)
+        if final_path is not None:
+            queued[final_path] = job
+
+    audio_plan = None
+    if audio_stage:
+        audio_plan = plan_audio_track(script, timeline, ffmpeg_path=ffmpeg_path, profile=profile)
+        if not audio_plan.cached:
+            result.commands.append(audio_plan.command)
+        else:
+            print(f"[Segment] audio unchanged, reusing {audio_plan.path.name}")
+
+    concat_list = write_concat_list(result.clip_paths, clip_dir / "concat.txt")
+    concat_command = build_concat_command(
+        script=script,
+        timeline=timeline,
+        concat_list_path=concat_list,
+        output_path=output_path,
+        ffmpeg_path=ffmpeg_path,
+        profile=profile,
+        audio_track=audio_plan.path if audio_plan else None,
+    )
+    result.commands.append(concat_command)
+    if dry_run:
+        return result
+
+    def encode_audio() -> None:
+        try:
+            with timing.span("audio.encode"):
+                run_audio_track(audio_plan)
+        except AudioStageError as err:
+            raise SegmentRenderError(str(err)) from err
+
+    def encode(section_id: str, command: List[str], final_path: Optional[Path], _duration: float) -> None:
+        with timing.span("segments.encode"):
+            _run(command, f"section {section_id}")
+        if final_path is not None:
+            # Publish atomically so concurrent renders never see a half-written clip.
+            try:
+                os.replace(command[-1], final_path)
+            except OSError as err:
+                raise SegmentRenderError(f"could not publish section {section_id} clip: {err}") from err
+
+    done = 0
+    tracker = ProgressTracker(sum(job[3] for job in jobs), stage="segments")
+    rendered_sec = 0.0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        # Submitted first so the audio mix overlaps with the section encodes.
+        audio_future = pool.submit(encode_audio) if audio_plan and not audio_plan.cached else None
+        futures = {pool.submit(encode, *job): job for job in jobs}
+        try:
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                rendered_sec += futures[future][3]
+                print(f"[Segment] {done}/{len(jobs)} {futures[future][0]} rendered")
+                if on_progress:
+                    on_progress(tracker.snapshot(rendered_sec, done=done == len(jobs)))
+            if audio_future is not None:
+                audio_future.result()
+        except SegmentRenderError:
+            for pending in futures:
+                pending.cancel()
+            if audio_future is not None:
+                audio_future.cancel()
+            raise
+
+    with timing.span("segments.concat"):
+        _run(concat_command, "concat")
+    if use_cache and cache_dir is not None:
+        removed = prune_lru(cache_dir, "section_*.mp4", cache_max_bytes)
+        if removed:
+            print(f"[Segment] pruned {removed} least recently used clips from {cache_dir}")
+    return result
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src import timing
+from src.models import RenderProfile, ScriptModel, TextPosition
+from src.render import ffmpeg_runner
+from src.render.ffmpeg_runner import (
+    IMAGE_EXTENSIONS,
+    _profile_scale,
+    _render_size,
+    background_fit_filter,
+)
+from src.render.layout_plan import LayoutPlan, get_layout_plan
+from src.render.text_cache import get_text_cache
+from src.timeline import SectionTimeline, TimelineSummary
+
+# Bump when frame extraction changes so cached background frames are not reused.
+SNAPSHOT_CACHE_VERSION = 2
+_ANCHORED = re.compile(r"^(left|right|top|bottom|center)([+-]\d+)$")
+
+
+class SnapshotError(RuntimeError):
+    """Raised when the background frame for a snapshot cannot be decoded."""
+
+
+def section_at(timeline: TimelineSummary, t: float) -> Tuple[int, SectionTimeline, float]:
+    """Index, timeline entry and section-local time for video time ``t`` (clamped to the video)."""
+    if not timeline.sections:
+        raise SnapshotError("timeline has no sections")
+    for idx, section_tl in enumerate(timeline.sections):
+        if t < section_tl.start_sec + max(section_tl.duration_sec, 0.1):
+            return idx, section_tl, max(t - section_tl.start_sec, 0.0)
+    last = timeline.sections[-1]
+    return len(timeline.sections) - 1, last, max(last.duration_sec - 0.001, 0.0)
+
+
+def resolve_position(value: TextPosition, axis: str, frame_dim: int, obj_dim: int, scale: float = 1.0) -> int:
+    """Pixel offset for a position; the numeric counterpart of ``_format_position``."""
+    raw = value.x if axis == "x" else value.y
+    if isinstance(raw, int):
+        return int(round(raw * scale))
+    if not isinstance(raw, str):
+        return 0
+    token = raw.strip().lower()
+    anchors = {
+        "center": (frame_dim - obj_dim) // 2,
+        "left": 0,
+        "top": 0,
+        "right": frame_dim - obj_dim,
+        "bottom": frame_dim - obj_dim,
+    }
+    if token in anchors:
+        return anchors[token]
+    m = _ANCHORED.match(token)
+    if m:
+        anchor, offset = m.groups()
+        return anchors[anchor] + int(round(int(offset) * scale))
+    try:
+        return int(float(token) * scale)
+    except ValueError:
+        return 0
+
+
+def fit_image(image: Any, width: int, height: int) -> Any:
+    """Pillow version of :func:`background_fit_filter` (letterbox)."""
+    from PIL import Image
+
+    image = image.convert("RGB")
+    ratio = min(width / image.width, height / image.height)
+    scaled = image.resize((max(1, round(image.width * ratio)), max(1, round(image.height * ratio))), Image.LANCZOS)
+    canvas = Image.new("RGB", (width, height), (0, 0, 0))
+    canvas.paste(scaled, ((width - scaled.width) // 2, (height - scaled.height) // 2))
+    return canvas
+
+
+def background_time(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    index: int,
+    local_t: float,
+    backgrounds: Dict[str, str] | None = None,
+) -> Tuple[str, float]:
+    """Background file for section ``index`` and the source time shown at ``local_t``.
+
+    Mirrors the single-graph render: sections sharing a looped background share
+    one decoder, so each continues where the previous one stopped.
+    """
+    section_map = {section.id: section for section in script.sections}
+
+    def bg_of(section_tl: SectionTimeline) -> str:
+        section = section_map.get(section_tl.id)
+        bg_path = str(section.bg if section and section.bg else script.video.bg)
+        return (backgrounds or {}).get(bg_path, bg_path)
+
+    bg_path = bg_of(timeline.sections[index])
+    offset = sum(
+        max(section_tl.duration_sec, 0.1)
+        for section_tl in timeline.sections[:index]
+        if bg_of(section_tl) == bg_path
+    )
+    return bg_path, offset + local_t
+
+
+def _probe_duration(path: str, ffmpeg_path: str) -> Optional[float]:
+    ffprobe = str(Path(ffmpeg_path).with_name("ffprobe")) if Path(ffmpeg_path).parent != Path(".") else "ffprobe"
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", path],
+            capture_output=True,
+            text=True,
+            timeout=15,
+        ).stdout.strip()
+        return float(out) if out else None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+def _decode_frame(path: str, t: float, width: int, height: int, ffmpeg_path: str) -> bytes:
+    # -ss before -i seeks on the demuxer (keyframe + short decode) instead of decoding from 0.
+    command = [
+        ffmpeg_path,
+        "-v",
+        "error",
+        "-ss",
+        f"{t:.3f}",
+        "-i",
+        path,
+        "-frames:v",
+        "1",
+        "-vf",
+        background_fit_filter(width, height),
+        "-f",
+        "image2pipe",
+        "-vcodec",
+        "png",
+        "-",
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        raise SnapshotError(f"ffmpeg could not extract a frame from {path}: {exc}") from exc
+    return result.stdout
+
+
+@timing.timed("snapshot.background")
+def background_frame(
+    bg_path: str,
+    t: float,
+    width: int,
+    height: int,
+    ffmpeg_path: str = "ffmpeg",
+) -> Any:
+    """One background frame at ``width``x``height``, cached under ``outputs/cache/snapshots``.
+
+    Still images are fitted with Pillow; videos are decoded with a fast seek
+    (wrapping ``t`` around the clip length, as the render loops backgrounds).
+    """
+    from PIL import Image
+
+    path = Path(bg_path)
+    if path.suffix.lower() in IMAGE_EXTENSIONS:
+        try:
+            with Image.open(path) as image:
+                return fit_image(image, width, height)
+        except OSError as exc:
+            raise SnapshotError(f"background image unreadable: {bg_path}") from exc
+
+    try:
+        stat = path.stat()
+    except OSError as exc:
+        raise SnapshotError(f"background not found: {bg_path}") from exc
+    raw = f"v{SNAPSHOT_CACHE_VERSION}|{path}|{stat.st_mtime_ns}|{stat.st_size}|{t:.3f}|{width}x{height}"
+    key = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    cache = get_text_cache(ffmpeg_runner._cache_dir("snapshots"))
+    cached = cache.png_path(key, prefix="frame")
+    if cached.exists():
+        cache.touch(cached)
+        with Image.open(cached) as image:
+            return image.convert("RGB")
+
+    data = _decode_frame(str(path), t, width, height, ffmpeg_path)
+    if not data and t > 0:
+        duration = _probe_duration(str(path), ffmpeg_path)
+        if duration:
+            data = _decode_frame(str(path), t % duration, width, height, ffmpeg_path)
+    if not data:
+        raise SnapshotError(f"ffmpeg returned no frame for {bg_path} at {t:.3f}s")
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    cache.save_image(cached, image)
+    return image
+
+
+def apply_effects(frame: Any, effects: list[str]) -> Any:
+    """Approximate the section effects of ``_effect_filter`` on a still frame."""
+    from PIL import Image, ImageChops, ImageEnhance, ImageFilter, ImageOps
+
+    for effect in effects:
+        name = (effect or "").strip().lower()
+        if name in {"blur", "soften"}:
+            frame = frame.filter(ImageFilter.GaussianBlur(12))
+        elif name in {"grayscale", "mono", "bw"}:
+            frame = ImageOps.grayscale(frame).convert("RGB")
+        elif name == "contrast":
+            frame = ImageEnhance.Color(ImageEnhance.Contrast(frame).enhance(1.2)).enhance(1.05)
+        elif name == "vignette":
+            falloff = Image.radial_gradient("L").resize(frame.size).point(lambda v: 255 - v // 2)
+            frame = ImageChops.multiply(frame, Image.merge("RGB", (falloff, falloff, falloff)))
+    return frame
+
+
+def _paste(frame: Any, image: Any, x: int, y: int) -> None:
+    layer = image.convert("RGBA")
+    frame.paste(layer, (x, y), layer)
+
+
+def _paste_text(
+    frame: Any,
+    text: str,
+    font: str,
+    fontsize: int,
+    fill: str,
+    stroke_color: str,
+    stroke_width: int,
+    position: TextPosition,
+    scale: float,
+) -> None:
+    from PIL import Image
+
+    image_path, w, h = ffmpeg_runner._render_text_image(
+        text, ffmpeg_runner._resolve_font_path(font), fontsize, fill, stroke_color, stroke_width, 0
+    )
+    with Image.open(image_path) as image:
+        _paste(
+            frame,
+            image,
+            resolve_position(position, "x", frame.width, w, scale),
+            resolve_position(position, "y", frame.height, h, scale),
+        )
+
+
+def _apply_global_overlays(frame: Any, script: ScriptModel, timeline: TimelineSummary, t: float, scale: float) -> None:
+    from PIL import Image
+
+    watermark = script.watermark
+    if watermark and watermark.file and Path(watermark.file).exists():
+        with Image.open(watermark.file) as image:
+            if scale != 1.0:
+                image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))))
+            _paste(
+                frame,
+                image,
+                resolve_position(watermark.position, "x", frame.width, image.width, scale),
+                resolve_position(watermark.position, "y", frame.height, image.height, scale),
+            )
+    if watermark:
+        wm_text = watermark.text or (script.bgm.license if script.bgm and script.bgm.license else None)
+        end_time = min(max(watermark.duration_sec, 0.1), max(timeline.total_duration, 1.0))
+        if wm_text and t <= end_time:
+            stroke_width = watermark.stroke_width if watermark.stroke_width is not None else script.text_style.stroke.width
+            if scale != 1.0 and stroke_width:
+                stroke_width = max(1, int(round(stroke_width * scale)))
+            _paste_text(
+                frame,
+                wm_text,
+                watermark.font or script.text_style.font,
+                int(round(watermark.fontsize * scale)),
+                watermark.fill,
+                watermark.stroke_color or script.text_style.stroke.color,
+                stroke_width or 0,
+                watermark.position,
+                scale,
+            )
+
+    credits = script.credits
+    if credits and credits.enabled and credits.text and t >= max(timeline.total_duration - 4.0, 0.0):
+        font_size = int(round(max(int(script.text_style.fontsize * 0.75), 32) * scale))
+        _paste_text(frame, credits.text, script.text_style.font, font_size, "#FFFFFF", "#000000", 2, credits.position, scale)
+
+
+@timing.timed("snapshot.composite")
+def render_frame(
+    script: ScriptModel,
+    timeline: TimelineSummary,
+    t: float,
+    *,
+    profile: RenderProfile | None = None,
+    backgrounds: Dict[str, str] | None = None,
+    layout: LayoutPlan | None = None,
+    ffmpeg_path: str = "ffmpeg",
+) -> Any:
+    """Composite the frame shown at video time ``t`` without running the render graph.
+
+    Only the section's background is decoded; captions come from the layout
+    plan's cached layers, and overlays, watermark and credits are pasted with
+    Pillow. The result matches the render up to filter-level differences
+    (scaler, effect approximations).
+    """
+    from PIL import Image
+
+    render_scale = _profile_scale(script, profile)
+    width, height = _render_size(script, render_scale)
+    index, section_tl, local_t = section_at(timeline, t)
+    section = next((s for s in script.sections if s.id == section_tl.id), None)
+
+    bg_path, bg_t = background_time(script, timeline, index, local_t, backgrounds)
+    frame = background_frame(bg_path, bg_t, width, height, ffmpeg_path)
+
+    layout = layout or get_layout_plan(script, render_scale)
+    text_layout = layout.section(section_tl.id)
+    if text_layout and text_layout.layer:
+        with Image.open(text_layout.layer) as layer:
+            _paste(frame, layer, text_layout.x, text_layout.y)
+
+    if section and section.effects:
+        frame = apply_effects(frame, section.effects)
+
+    if section:
+        for overlay in section.overlays:
+            if not Path(overlay.file).exists():
+                continue
+            with Image.open(overlay.file) as image:
+                ov_scale = (overlay.scale or 1.0) * render_scale
+                if ov_scale != 1.0:
+                    image = image.resize((max(1, round(image.width * ov_scale)), max(1, round(image.height * ov_scale))))
+                image = image.convert("RGBA")
+                if overlay.opacity is not None:
+                    alpha = image.getchannel("A").point(lambda v: int(v * overlay.opacity))
+                    image.putalpha(alpha)
+                _paste(
+                    frame,
+                    image,
+                    resolve_position(overlay.position, "x", width, image.width, render_scale),
+                    resolve_position(overlay.position, "y", height, image.height, render_scale),
+                )
+
+    _apply_global_overlays(frame, script, timeline, t, render_scale)
+    return frame
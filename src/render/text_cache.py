@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Bump when rasterization changes so old PNGs are not reused.
+TEXT_CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Entries used more recently than this are never evicted: a concurrent render
+# may have put them on its ffmpeg command line and not opened them yet.
+EVICTION_GRACE_SEC = 600
+
+
+@dataclass
+class TextCacheEntry:
+    path: str
+    width: int
+    height: int
+    fontsize: int
+    lines: List[str]
+
+
+def _font_token(font_path: str) -> str:
+    try:
+        stat = Path(font_path).stat()
+    except OSError:
+        return font_path
+    return f"{font_path}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+def text_cache_key(
+    text: str,
+    font_path: str,
+    fontsize: int,
+    fill: str,
+    stroke_color: str,
+    stroke_width: int,
+    line_gap: int,
+    max_width: int | None,
+) -> str:
+    """Key over the *requested* parameters, so a hit skips the fit loop too."""
+    raw = "|".join(
+        [
+            f"v{TEXT_CACHE_VERSION}",
+            text,
+            _font_token(font_path),
+            str(fontsize),
+            fill,
+            stroke_color,
+            str(stroke_width),
+            str(line_gap),
+            str(max_width or 0),
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class TextCache:
+    """Content-addressed caption PNGs with a JSON sidecar per entry.
+
+    ``text_<key>.png`` holds the image and ``text_<key>.json`` the fitted
+    fontsize, canvas size and line breaks. Both are published with
+    ``os.replace`` (PNG first), so a reader that finds the sidecar always finds a
+    complete PNG, even with several renders sharing the directory. The PNG
+    mtime doubles as the LRU clock; once the directory grows past
+    ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+
+    def png_path(self, key: str, prefix: str = "text") -> Path:
+        return self.root / f"{prefix}_{key}.png"
+
+    def lookup(self, key: str) -> Optional[TextCacheEntry]:
+        png = self.png_path(key)
+        try:
+            meta = json.loads(png.with_suffix(".json").read_text(encoding="utf-8"))
+            entry = TextCacheEntry(path=str(png), **{k: meta[k] for k in ("width", "height", "fontsize", "lines")})
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not png.exists():
+            return None
+        self.touch(png)
+        return entry
+
+    def touch(self, path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def store(self, key: str, image: Any, *, fontsize: int, lines: List[str]) -> TextCacheEntry:
+        """Save a Pillow image and its sidecar atomically, then enforce the budget."""
+        png = self.png_path(key)
+        self.save_image(png, image)
+        entry = TextCacheEntry(path=str(png), width=image.width, height=image.height, fontsize=fontsize, lines=lines)
+        meta: Dict[str, Any] = asdict(entry)
+        meta.pop("path")
+        self._write_atomic(png.with_suffix(".json"), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        return entry
+
+    def save_image(self, path: Path, image: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.png")
+        image.save(tmp_path, format="PNG")
+        os.replace(tmp_path, path)
+        self._account(path)
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _account(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self.disk_usage()
+            else:
+                self._approx_bytes += size
+            over = self.max_bytes > 0 and self._approx_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def disk_usage(self) -> int:
+        total = 0
+        for path in self.root.glob("*.png"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Delete least recently used entries until usage is below 90% of the budget."""
+        now = time.time() if now is None else now
+        entries = []
+        for path in self.root.glob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        usage = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for mtime, size, path in sorted(entries):
+            if usage <= target:
+                break
+            if now - mtime < EVICTION_GRACE_SEC:
+                break
+            # Sidecar first: without it the entry is a miss, never a torn read.
+            path.with_suffix(".json").unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+            usage -= size
+            removed += 1
+        with self._lock:
+            self._approx_bytes = usage
+        return removed
+
+
+_CACHES: Dict[Path, TextCache] = {}
+_MAX_BYTES = DEFAULT_MAX_BYTES
+
+
+def configure_text_cache(max_bytes: int) -> None:
+    """Set the disk budget for text caches (``0`` disables eviction)."""
+    global _MAX_BYTES
+    _MAX_BYTES = max_bytes
+    for cache in _CACHES.values():
+        cache.max_bytes = max_bytes
+
+
+def get_text_cache(root: Path) -> TextCache:
+    cache = _CACHES.get(root)
+    if cache is None:
+        cache = _CACHES[root] = TextCache(root, _MAX_BYTES)
+    return cache
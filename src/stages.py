@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from src import timing
+
+
+class StageTimeout(RuntimeError):
+    """Raised when a stage is still running past its timeout."""
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[], Any]
+    timeout_sec: Optional[float] = None
+
+
+@dataclass
+class StageReport:
+    results: Dict[str, Any]
+    durations: Dict[str, float]
+    wall_sec: float
+
+    def describe(self) -> str:
+        parts = ", ".join(f"{name} {sec:.2f}s" for name, sec in self.durations.items())
+        return f"[INFO] Pre-render stages: {parts} (wall {self.wall_sec:.2f}s)"
+
+
+def run_stages(stages: Sequence[Stage], cancel: Optional[threading.Event] = None) -> StageReport:
+    """Run independent stages side by side and join them.
+
+    Each stage gets its own daemon thread, timed as a ``timing`` span under its
+    name. When a stage fails or outlives its ``timeout_sec`` (counted from the
+    common start), ``cancel`` is set so cooperative stages can stop early, and
+    the failure is raised at once: the original exception (``SystemExit``
+    included) or :class:`StageTimeout`. Threads still running are abandoned
+    rather than joined, so a hung download cannot keep the process alive.
+    """
+    cancel = cancel if cancel is not None else threading.Event()
+    started = time.monotonic()
+    durations: Dict[str, float] = {}
+    futures: Dict[str, Future] = {}
+
+    def target(stage: Stage, future: Future) -> None:
+        stage_started = time.monotonic()
+        try:
+            with timing.span(stage.name):
+                result = stage.func()
+        except BaseException as exc:  # SystemExit from a stage must reach the caller
+            durations[stage.name] = time.monotonic() - stage_started
+            future.set_exception(exc)
+            return
+        durations[stage.name] = time.monotonic() - stage_started
+        future.set_result(result)
+
+    for stage in stages:
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        futures[stage.name] = future
+        threading.Thread(target=target, args=(stage, future), name=f"stage-{stage.name}", daemon=True).start()
+
+    deadlines = {s.name: started + s.timeout_sec for s in stages if s.timeout_sec is not None}
+    results: Dict[str, Any] = {}
+    pending = dict(futures)
+    while pending:
+        open_deadlines = [deadlines[name] for name in pending if name in deadlines]
+        timeout = max(0.0, min(open_deadlines) - time.monotonic()) if open_deadlines else None
+        done, _ = wait(pending.values(), timeout=timeout, return_when=FIRST_COMPLETED)
+        for name in [name for name, future in pending.items() if future in done]:
+            future = pending.pop(name)
+            error = future.exception()
+            if error is not None:
+                cancel.set()
+                raise error
+            results[name] = future.result()
+        now = time.monotonic()
+        for name in pending:
+            if name in deadlines and now >= deadlines[name]:
+                cancel.set()
+                raise StageTimeout(f"stage '{name}' did not finish within {deadlines[name] - started:.0f}s")
+
+    ordered = {stage.name: durations.get(stage.name, 0.0) for stage in stages}
+    return StageReport(results=results, durations=ordered, wall_sec=time.monotonic() - started)
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import contextlib
 import wave
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional
 
+from src.audio.chunking import NarrationChunk, load_chunks
 from src.models import ScriptModel
 
 _FALLBACK_WORDS_PER_SEC = 3.0
@@ -21,6 +22,8 @@ class SectionTimeline:
     on_screen_text: str
     narration: str
     audio_path: Optional[Path]
+    # Sentence boundaries within the section audio, relative to start_sec.
+    chunks: List[NarrationChunk] = field(default_factory=list)
 
 
 @dataclass
@@ -65,6 +68,7 @@ def build_timeline(script: ScriptModel, audio_dir: Path) -> TimelineSummary:
                 on_screen_text=section.on_screen_text,
                 narration=section.narration,
                 audio_path=audio_path if audio_path.exists() else None,
+                chunks=load_chunks(audio_path) if audio_path.exists() else [],
             )
         )
         cursor += duration + pause
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ACTIVE: Optional["Timings"] = None
+_LOCAL = threading.local()
+
+
+class Timings:
+    """Wall-clock spans for one render.
+
+    Spans opened at the top level of the thread that created the recorder are
+    *stages* and keep their order; every other span (nested ones, and anything
+    recorded from worker threads) is a *step* aggregated by name, since steps
+    such as text rasterization run once per section.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._origin = clock()
+        self._owner = threading.get_ident()
+        self._lock = threading.Lock()
+        self.stages: List[Dict[str, Any]] = []
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        stack: List[str] = getattr(_LOCAL, "stack", None) or []
+        _LOCAL.stack = stack
+        is_stage = not stack and threading.get_ident() == self._owner
+        stack.append(name)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - started
+            stack.pop()
+            with self._lock:
+                if is_stage:
+                    self.stages.append(
+                        {
+                            "name": name,
+                            "start_sec": round(started - self._origin, 3),
+                            "duration_sec": round(elapsed, 3),
+                        }
+                    )
+                else:
+                    step = self.steps.setdefault(name, {"count": 0, "total_sec": 0.0, "max_sec": 0.0})
+                    step["count"] += 1
+                    step["total_sec"] += elapsed
+                    step["max_sec"] = max(step["max_sec"], elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total_sec": round(self._clock() - self._origin, 3),
+                "stages": [dict(stage) for stage in self.stages],
+                "steps": {
+                    name: {
+                        "count": step["count"],
+                        "total_sec": round(step["total_sec"], 3),
+                        "max_sec": round(step["max_sec"], 3),
+                    }
+                    for name, step in sorted(self.steps.items())
+                },
+            }
+
+
+def activate(timings: Optional[Timings]) -> Optional[Timings]:
+    """Make ``timings`` the recorder used by :func:`span`; returns the previous one."""
+    global _ACTIVE
+    previous, _ACTIVE = _ACTIVE, timings
+    return previous
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block on the active recorder; a no-op when none is active."""
+    recorder = _ACTIVE
+    if recorder is None:
+        yield
+        return
+    with recorder.span(name):
+        yield
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of :func:`span` for helpers called from many places."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def append_render_log(log_path: Path, record: Mapping[str, Any]) -> None:
+    """Append one render record as a JSON line; the log is never rewritten."""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(dict(record), ensure_ascii=False) + "\n")
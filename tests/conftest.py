@@ -1,10 +1,226 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import struct
 import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from PIL import Image
 
 
 # Ensure repo root is importable for src.* modules
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+from src.models import OutputOptions, ScriptModel, Section, StrokeStyle, TextStyle, VideoConfig, VoiceSettings  # noqa: E402
+from src.timeline import SectionTimeline, TimelineSummary  # noqa: E402
+
+
+def make_wav(frames: int, *, value: int = 1000, rate: int = 24000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(struct.pack("<h", value) * frames)
+    return buf.getvalue()
+
+
+class StubVoicevox:
+    """In-process VOICEVOX engine: ``/audio_query`` echoes the text, ``/synthesis`` returns it as bytes."""
+
+    def __init__(self, delay_sec: float = 0.0) -> None:
+        self.delay_sec = delay_sec
+        self.version = "0.14.0"
+        self.calls: list[str] = []
+        self.clients: set[int] = set()
+        self.fail_texts: set[str] = set()
+        self.down = False
+        # Answer /synthesis with a real 16-bit mono WAV, 10 ms of tone per character.
+        self.real_wav = False
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with stub._lock:
+                    stub.calls.append(self.path)
+                self._reply(*stub.respond(self.path, {}, None))
+
+            def do_POST(self) -> None:
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"null")
+                with stub._lock:
+                    stub.calls.append(url.path)
+                    stub.clients.add(self.client_address[1])
+                    stub._in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub._in_flight)
+                try:
+                    time.sleep(stub.delay_sec)
+                    status, payload, ctype = stub.respond(url.path, params, body)
+                finally:
+                    with stub._lock:
+                        stub._in_flight -= 1
+                self._reply(status, payload, ctype)
+
+            def _reply(self, status: int, payload: bytes, ctype: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def respond(self, path: str, params: dict, body):
+        if self.down:
+            return 503, b"", "text/plain"
+        if path == "/initialize_speaker":
+            return 204, b"", "text/plain"
+        if path == "/version":
+            if self.version is None:
+                return 404, b"", "text/plain"
+            return 200, json.dumps(self.version).encode(), "application/json"
+        if path == "/audio_query":
+            if params.get("text") in self.fail_texts:
+                return 500, b"{}", "application/json"
+            query = {"text": params.get("text"), "speaker": params.get("speaker")}
+            return 200, json.dumps(query).encode(), "application/json"
+        if path == "/synthesis" and self.real_wav:
+            return 200, make_wav(len(body["text"]) * 240, value=len(body["text"])), "audio/wav"
+        if path == "/synthesis":
+            return 200, f"RIFF:{body['text']}:{body['speedScale']}".encode(), "audio/wav"
+        return 404, b"", "text/plain"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def voicevox_stub():
+    stub = StubVoicevox()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def voicevox_stubs():
+    stubs = [StubVoicevox() for _ in range(3)]
+    yield stubs
+    for stub in stubs:
+        stub.close()
+
+
+def make_script(sections: Optional[List[Section]] = None, *, text_style: Optional[TextStyle] = None, **fields) -> ScriptModel:
+    """Minimal valid script over ``bg.mp4``; ``video`` may be a dict of VideoConfig overrides."""
+    video = fields.pop("video", {})
+    return ScriptModel(
+        project="proj",
+        title="test",
+        video=VideoConfig(**{"bg": "bg.mp4", **video}),
+        voice=VoiceSettings(speaker_id=1),
+        text_style=text_style or TextStyle(font="Arial", stroke=StrokeStyle()),
+        sections=sections if sections is not None else [Section(id="s1", on_screen_text="one", narration="n1")],
+        output=OutputOptions(filename="out.mp4"),
+        **fields,
+    )
+
+
+def make_timeline(
+    script: ScriptModel, durations: Sequence[float], audio_paths: Optional[Sequence[Optional[Path]]] = None
+) -> TimelineSummary:
+    """Back-to-back timeline for ``script.sections`` with the given durations."""
+    sections = []
+    start = 0.0
+    for idx, (section, duration) in enumerate(zip(script.sections, durations)):
+        sections.append(
+            SectionTimeline(
+                id=section.id,
+                index=idx + 1,
+                start_sec=start,
+                duration_sec=duration,
+                on_screen_text=section.on_screen_text,
+                narration=section.narration,
+                audio_path=audio_paths[idx] if audio_paths else None,
+            )
+        )
+        start += duration
+    return TimelineSummary(sections=sections, total_duration=start)
+
+
+class TextStub:
+    """Stands in for ``ffmpeg_runner._render_text_image`` without touching fonts.
+
+    Each (text, fontsize) gets a solid PNG of ``size(text)`` in the cache dir,
+    written once so input mtimes (and section fingerprints) stay stable, plus
+    the JSON sidecar the layout plan reads, with the fitted size reduced by
+    ``fit_shrink``.
+    """
+
+    def __init__(self, cache: Path) -> None:
+        self.cache = cache
+        self.calls: List[Tuple[str, int]] = []
+        self.size: Callable[[str], Tuple[int, int]] = lambda text: (200, 80)
+        self.color: Tuple[int, int, int, int] = (255, 255, 255, 255)
+        self.fit_shrink = 0
+
+    @property
+    def texts(self) -> List[str]:
+        return [text for text, _ in self.calls]
+
+    @property
+    def sizes(self) -> List[int]:
+        return [fontsize for _, fontsize in self.calls]
+
+    def __call__(self, text: str, font_path: str, fontsize: int, *args, **kwargs) -> Tuple[str, int, int]:
+        self.calls.append((text, fontsize))
+        width, height = self.size(text)
+        digest = hashlib.sha1(f"{text}|{fontsize}".encode("utf-8")).hexdigest()[:12]
+        path = self.cache / f"text_{digest}.png"
+        if not path.exists():
+            Image.new("RGBA", (width, height), self.color).save(path)
+            sidecar = {"fontsize": fontsize - self.fit_shrink, "lines": [text]}
+            path.with_suffix(".json").write_text(json.dumps(sidecar), encoding="utf-8")
+        return str(path), width, height
+
+
+@pytest.fixture
+def text_stub(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> TextStub:
+    """Fake caption rendering, with the render caches and stored layout plans isolated in ``tmp_path``."""
+    from src.render import ffmpeg_runner, layout_plan
+
+    cache = tmp_path / "cache"
+    cache.mkdir(exist_ok=True)
+    stub = TextStub(cache)
+    monkeypatch.setattr(ffmpeg_runner, "_cache_dir", lambda name: cache)
+    monkeypatch.setattr(ffmpeg_runner, "_render_text_image", stub)
+    monkeypatch.setattr(ffmpeg_runner, "_resolve_font_path", lambda name: "/fonts/dummy.ttf")
+    monkeypatch.setattr(layout_plan, "_PLANS", {})
+    return stub
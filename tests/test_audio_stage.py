@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from conftest import TextStub, make_script, make_timeline, make_wav
+from src.models import BGMAudio, ScriptModel, Section
+from src.render import audio_stage
+from src.render.audio_stage import audio_fingerprint, build_audio_command, build_mux_command
+from src.render.ffmpeg_runner import build_concat_command, build_ffmpeg_command
+from src.render.segments import render_segments
+from src.timeline import TimelineSummary
+
+
+@pytest.fixture(autouse=True)
+def _isolated(text_stub: TextStub, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(audio_stage, "_cache_dir", lambda name: tmp_path / "cache" / name)
+
+
+def _wav(path: Path, frames: int) -> Path:
+    path.write_bytes(make_wav(frames, value=0))
+    return path
+
+
+def _script(tmp_path: Path, **bgm) -> ScriptModel:
+    bgm_file = tmp_path / "bgm.mp3"
+    if not bgm_file.exists():
+        bgm_file.write_bytes(b"bgm")
+    sections = [Section(id="s1", on_screen_text="one", narration="n1"), Section(id="s2", on_screen_text="two", narration="n2")]
+    return make_script(sections, bgm=BGMAudio(file=str(bgm_file), **bgm))
+
+
+def _timeline(tmp_path: Path) -> TimelineSummary:
+    wavs = [_wav(tmp_path / "01_s1.wav", 24000), _wav(tmp_path / "02_s2.wav", 12000)]
+    return make_timeline(_script(tmp_path), [1.0, 0.5], wavs)
+
+
+def test_fingerprint_tracks_audio_inputs_only(tmp_path: Path) -> None:
+    timeline = _timeline(tmp_path)
+    base = audio_fingerprint(_script(tmp_path), timeline)
+
+    changed_text = _script(tmp_path)
+    changed_text.sections[0].on_screen_text = "different caption"
+    assert audio_fingerprint(changed_text, timeline) == base
+    assert audio_fingerprint(_script(tmp_path, volume_db=-10), timeline) != base
+    assert audio_fingerprint(_script(tmp_path, ducking_db=6), timeline) != base
+
+    paused = _script(tmp_path)
+    paused.voice.pause_msec = 300
+    assert audio_fingerprint(paused, timeline) != base
+
+    _wav(tmp_path / "02_s2.wav", 6000)
+    assert audio_fingerprint(_script(tmp_path), timeline) != base
+
+
+def test_audio_command_mixes_without_video(tmp_path: Path) -> None:
+    cmd = build_audio_command(_script(tmp_path, ducking_db=6), _timeline(tmp_path), tmp_path / "a.m4a")
+    graph = cmd[cmd.index("-filter_complex") + 1]
+
+    assert "sidechaincompress" in graph and "amix" in graph
+    assert "-vn" in cmd and cmd[-1].endswith("a.m4a")
+
+
+def test_audio_command_is_bounded_by_timeline_duration(tmp_path: Path) -> None:
+    timeline = _timeline(tmp_path)
+    cmd = build_audio_command(_script(tmp_path), timeline, tmp_path / "a.m4a")
+    assert "duration=longest" in cmd[cmd.index("-filter_complex") + 1]
+    assert cmd[cmd.index("-t") + 1] == "1.500"
+
+    # No narration and no BGM: the graph is a bare anullsrc, which never ends on its own.
+    silent_script = _script(tmp_path)
+    silent_script.bgm = None
+    for section in timeline.sections:
+        section.audio_path = None
+    timeline.total_duration = 4.0
+    silent = build_audio_command(silent_script, timeline, tmp_path / "b.m4a")
+    assert "anullsrc" in silent[silent.index("-filter_complex") + 1]
+    assert silent[silent.index("-t") + 1] == "4.000"
+
+
+def test_video_only_graph_and_copy_mux(tmp_path: Path) -> None:
+    script, timeline = _script(tmp_path), _timeline(tmp_path)
+    video = build_ffmpeg_command(script, timeline, tmp_path, tmp_path / "v.mp4", include_audio=False)
+
+    assert "-an" in video
+    assert "amix" not in video[video.index("-filter_complex") + 1]
+    assert str(timeline.sections[0].audio_path) not in video
+
+    mux = build_mux_command(tmp_path / "v.mp4", tmp_path / "a.m4a", tmp_path / "out.mp4")
+    assert mux[mux.index("-c") + 1] == "copy"
+    concat = build_concat_command(script, timeline, tmp_path / "list.txt", tmp_path / "out.mp4", audio_track=tmp_path / "a.m4a")
+    assert "-filter_complex" not in concat
+    assert concat[concat.index("-c") + 1] == "copy"
+
+
+def test_segments_schedule_audio_track_once(tmp_path: Path) -> None:
+    script, timeline = _script(tmp_path), _timeline(tmp_path)
+    result = render_segments(
+        script, timeline, tmp_path / "out.mp4", work_dir=tmp_path / "work", dry_run=True, use_cache=False, audio_stage=True
+    )
+    audio_commands = [cmd for cmd in result.commands if "-vn" in cmd]
+
+    assert len(audio_commands) == 1
+    assert audio_commands[0][-1] in result.commands[-1]
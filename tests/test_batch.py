@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from src.batch import JOB_DONE, JOB_FAILED, JOB_PENDING, BatchJob, build_render_jobs, plan_workers, run_batch
+
+# Stand-in render command: exits with the code written in the "script" file and
+# counts its invocations next to it.
+_FAKE_RENDER = """
+import sys
+from pathlib import Path
+script = Path(sys.argv[1])
+counter = script.with_suffix(".runs")
+runs = int(counter.read_text()) + 1 if counter.exists() else 1
+counter.write_text(str(runs))
+codes = script.read_text().split()
+sys.exit(int(codes[min(runs, len(codes)) - 1]))
+"""
+
+
+def _job(tmp_path: Path, name: str, codes: str) -> BatchJob:
+    script = tmp_path / f"{name}.yaml"
+    script.write_text(codes, encoding="utf-8")
+    return BatchJob(id=name, script_path=str(script), command=[sys.executable, "-c", _FAKE_RENDER, str(script)])
+
+
+def _runs(tmp_path: Path, name: str) -> int:
+    counter = tmp_path / f"{name}.runs"
+    return int(counter.read_text()) if counter.exists() else 0
+
+
+def test_plan_workers_respects_cpu_and_memory_budget() -> None:
+    gib = 1024**3
+    assert plan_workers(4, 2.0, cpu_count=16, memory_bytes=64 * gib) == 4
+    assert plan_workers(4, 8.0, cpu_count=16, memory_bytes=16 * gib) == 2
+    assert plan_workers(8, 2.0, cpu_count=4, memory_bytes=None) == 1
+    assert plan_workers(1, 1.0, cpu_count=16, memory_bytes=64 * gib, max_workers=3) == 3
+
+
+def test_batch_retries_and_continues_after_failure(tmp_path: Path) -> None:
+    jobs = [_job(tmp_path, "ok", "0"), _job(tmp_path, "flaky", "1 0"), _job(tmp_path, "broken", "2")]
+    summary = run_batch(jobs, state_path=tmp_path / "state.json", log_dir=tmp_path / "logs", workers=2, retries=1)
+
+    status = {job.id: job for job in summary.jobs}
+    assert status["ok"].status == JOB_DONE
+    assert status["flaky"].status == JOB_DONE and status["flaky"].attempts == 2
+    assert status["broken"].status == JOB_FAILED and status["broken"].returncode == 2
+    assert summary.to_dict()["counts"] == {JOB_DONE: 2, JOB_FAILED: 1}
+    assert all(job.wall_sec >= 0 for job in summary.jobs)
+
+
+def test_batch_resumes_from_state_file(tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    first = [_job(tmp_path, "a", "0"), _job(tmp_path, "b", "3 0")]
+    run_batch(first, state_path=state_path, log_dir=tmp_path / "logs")
+
+    saved = {item["id"]: item["status"] for item in json.loads(state_path.read_text())["jobs"]}
+    assert saved == {"a": JOB_DONE, "b": JOB_FAILED}
+
+    second = [_job(tmp_path, "a", "0"), _job(tmp_path, "b", "3 0")]
+    summary = run_batch(second, state_path=state_path, log_dir=tmp_path / "logs")
+    assert _runs(tmp_path, "a") == 1
+    assert _runs(tmp_path, "b") == 2
+    assert not summary.failed
+
+
+def test_fail_fast_leaves_remaining_jobs_pending(tmp_path: Path) -> None:
+    jobs = [_job(tmp_path, "first", "1"), _job(tmp_path, "second", "0")]
+    summary = run_batch(
+        jobs, state_path=tmp_path / "state.json", log_dir=tmp_path / "logs", workers=1, continue_on_error=False
+    )
+
+    assert [job.status for job in summary.jobs] == [JOB_FAILED, JOB_PENDING]
+    assert _runs(tmp_path, "second") == 0
+
+
+# Stand-in for generate_video.py: writes its narration to <work-dir>/audio/01_intro.wav,
+# waits for the other job to do the same, and fails if the file was overwritten.
+_FAKE_GENERATE_VIDEO = """
+import sys, time
+from pathlib import Path
+args = sys.argv[1:]
+script = Path(args[args.index("--script") + 1])
+work_dir = Path(args[args.index("--work-dir") + 1]) if "--work-dir" in args else Path("work")
+wav = work_dir / "audio" / "01_intro.wav"
+wav.parent.mkdir(parents=True, exist_ok=True)
+wav.write_text(script.read_text())
+time.sleep(0.3)
+sys.exit(0 if wav.read_text() == script.read_text() else 1)
+"""
+
+
+def test_concurrent_jobs_with_colliding_section_ids_get_separate_work_dirs(tmp_path: Path) -> None:
+    fake = tmp_path / "generate_video.py"
+    fake.write_text(_FAKE_GENERATE_VIDEO, encoding="utf-8")
+    scripts = []
+    for name in ("first", "second"):
+        script = tmp_path / name / "video.yaml"
+        script.parent.mkdir()
+        script.write_text(f"narration of {name}", encoding="utf-8")
+        scripts.append(script)
+
+    jobs = build_render_jobs(scripts, f"{sys.executable} {fake}", work_root=tmp_path / "work", threads_per_job=2)
+    summary = run_batch(jobs, state_path=tmp_path / "state.json", log_dir=tmp_path / "logs", workers=2)
+
+    assert [job.status for job in summary.jobs] == [JOB_DONE, JOB_DONE]
+    assert len({job.work_dir for job in jobs}) == 2
+    for job, script in zip(jobs, scripts):
+        assert job.command[-4:] == ["--work-dir", job.work_dir, "--threads", "2"]
+        assert (Path(job.work_dir) / "audio" / "01_intro.wav").read_text() == script.read_text()
+
+
+def test_custom_commands_get_no_work_dir(tmp_path: Path) -> None:
+    jobs = build_render_jobs([tmp_path / "a.yaml"], "python render.py", work_root=tmp_path / "work", threads_per_job=2)
+    assert jobs[0].command == ["python", "render.py", "--script", str(tmp_path / "a.yaml")]
+    assert jobs[0].work_dir is None
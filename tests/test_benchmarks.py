@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from benchmarks.render_bench import compare_results
+from benchmarks.synthetic import SIZES, generate, section_seconds
+from src.script_io import load_script
+from src.timeline import build_timeline
+
+
+def test_synthetic_script_round_trips_with_sine_narration(tmp_path: Path) -> None:
+    script = load_script(generate("medium", tmp_path, ffmpeg_path="definitely-not-ffmpeg"))
+    size = SIZES["medium"]
+
+    assert len(script.sections) == size.sections
+    assert all(len(section.on_screen_segments) == size.segments for section in script.sections)
+    assert all(len(section.overlays) == size.overlays for section in script.sections)
+    assert (tmp_path / "overlay.png").exists()
+
+    timeline = build_timeline(script, tmp_path / "audio")
+    assert all(section.audio_path is not None for section in timeline.sections)
+    expected = sum(section_seconds(idx) for idx in range(size.sections))
+    assert abs(timeline.total_duration - expected) < 0.01
+
+
+def test_compare_flags_regressions_by_direction() -> None:
+    baseline = {
+        "metrics": {
+            "small.command.build_ms": {"value": 100.0, "better": "lower"},
+            "small.text.images_per_sec": {"value": 50.0, "better": "higher"},
+            "small.timeline.build_ms": {"value": 10.0, "better": "lower"},
+        }
+    }
+    current = {
+        "metrics": {
+            "small.command.build_ms": {"value": 125.0, "better": "lower"},
+            "small.text.images_per_sec": {"value": 40.0, "better": "higher"},
+            "small.timeline.build_ms": {"value": 8.0, "better": "lower"},
+            "large.command.build_ms": {"value": 900.0, "better": "lower"},
+        }
+    }
+    result = {item.metric: item for item in compare_results(baseline, current, threshold=0.1)}
+
+    assert set(result) == set(baseline["metrics"])
+    assert result["small.command.build_ms"].regressed
+    assert result["small.text.images_per_sec"].regressed
+    assert not result["small.timeline.build_ms"].regressed
+    assert not compare_results(baseline, current, threshold=0.3)[0].regressed
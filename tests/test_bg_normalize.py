@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import make_script, make_timeline
+from src.render import bg_normalize
+from src.render.bg_normalize import normalize_backgrounds, normalized_path
+from src.render.ffmpeg_runner import build_section_command
+
+pytestmark = pytest.mark.usefixtures("text_stub")
+
+
+def test_normalized_path_depends_on_content_and_target(tmp_path: Path) -> None:
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"a" * 100)
+    base = normalized_path(source, 1920, 1080, 30, tmp_path)
+
+    assert base == normalized_path(source, 1920, 1080, 30, tmp_path)
+    assert base != normalized_path(source, 960, 540, 15, tmp_path)
+    source.write_bytes(b"b" * 100)
+    assert base != normalized_path(source, 1920, 1080, 30, tmp_path)
+
+
+def test_normalize_backgrounds_transcodes_once(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"video")
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        Path(command[-1]).write_bytes(b"normalized")
+
+    monkeypatch.setattr(bg_normalize.subprocess, "run", fake_run)
+    cache_dir = tmp_path / "normalized"
+    first = normalize_backgrounds(make_script(video={"bg": str(source)}), cache_dir=cache_dir)
+    second = normalize_backgrounds(make_script(video={"bg": str(source)}), cache_dir=cache_dir)
+
+    assert len(calls) == 1
+    assert "fps=30,format=yuv420p" in calls[0][calls[0].index("-vf") + 1]
+    assert first == second
+    assert Path(first[str(source)]).read_bytes() == b"normalized"
+
+
+def test_normalize_backgrounds_prunes_least_recently_used(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"video")
+    cache_dir = tmp_path / "normalized"
+    cache_dir.mkdir()
+    stale = cache_dir / "old_1920x1080_30_0123456789abcdef.mp4"
+    stale.write_bytes(b"x" * 1000)
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+
+    def fake_run(command, **kwargs):
+        Path(command[-1]).write_bytes(b"normalized" * 50)
+
+    monkeypatch.setattr(bg_normalize.subprocess, "run", fake_run)
+    mapping = normalize_backgrounds(make_script(video={"bg": str(source)}), cache_dir=cache_dir, cache_max_bytes=1000)
+
+    assert not stale.exists()
+    assert Path(mapping[str(source)]).exists()
+
+
+def test_section_reads_normalized_background_without_scaling(tmp_path: Path) -> None:
+    script = make_script(video={"bg": str(tmp_path / "clip.mp4")})
+    normalized = str(tmp_path / "clip_norm.mp4")
+
+    plain = build_section_command(script, make_timeline(script, [5.0]), 0, tmp_path / "s1.mp4")
+    cmd = build_section_command(
+        script, make_timeline(script, [5.0]), 0, tmp_path / "s1.mp4", backgrounds={script.video.bg: normalized}
+    )
+
+    assert "scale=1920:1080" in plain[plain.index("-filter_complex") + 1]
+    assert normalized in cmd
+    assert "scale=1920:1080" not in cmd[cmd.index("-filter_complex") + 1]
+
+
+def test_background_is_letterboxed_whatever_bg_fit_says(tmp_path: Path) -> None:
+    script = make_script(video={"bg": str(tmp_path / "clip.mp4"), "bg_fit": "cover"})
+    graph = build_section_command(script, make_timeline(script, [5.0]), 0, tmp_path / "s1.mp4")
+    filter_complex = graph[graph.index("-filter_complex") + 1]
+    assert "force_original_aspect_ratio=decrease" in filter_complex
+    assert "pad=1920:1080:(ow-iw)/2:(oh-ih)/2" in filter_complex
+    assert "crop=" not in filter_complex
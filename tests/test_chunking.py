@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+import struct
+import wave
+from pathlib import Path
+
+from conftest import make_wav
+
+from src.audio.chunking import concat_wavs, load_chunks, split_sentences
+from src.audio.synthesis import SectionAudioJob, synthesize_sections
+from src.audio.tts_cache import TTSCache
+from src.audio.voicevox_client import VoicevoxClient
+from src.models import OutputOptions, ScriptModel, Section, StrokeStyle, TextStyle, VideoConfig, VoiceSettings
+from src.timeline import build_timeline
+
+
+def test_split_sentences_keeps_terminators_and_closing_quotes() -> None:
+    assert split_sentences("今日は晴れ。「本当？」そうです！残り") == ["今日は晴れ。", "「本当？」", "そうです！", "残り"]
+    assert split_sentences("えっ！？ 本当") == ["えっ！？", "本当"]
+    assert split_sentences("区切りなし") == ["区切りなし"]
+
+
+def test_concat_wavs_inserts_exact_gaps() -> None:
+    joined, spans = concat_wavs([make_wav(2400, value=7), make_wav(1200, value=9)], gap_msec=100)
+
+    with wave.open(io.BytesIO(joined), "rb") as wf:
+        assert wf.getframerate() == 24000 and wf.getnframes() == 2400 + 2400 + 1200
+        samples = struct.unpack(f"<{wf.getnframes()}h", wf.readframes(wf.getnframes()))
+    assert spans == [(0.0, 0.1), (0.2, 0.25)]
+    assert set(samples[:2400]) == {7} and set(samples[2400:4800]) == {0} and set(samples[4800:]) == {9}
+
+
+def test_chunked_sections_record_sentence_boundaries(voicevox_stub, tmp_path: Path) -> None:
+    voicevox_stub.real_wav = True
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0)
+    cache = TTSCache(tmp_path / "cache", max_bytes=0)
+    audio_dir = tmp_path / "audio"
+    narration = "一文目です。二つ目！"
+    job = SectionAudioJob("intro", narration, audio_dir / "01_intro.wav")
+
+    results = synthesize_sections(client, [job], VoiceSettings(speaker_id=1), concurrency=2, cache=cache, sentence_gap_msec=50)
+
+    assert results[0].chunks == 2
+    assert voicevox_stub.calls.count("/synthesis") == 2
+    chunks = load_chunks(job.path)
+    # 6 and 4 characters at 10 ms each, 50 ms apart.
+    assert [(c.text, c.start_sec, c.end_sec) for c in chunks] == [("一文目です。", 0.0, 0.06), ("二つ目！", 0.11, 0.15)]
+
+    script = ScriptModel(
+        project="proj",
+        title="test",
+        video=VideoConfig(bg="bg.mp4"),
+        voice=VoiceSettings(speaker_id=1),
+        text_style=TextStyle(font="Arial", stroke=StrokeStyle()),
+        sections=[Section(id="intro", on_screen_text="", narration=narration)],
+        output=OutputOptions(filename="out.mp4"),
+    )
+    timeline = build_timeline(script, audio_dir)
+    assert timeline.sections[0].duration_sec == 0.15
+    assert timeline.sections[0].chunks == chunks
+
+    # Turning chunking off re-synthesizes as one request and drops the sidecar.
+    synthesize_sections(client, [job], VoiceSettings(speaker_id=1), cache=cache)
+    assert voicevox_stub.calls.count("/synthesis") == 3
+    assert load_chunks(job.path) == []
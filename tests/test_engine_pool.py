@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.audio.engine_pool import EnginePool
+from src.audio.synthesis import SectionAudioJob, synthesize_sections
+from src.audio.voicevox_client import VoicevoxError
+from src.models import ConfigModel, VoiceSettings
+
+
+def _pool(stubs, tmp_path: Path, **kwargs) -> EnginePool:
+    config = ConfigModel(work_dir=tmp_path / "work", voicevox_endpoints=[s.url for s in stubs], retries=2, **kwargs)
+    return EnginePool.from_config(config)
+
+
+def test_single_endpoint_config_still_works(tmp_path: Path) -> None:
+    assert ConfigModel().get_voicevox_endpoints() == ["http://localhost:50021"]
+    assert ConfigModel(voicevox_endpoints=["http://a:1", "http://b:2"]).get_voicevox_endpoints() == ["http://a:1", "http://b:2"]
+
+
+def test_warm_up_initializes_speaker_and_benches_dead_engines(voicevox_stubs, tmp_path: Path) -> None:
+    voicevox_stubs[2].down = True
+    pool = _pool(voicevox_stubs, tmp_path)
+
+    assert pool.warm_up(speaker_id=3) == 2
+
+    assert all("/initialize_speaker" in s.calls for s in voicevox_stubs)
+    assert [stat["healthy"] for stat in pool.stats()] == [True, True, False]
+    pool.close()
+
+
+def test_requests_spread_to_least_loaded_engines_and_skip_failures(voicevox_stubs, tmp_path: Path) -> None:
+    for stub in voicevox_stubs:
+        stub.delay_sec = 0.05
+    voicevox_stubs[1].down = True
+    pool = _pool(voicevox_stubs, tmp_path)
+    jobs = [SectionAudioJob(f"s{i}", f"line {i}", tmp_path / f"{i:02d}.wav") for i in range(12)]
+
+    results = synthesize_sections(pool, jobs, VoiceSettings(speaker_id=1), concurrency=4)
+
+    assert len(results) == 12 and all(job.path.exists() for job in jobs)
+    stats = pool.stats()
+    # The failing engine is tried once, then left out of rotation.
+    assert stats[1]["failures"] == 1 and not stats[1]["healthy"]
+    assert voicevox_stubs[1].calls.count("/audio_query") == 1
+    served = [s.calls.count("/synthesis") for s in voicevox_stubs]
+    assert served[0] + served[2] == 12 and min(served[0], served[2]) >= 3
+    pool.close()
+
+
+def test_request_fails_only_when_every_engine_fails(voicevox_stubs, tmp_path: Path) -> None:
+    for stub in voicevox_stubs:
+        stub.down = True
+    pool = _pool(voicevox_stubs, tmp_path)
+
+    with pytest.raises(VoicevoxError):
+        pool.synthesize("hello", VoiceSettings(speaker_id=1))
+
+    assert sum(stat["failures"] for stat in pool.stats()) == 3
+    pool.close()
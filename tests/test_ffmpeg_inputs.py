@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from src.render.ffmpeg_runner import _InputRegistry
+
+
+def test_registry_opens_shared_file_once_and_trims_branches_at_offsets() -> None:
+    inputs = _InputRegistry()
+    first = inputs.use(["-stream_loop", "-1", "-i", "bg.mp4"], "v", duration=6.0)
+    second = inputs.use(["-stream_loop", "-1", "-i", "bg.mp4"], "v", duration=4.0)
+    third = inputs.use(["-stream_loop", "-1", "-i", "bg.mp4"], "v", duration=2.0)
+
+    parts = inputs.finalize([f"{first}null[a]", f"{second}null[b]", f"{third}null[c]"])
+
+    assert inputs.args == ["-stream_loop", "-1", "-i", "bg.mp4"]
+    assert parts[0] == "[0:v]split=3[in0v0][in0vs1][in0vs2]"
+    assert "[in0vs1]trim=start=6.000,setpts=PTS-STARTPTS[in0v1]" in parts
+    assert "[in0vs2]trim=start=10.000,setpts=PTS-STARTPTS[in0v2]" in parts
+    assert inputs.stats() == {
+        "inputs_requested": 3,
+        "inputs_opened": 1,
+        "inputs_saved": 2,
+        "decoders_saved": 2,
+    }
+
+
+def test_registry_single_use_maps_directly_to_input_stream() -> None:
+    inputs = _InputRegistry()
+    voice = inputs.use(["-i", "01.wav"], "a")
+    bg = inputs.use(["-i", "bg.png"], "v")
+
+    parts = inputs.finalize([f"{voice}anull[aout]", f"{bg}null[vout]"])
+
+    assert parts == ["[0:a]anull[aout]", "[1:v]null[vout]"]
+    assert inputs.stats()["inputs_saved"] == 0
+
+
+def test_registry_uses_asplit_for_audio() -> None:
+    inputs = _InputRegistry(first_index=1)
+    a = inputs.use(["-i", "same.wav"], "a")
+    b = inputs.use(["-i", "same.wav"], "a")
+
+    parts = inputs.finalize([f"{a}{b}amix[out]"])
+
+    assert parts[0] == "[1:a]asplit=2[in1a0][in1a1]"
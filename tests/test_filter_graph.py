@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from conftest import make_script, make_timeline
+from src.models import OverlayImage, Section, TextPosition
+from src.render import ffmpeg_runner
+from src.render.filter_graph import FilterGraph
+
+
+def test_round_trip_keeps_quoted_and_escaped_arguments() -> None:
+    chains = [
+        "[0:v]scale=1920:1080,setsar=1[base]",
+        "[base]drawtext=text='a\\, b\\:c':enable='between(t,0.00,5.00)'[vout]",
+    ]
+    graph = FilterGraph.parse(chains)
+
+    assert [node.name for node in graph.nodes] == ["scale", "setsar", "drawtext"]
+    assert graph.serialize() == (
+        "[0:v]scale=1920:1080,setsar=1,drawtext=text='a\\, b\\:c':enable='between(t,0.00,5.00)'[vout]"
+    )
+
+
+def test_dead_labels_and_unused_split_branches_are_removed() -> None:
+    graph = FilterGraph.parse(
+        [
+            "[0:v]split=3[a][b][c]",
+            "[a]null[vout]",
+            "[b]trim=start=2[unused]",
+            "[c]scale=640:360[small]",
+            "[small][1:v]overlay[dead]",
+        ]
+    )
+    stats = graph.optimize(["[vout]"])
+
+    assert stats["dead_removed"] >= 3
+    assert graph.serialize() == "[0:v]null[vout]"
+
+
+def test_noop_and_redundant_setsar_are_dropped() -> None:
+    graph = FilterGraph.parse(
+        [
+            "[0:v]scale=1280:720,setsar=1,fps=30,fps=30,setpts=PTS[x]",
+            "[x]hue=s=0,setsar=1[vout]",
+        ]
+    )
+    graph.optimize(["vout"])
+
+    assert graph.serialize() == "[0:v]scale=1280:720,setsar=1,fps=30,hue=s=0[vout]"
+
+
+def test_chained_color_filters_are_fused_only_with_matching_windows() -> None:
+    window = "enable='between(t,0.00,5.00)'"
+    graph = FilterGraph.parse(
+        [
+            f"[0:v]eq=contrast=1.2:saturation=1.05:{window}[a]",
+            f"[a]eq=contrast=1.5:{window}[b]",
+            f"[b]hue=s=0:{window}[c]",
+            "[c]hue=s=0.5[vout]",
+        ]
+    )
+    stats = graph.optimize(["vout"])
+
+    assert stats["filters_fused"] == 1
+    assert graph.serialize() == (
+        f"[0:v]eq=contrast=1.8:saturation=1.05:{window},hue=s=0:{window},hue=s=0.5[vout]"
+    )
+
+
+def test_script_output_and_digest(tmp_path: Path) -> None:
+    graph = FilterGraph.parse(["[0:v]null[v]", "anullsrc[a]"])
+    script = graph.write_script(tmp_path / "graph.txt")
+
+    assert script.read_text(encoding="utf-8") == "[0:v]null[v];\nanullsrc[a]\n"
+    assert graph.digest() == FilterGraph.parse(["[0:v]null[v];anullsrc[a]"]).digest()
+
+
+def test_adjacent_overlays_with_matching_options_are_merged() -> None:
+    graph = FilterGraph.parse(
+        [
+            "[0:v][1:v]overlay=10:20:shortest=1[a]",
+            "[a][2:v]overlay=x=30:y=40:format=auto:shortest=1[b]",
+            "[b][3:v]overlay=x=W-w:y=0:shortest=1[vout]",
+        ]
+    )
+    seen = []
+
+    def compose(pieces):
+        seen.append(pieces)
+        return "9:v", 10, 20
+
+    stats = graph.optimize(["vout"], compose_overlays=compose)
+
+    assert seen == [[("1:v", 10, 20), ("2:v", 30, 40)]]
+    assert stats["overlays_merged"] == 1
+    assert graph.serialize() == (
+        "[0:v][9:v]overlay=x=10:y=20:shortest=1[b];[b][3:v]overlay=x=W-w:y=0:shortest=1[vout]"
+    )
+
+
+def test_overlays_stay_apart_when_composer_declines() -> None:
+    chains = ["[0:v][1:v]overlay=0:0[a]", "[a][2:v]overlay=5:5[vout]"]
+    graph = FilterGraph.parse(chains)
+
+    assert graph.optimize(["vout"], compose_overlays=lambda pieces: None)["overlays_merged"] == 0
+    assert graph.serialize() == FilterGraph.parse(chains).serialize()
+
+
+@pytest.mark.usefixtures("text_stub")
+def test_section_overlay_images_are_flattened_into_one_input(tmp_path: Path) -> None:
+    logos = []
+    for name, color in (("logo.png", (255, 0, 0, 255)), ("badge.png", (0, 0, 255, 128))):
+        Image.new("RGBA", (40, 30), color).save(tmp_path / name)
+        logos.append(str(tmp_path / name))
+    overlays = [
+        OverlayImage(file=logos[0], position=TextPosition(x=100, y=50)),
+        OverlayImage(file=logos[1], position=TextPosition(x=120, y=60)),
+    ]
+    script = make_script([Section(id="s1", on_screen_text="one", narration="n1", overlays=overlays)])
+    timeline = make_timeline(script, [5.0])
+
+    command = ffmpeg_runner.build_section_command(script, timeline, 0, tmp_path / "s1.mp4")
+    graph = command[command.index("-filter_complex") + 1]
+
+    assert not set(logos) & set(command)
+    # The caption and both logos are still images over the same frame: one blend.
+    assert graph.count("overlay=") == 1
+    assert "overlay=x=100:y=50:shortest=1" in graph
+    inputs = [command[i + 1] for i, token in enumerate(command) if token == "-i"]
+    assert len(inputs) == 2
+    layer = Path(inputs[-1])
+    with Image.open(layer) as image:
+        assert image.getpixel((0, 0)) == (255, 0, 0, 255)
+        colors = {color: count for count, color in image.getcolors(image.width * image.height)}
+        assert colors[(255, 255, 255, 255)] == 200 * 80
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.render.font_index import FontIndex, load_font_index, parse_fc_list
+
+FC_LIST = "\n".join(
+    [
+        "/fonts/DejaVuSans.ttf\t0\tDejaVu Sans\tBook\taa|af|en|fr",
+        "/fonts/DejaVuSans-Bold.ttf\t0\tDejaVu Sans\tBold\taa|af|en|fr",
+        "/fonts/NotoSansCJK-Bold.ttc\t0\tNoto Sans CJK JP,Noto Sans CJK JP Bold\tBold\ten|ja|ko",
+        "/fonts/NotoSansCJK-Regular.ttc\t0\tNoto Sans CJK JP,Noto Sans CJK JP Regular\tRegular,標準\ten|ja|ko",
+        "/fonts/NotoSansJP-Latin.otf\t0\tNoto Sans JP\tRegular\ten",
+        "/fonts/fonts.dir\t0\tbroken\t\t",
+    ]
+)
+
+
+def _index() -> FontIndex:
+    return FontIndex("fp", parse_fc_list(FC_LIST))
+
+
+def test_parse_fc_list_reads_families_styles_and_japanese_coverage() -> None:
+    records = parse_fc_list(FC_LIST)
+
+    assert len(records) == 5
+    cjk = records[3]
+    assert cjk.families == ["Noto Sans CJK JP", "Noto Sans CJK JP Regular"]
+    assert cjk.style == "Regular" and cjk.japanese
+    assert not records[0].japanese
+
+
+def test_resolve_prefers_regular_style_and_japanese_coverage() -> None:
+    index = _index()
+
+    assert index.resolve("DejaVu Sans") == "/fonts/DejaVuSans.ttf"
+    assert index.resolve("dejavu-sans bold") == "/fonts/DejaVuSans-Bold.ttf"
+    assert index.resolve("Noto Sans CJK JP") == "/fonts/NotoSansCJK-Regular.ttc"
+    # The only "Noto Sans JP" lacks Japanese glyphs: fall back to a Japanese face.
+    assert index.resolve("Noto Sans JP") == "/fonts/NotoSansCJK-Regular.ttc"
+    assert index.resolve("ヒラギノ角ゴシック") == "/fonts/NotoSansCJK-Regular.ttc"
+
+
+def test_index_is_persisted_and_rebuilt_when_fingerprint_changes(tmp_path: Path) -> None:
+    index_path = tmp_path / "font_index.json"
+    scans = []
+
+    def scan():
+        scans.append(1)
+        return parse_fc_list(FC_LIST)
+
+    first = load_font_index(index_path, fingerprint="a", scan=scan)
+    again = load_font_index(index_path, fingerprint="a", scan=scan)
+    assert len(scans) == 1
+    assert again.resolve("DejaVu Sans") == first.resolve("DejaVu Sans")
+
+    load_font_index(index_path, fingerprint="b", scan=scan)
+    assert len(scans) == 2
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from src.render.font_metrics import FontMetrics
+
+
+class _Face:
+    """Monospaced stand-in: every glyph is ``size`` px wide, plus the stroke on both sides."""
+
+    def __init__(self, size: int, calls: List[str]) -> None:
+        self.size = size
+        self.calls = calls
+
+    def getbbox(self, text: str, stroke_width: int = 0) -> Tuple[int, int, int, int]:
+        self.calls.append(text)
+        return (0, 0, len(text) * self.size + 2 * stroke_width, self.size)
+
+
+class _Metrics(FontMetrics):
+    def __init__(self) -> None:
+        super().__init__()
+        self.loaded: List[Tuple[str, int]] = []
+        self.measured: List[str] = []
+
+    def face(self, font_path: str, size: int) -> _Face:
+        cached = self._faces.get((font_path, size))
+        if cached is None:
+            self.loaded.append((font_path, size))
+            cached = _Face(size, self.measured)
+            self._faces.put((font_path, size), cached)
+        return cached
+
+
+def test_binary_search_finds_largest_fitting_size() -> None:
+    metrics = _Metrics()
+    # 10 glyphs + stroke 2*2: fits while 10 * size + 4 <= 500 -> size 49.
+    assert metrics.fit_font_size("abcdefghij", "font.ttf", 64, 500, min_fontsize=30, stroke_width=2) == 49
+    # log2(64 - 30) probes plus the initial check.
+    assert len(metrics.loaded) <= 7
+
+    assert metrics.fit_font_size("abc", "font.ttf", 64, 500, min_fontsize=30) == 64
+    assert metrics.fit_font_size("a" * 40, "font.ttf", 64, 500, min_fontsize=30) == 30
+
+
+def test_multiline_uses_widest_line_and_memoizes() -> None:
+    metrics = _Metrics()
+    assert metrics.max_line_width("ab\n\nabcd", "font.ttf", 10) == 40
+    assert metrics.fits("ab\nabcd", "font.ttf", 10, 40)
+    assert not metrics.fits("ab\nabcde", "font.ttf", 10, 40)
+
+    measured = len(metrics.measured)
+    metrics.max_line_width("ab\nabcd", "font.ttf", 10)
+    assert len(metrics.measured) == measured
+    assert metrics.loaded == [("font.ttf", 10)]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from conftest import make_script, make_timeline
+from src.models import ScriptModel, Section
+from src.render.ffmpeg_runner import build_ffmpeg_command
+
+pytestmark = pytest.mark.usefixtures("text_stub")
+
+
+def _script(static_fps: int | None = None) -> ScriptModel:
+    sections = [
+        Section(id="s1", on_screen_text="one", narration="n1"),
+        Section(id="s2", on_screen_text="two", narration="n2", bg="still.png"),
+    ]
+    return make_script(sections, video={"bg": "stock_60fps.mp4", "static_fps": static_fps})
+
+
+def test_frame_rate_is_fixed_before_scaling_and_on_output(tmp_path: Path) -> None:
+    script = _script()
+    cmd = build_ffmpeg_command(script, make_timeline(script, [3.0, 3.0]), tmp_path, tmp_path / "out.mp4")
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+
+    chain = next(part for part in filter_complex.split(";") if "scale=1920:1080" in part)
+    assert "setpts=PTS-STARTPTS,fps=30,scale=1920:1080" in chain
+    assert cmd[cmd.index("-r") + 1] == "30"
+
+
+def test_static_sections_run_at_static_fps(tmp_path: Path) -> None:
+    script = _script(static_fps=10)
+    cmd = build_ffmpeg_command(script, make_timeline(script, [3.0, 3.0]), tmp_path, tmp_path / "out.mp4")
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+
+    still = cmd.index("still.png")
+    assert cmd[still - 3 : still] == ["-framerate", "10", "-i"]
+    assert "fps=10,scale=1920:1080" in filter_complex
+    assert "fps=30,scale=1920:1080" in filter_complex
+    assert cmd[cmd.index("-r") + 1] == "30"
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from conftest import TextStub, make_script, make_timeline
+from src.models import OnScreenSegment, ScriptModel, Section, StrokeStyle, TextStyle
+from src.render import layout_plan
+from src.render.ffmpeg_runner import build_ffmpeg_command
+from src.render.layout_plan import LayoutPlan, build_layout_plan, get_layout_plan
+
+
+@pytest.fixture()
+def rendered(text_stub: TextStub) -> TextStub:
+    # Every caption comes back 4pt smaller than asked, as if fitted to the frame.
+    text_stub.size = lambda text: (10 * len(text), 40)
+    text_stub.fit_shrink = 4
+    return text_stub
+
+
+def _script() -> ScriptModel:
+    sections = [
+        Section(
+            id="s1",
+            on_screen_text="1位",
+            on_screen_segments=[OnScreenSegment(text="1位"), OnScreenSegment(text="本文です")],
+            narration="n",
+        ),
+        Section(id="s2", on_screen_text="まとめ", narration="n"),
+    ]
+    return make_script(sections)
+
+
+def test_plan_stacks_segments_and_records_fitted_size(rendered: TextStub) -> None:
+    plan = build_layout_plan(_script())
+
+    first, second = plan.section("s1").captions
+    assert (first.width, second.width) == (20, 40)
+    assert first.x == (1920 - 20) // 2
+    # hero_center: base y center-120, body_offset y=72, 8px gap between segments.
+    assert first.y == 1080 // 2 - 40 // 2 - 120
+    assert second.y == first.y + first.height + 8 + 72
+    # Fitted size and line breaks come from the text cache sidecar.
+    assert first.fontsize == 96 - 4
+    assert first.lines == ["1位"]
+    assert plan.section("s1").layer.endswith(".png")
+    single = plan.section("s2")
+    assert len(single.captions) == 1
+    assert (single.x, single.y) == (single.captions[0].x, single.captions[0].y)
+
+    restored = LayoutPlan.from_dict(json.loads(json.dumps(plan.to_dict())))
+    assert restored == plan
+
+
+def test_stored_plan_is_reused_without_measuring(rendered: TextStub, monkeypatch: pytest.MonkeyPatch) -> None:
+    plan = get_layout_plan(_script())
+    assert len(rendered.calls) == 3
+
+    monkeypatch.setattr(layout_plan, "_PLANS", {})
+    again = get_layout_plan(_script())
+    assert again == plan
+    assert len(rendered.calls) == 3
+
+    script = _script()
+    script.sections[1].on_screen_text = "変更"
+    assert get_layout_plan(script).key != plan.key
+    assert len(rendered.calls) == 6
+
+
+def test_evicted_image_rebuilds_plan(rendered: TextStub) -> None:
+    plan = get_layout_plan(_script())
+    Path(plan.section("s2").captions[0].image).unlink()
+
+    rebuilt = get_layout_plan(_script())
+    assert len(rendered.calls) == 6
+    assert all(Path(path).exists() for path in rebuilt.images())
+
+
+def test_renderer_overlays_plan_layer(rendered: TextStub, tmp_path: Path) -> None:
+    script = _script()
+    plan = get_layout_plan(script)
+    timeline = make_timeline(script, [2.0, 2.0])
+
+    cmd = build_ffmpeg_command(script, timeline, tmp_path, tmp_path / "out.mp4", layout=plan)
+
+    assert len(rendered.calls) == 3
+    assert plan.section("s1").layer in cmd
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+    s2 = plan.section("s2")
+    assert f"overlay={s2.x}:{s2.y}:shortest=1" in filter_complex
+
+
+def test_adjust_tickers_reuses_plan_measurements(rendered: TextStub, monkeypatch: pytest.MonkeyPatch) -> None:
+    from scripts import adjust_tickers
+
+    script = _script()
+    style = TextStyle(font="Arial", fontsize=64, stroke=StrokeStyle(width=5))
+    script.sections = [Section(id="s1", on_screen_text="本文", on_screen_segments=[OnScreenSegment(text="本文", style=style)], narration="n")]
+    caption = layout_plan.CaptionLayout(
+        text="本文", lines=["本文"], fontsize=64, width=300, height=70, x=0, y=0, image="",
+        font_path="/fonts/dummy.ttf", fill="#FFFFFF", stroke_color="#000000", stroke_width=5,
+    )
+    plan = LayoutPlan(key="k", width=1920, height=1080, render_scale=1.0, sections=[layout_plan.SectionLayout("s1", [caption])])
+    monkeypatch.setattr(adjust_tickers, "_resolve_font_path", lambda name: "/fonts/dummy.ttf")
+
+    def no_measuring():
+        raise AssertionError("text measured outside the layout plan")
+
+    monkeypatch.setattr(adjust_tickers, "get_font_metrics", no_measuring)
+    assert adjust_tickers.adjust_script(script, plan) is False
+    assert script.sections[0].on_screen_segments[0].style.fontsize == 64
+
+
+def test_title_thumbnail_is_rasterized_through_text_cache(rendered: TextStub, monkeypatch: pytest.MonkeyPatch) -> None:
+    from scripts import auto_trend_pipeline
+
+    monkeypatch.setattr(auto_trend_pipeline, "_thumbnail_font_path", lambda size: "/fonts/dummy.ttf")
+    monkeypatch.setattr(auto_trend_pipeline, "get_font_metrics", lambda: pytest.fail("title measured directly"))
+
+    path = auto_trend_pipeline.generate_thumbnail_from_title("今日のまとめ: 節約術")
+    try:
+        assert rendered.texts == ["今日のまとめ:", "節約術"]
+        with Image.open(path) as image:
+            assert image.size == (1280, 720)
+            # Second line: 30px wide, centered, below the first line and the 10px gap.
+            assert image.getpixel(((1280 - 30) // 2 + 1, (720 - 90) // 2 + 50)) == (255, 255, 255)
+    finally:
+        path.unlink()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from conftest import make_script, make_timeline
+from src.models import ConfigModel
+from src.render.preview_stream import PLAYLIST_NAME, build_preview_stream_command, stream_dir_for
+
+pytestmark = pytest.mark.usefixtures("text_stub")
+
+
+def test_stream_command_writes_fmp4_hls_from_render_graph(tmp_path: Path) -> None:
+    stream_dir = stream_dir_for(tmp_path / "previews", Path("outputs/rendered/out.mp4"))
+    stream_dir.mkdir(parents=True)
+    (stream_dir / "seg_00000.m4s").write_bytes(b"stale")
+    profile = ConfigModel().get_render_profile("proxy")
+
+    script = make_script()
+    cmd = build_preview_stream_command(script, make_timeline(script, [5.0]), tmp_path, stream_dir, profile=profile)
+
+    assert stream_dir.name == "out_stream"
+    assert not (stream_dir / "seg_00000.m4s").exists()
+    assert cmd[-1] == str(stream_dir / PLAYLIST_NAME)
+    assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+    assert cmd[cmd.index("-f") + 1] == "hls"
+    assert cmd[cmd.index("-hls_segment_type") + 1] == "fmp4"
+    assert cmd[cmd.index("-hls_playlist_type") + 1] == "event"
+    # Keyframe on every 2s segment boundary at 30fps.
+    assert cmd[cmd.index("-g") + 1] == "60"
+    # 480p proxy of a 1920x1080 script.
+    assert "scale=854:480" in cmd[cmd.index("-filter_complex") + 1]
+
+
+def test_stream_command_drops_mp4_only_options(tmp_path: Path) -> None:
+    script = make_script()
+    final = ConfigModel().get_render_profile("final")
+    cmd = build_preview_stream_command(
+        script, make_timeline(script, [5.0]), tmp_path, tmp_path / "stream", profile=final
+    )
+
+    assert "-movflags" not in cmd
+    assert cmd.count("-pix_fmt") == 1
+    assert cmd[cmd.index("-crf") + 1] == "18"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.render.progress import ProgressTracker, parse_progress_event, run_with_progress, with_progress_flags
+
+
+def _clock(values):
+    it = iter(values)
+    return lambda: next(it)
+
+
+def test_tracker_reports_percent_and_eta() -> None:
+    tracker = ProgressTracker(100.0, clock=_clock([0.0, 10.0, 40.0]))
+    block = ["frame=750", "fps=75.0", "out_time_us=25000000", "speed=2.5x"]
+    assert all(tracker.feed(line) is None for line in block)
+
+    event = tracker.feed("progress=continue")
+    assert event is not None
+    assert event["percent"] == 25.0
+    assert event["fps"] == 75.0
+    assert event["eta_sec"] == 30.0
+
+    tracker.feed("out_time=00:01:40.000000")
+    done = tracker.feed("progress=end")
+    assert done["status"] == "end"
+    assert done["percent"] == 100.0
+    assert done["eta_sec"] == 0.0
+
+
+def test_parse_progress_event_ignores_log_lines() -> None:
+    assert parse_progress_event("[INFO] Total duration: 10.00s") is None
+    assert parse_progress_event('{"event": "other"}') is None
+    event = parse_progress_event(json.dumps({"event": "progress", "percent": 10.0}) + "\n")
+    assert event == {"event": "progress", "percent": 10.0}
+
+
+def test_progress_flags_follow_binary() -> None:
+    assert with_progress_flags(["ffmpeg", "-y", "out.mp4"]) == ["ffmpeg", "-progress", "pipe:1", "-nostats", "-y", "out.mp4"]
+
+
+def _fake_ffmpeg(tmp_path: Path, body: str) -> str:
+    # Stand-in for ffmpeg that ignores its arguments.
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!{sys.executable}\nimport sys\n{body}\n", encoding="utf-8")
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_run_with_progress_streams_events(tmp_path: Path) -> None:
+    ok = _fake_ffmpeg(tmp_path, "print('out_time_us=5000000\\nprogress=continue\\nout_time_us=10000000\\nprogress=end')")
+    events = []
+    run_with_progress([ok, "-y", "out.mp4"], 10.0, on_progress=events.append)
+    assert [e["percent"] for e in events] == [50.0, 100.0]
+
+    failing = _fake_ffmpeg(tmp_path, "sys.exit(3)")
+    with pytest.raises(subprocess.CalledProcessError):
+        run_with_progress([failing, "out.mp4"], 10.0, on_progress=events.append)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from conftest import TextStub, make_script, make_timeline
+from src.models import ConfigModel, ScriptModel, StrokeStyle, TextStyle
+from src.render.ffmpeg_runner import build_ffmpeg_command, build_section_command
+from src.timeline import TimelineSummary
+
+
+def _script() -> ScriptModel:
+    return make_script(text_style=TextStyle(font="Arial", fontsize=64, stroke=StrokeStyle()))
+
+
+def _timeline() -> TimelineSummary:
+    return make_timeline(_script(), [5.0])
+
+
+def test_default_profiles_are_available() -> None:
+    config = ConfigModel()
+    assert config.get_render_profile().crf == 18
+    draft = config.get_render_profile("draft")
+    assert (draft.resolution, draft.preset, draft.crf) == (540, "ultrafast", 28)
+    with pytest.raises(ValueError):
+        config.get_render_profile("missing")
+
+
+def test_draft_profile_scales_frame_text_and_encoder(text_stub: TextStub, tmp_path: Path) -> None:
+    draft = ConfigModel().get_render_profile("draft")
+    cmd = build_ffmpeg_command(_script(), _timeline(), tmp_path, tmp_path / "out.mp4", profile=draft)
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+
+    assert "scale=960:540" in filter_complex
+    assert text_stub.sizes == [32]
+    assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+    assert cmd[cmd.index("-crf") + 1] == "28"
+    assert cmd[cmd.index("-r") + 1] == "15"
+
+
+def test_final_profile_keeps_script_resolution(text_stub: TextStub, tmp_path: Path) -> None:
+    final = ConfigModel().get_render_profile("final")
+    cmd = build_section_command(_script(), _timeline(), 0, tmp_path / "s1.mp4", profile=final)
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+
+    assert "scale=1920:1080" in filter_complex
+    assert text_stub.sizes == [64]
+    assert "+faststart" in cmd
+    assert cmd.count("-pix_fmt") == 1
+    assert cmd[cmd.index("-r") + 1] == "30"
+    plain = build_section_command(_script(), _timeline(), 0, tmp_path / "s1.mp4")
+    assert plain[plain.index("-pix_fmt") + 1] == "yuv420p"
+
+
+def test_configured_profiles_extend_the_defaults() -> None:
+    config = ConfigModel.model_validate(
+        {"render_profiles": {"social": {"resolution": 720, "crf": 20}, "final": {"crf": 16}}}
+    )
+
+    assert config.get_render_profile("social").resolution == 720
+    final = config.get_render_profile()
+    assert (final.crf, final.preset, final.audio_bitrate) == (16, "medium", "192k")
+    assert "+faststart" in final.extra_args
+    assert config.get_render_profile("draft").crf == 28
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import make_script, make_timeline
+from src.models import CreditsConfig, ScriptModel, Section
+from src.render import segments
+from src.render.ffmpeg_runner import build_concat_command, build_section_command
+from src.render.segments import render_segments, section_fingerprint
+from src.timeline import TimelineSummary
+
+pytestmark = pytest.mark.usefixtures("text_stub")
+
+
+def _script() -> ScriptModel:
+    sections = [Section(id="s1", on_screen_text="one", narration="n1"), Section(id="s2", on_screen_text="two", narration="n2")]
+    return make_script(sections, credits=CreditsConfig(text="credits"))
+
+
+def _timeline() -> TimelineSummary:
+    return make_timeline(_script(), [6.0, 4.0])
+
+
+def test_section_command_is_video_only_with_fixed_rate(tmp_path: Path) -> None:
+    cmd = build_section_command(_script(), _timeline(), 0, tmp_path / "s1.mp4", threads=2)
+    assert "-an" in cmd
+    assert cmd[cmd.index("-r") + 1] == "30"
+    assert cmd[cmd.index("-threads") + 1] == "2"
+    assert "concat=" not in " ".join(cmd)
+    # Credits start at total-4s = 6.0s, i.e. after the first section ends.
+    assert "vcred" not in " ".join(cmd)
+
+
+def test_section_command_shifts_credit_window_into_clip_time(tmp_path: Path) -> None:
+    cmd = build_section_command(_script(), _timeline(), 1, tmp_path / "s2.mp4")
+    assert "enable='between(t,0.00,4.50)'[vcred]" in " ".join(cmd)
+
+
+def test_concat_command_copies_video_and_mixes_audio(tmp_path: Path) -> None:
+    cmd = build_concat_command(_script(), _timeline(), tmp_path / "list.txt", tmp_path / "out.mp4")
+    joined = " ".join(cmd)
+    assert "-f concat -safe 0 -i" in joined
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert "anullsrc" in joined
+
+
+def test_render_segments_dry_run_writes_concat_list_in_order(tmp_path: Path) -> None:
+    result = render_segments(
+        _script(),
+        _timeline(),
+        tmp_path / "out.mp4",
+        work_dir=tmp_path / "work",
+        workers=2,
+        dry_run=True,
+        use_cache=False,
+    )
+    assert [p.name for p in result.clip_paths] == ["01_s1.mp4", "02_s2.mp4"]
+    assert len(result.commands) == 3
+    listing = (tmp_path / "work" / "segments" / "out" / "concat.txt").read_text(encoding="utf-8")
+    assert listing.index("01_s1.mp4") < listing.index("02_s2.mp4")
+
+
+def test_section_fingerprint_ignores_threads_and_output_path(tmp_path: Path) -> None:
+    a = build_section_command(_script(), _timeline(), 0, tmp_path / "a.mp4", threads=2)
+    b = build_section_command(_script(), _timeline(), 0, tmp_path / "b.mp4", threads=8)
+    assert section_fingerprint(a) == section_fingerprint(b)
+
+
+def test_section_fingerprint_changes_with_caption(tmp_path: Path) -> None:
+    script = _script()
+    before = section_fingerprint(build_section_command(script, _timeline(), 0, tmp_path / "a.mp4"))
+    script.sections[0].on_screen_text = "edited"
+    timeline = _timeline()
+    timeline.sections[0].on_screen_text = "edited"
+    after = section_fingerprint(build_section_command(script, timeline, 0, tmp_path / "a.mp4"))
+    assert before != after
+
+
+def test_render_segments_reuses_cached_sections(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "clips"
+    cache_dir.mkdir()
+    first = render_segments(
+        _script(), _timeline(), tmp_path / "out.mp4", work_dir=tmp_path / "work", dry_run=True, cache_dir=cache_dir
+    )
+    # Pretend the first section was rendered by a previous run.
+    first.clip_paths[0].write_bytes(b"clip")
+
+    second = render_segments(
+        _script(), _timeline(), tmp_path / "out.mp4", work_dir=tmp_path / "work", dry_run=True, cache_dir=cache_dir
+    )
+    assert second.cache_hits == ["s1"]
+    assert second.clip_paths[0] == first.clip_paths[0]
+    # Only the changed section plus the concat step remain to run.
+    assert len(second.commands) == 2
+
+
+def test_render_segments_encodes_identical_sections_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    script = _script().model_copy(update={"credits": None})
+    script.sections[1] = Section(id="s2", on_screen_text="one", narration="n1")
+    timeline = make_timeline(script, [5.0, 5.0])
+    cache_dir = tmp_path / "clips"
+    cache_dir.mkdir()
+    encoded = []
+
+    def fake_run(command, label):
+        encoded.append(label)
+        Path(command[-1]).write_bytes(b"clip")
+
+    monkeypatch.setattr(segments, "_run", fake_run)
+    result = render_segments(
+        script, timeline, tmp_path / "out.mp4", work_dir=tmp_path / "work", cache_dir=cache_dir, workers=2
+    )
+    assert encoded == ["section s1", "concat"]
+    assert result.clip_paths[0] == result.clip_paths[1]
+    assert result.clip_paths[0].exists()
+
+
+def test_render_segments_prunes_least_recently_used_clips(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache_dir = tmp_path / "clips"
+    cache_dir.mkdir()
+    stale = cache_dir / "section_stale.mp4"
+    stale.write_bytes(b"x" * 1000)
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+
+    def fake_run(command, label):
+        Path(command[-1]).write_bytes(b"clip" * 100)
+
+    monkeypatch.setattr(segments, "_run", fake_run)
+    result = render_segments(
+        _script(), _timeline(), tmp_path / "out.mp4", work_dir=tmp_path / "work", cache_dir=cache_dir, cache_max_bytes=1000
+    )
+    assert not stale.exists()
+    assert all(path.exists() for path in result.clip_paths)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from conftest import TextStub, make_script, make_timeline
+from src.models import OverlayImage, ScriptModel, Section, TextPosition
+from src.render import layout_plan
+from src.render.snapshot import background_time, render_frame, resolve_position, section_at
+from src.timeline import TimelineSummary
+
+
+@pytest.fixture(autouse=True)
+def _red_captions(text_stub: TextStub) -> None:
+    text_stub.size = lambda text: (100, 40)
+    text_stub.color = (255, 0, 0, 255)
+
+
+def _script(bg: str, overlay: str | None = None) -> ScriptModel:
+    overlays = [OverlayImage(file=overlay, position=TextPosition(x="right-10", y="top+10"), opacity=0.5)] if overlay else []
+    sections = [
+        Section(id="s1", on_screen_text="一", narration="n"),
+        Section(id="s2", on_screen_text="二", narration="n", overlays=overlays),
+    ]
+    return make_script(sections, video={"bg": bg, "width": 640, "height": 360})
+
+
+def _timeline() -> TimelineSummary:
+    return make_timeline(_script("bg.mp4"), [2.0, 3.0])
+
+
+def test_section_at_maps_and_clamps_time() -> None:
+    timeline = _timeline()
+    assert section_at(timeline, 0.5)[0] == 0
+    idx, section_tl, local = section_at(timeline, 3.25)
+    assert (idx, section_tl.id, local) == (1, "s2", 1.25)
+    assert section_at(timeline, 99.0)[1].id == "s2"
+
+
+def test_resolve_position_matches_format_position_semantics() -> None:
+    pos = TextPosition(x="right-40", y="center+10")
+    assert resolve_position(pos, "x", 1000, 100) == 860
+    assert resolve_position(pos, "y", 500, 100, scale=0.5) == 205
+    assert resolve_position(TextPosition(x=30, y="bottom"), "x", 1000, 100, scale=0.5) == 15
+
+
+def test_background_time_continues_shared_background() -> None:
+    script = _script("shared.mp4")
+    assert background_time(script, _timeline(), 1, 0.5) == ("shared.mp4", 2.5)
+    script.sections[1].bg = "other.mp4"
+    assert background_time(script, _timeline(), 1, 0.5) == ("other.mp4", 0.5)
+
+
+def test_render_frame_composites_caption_and_overlay(tmp_path: Path) -> None:
+    bg = tmp_path / "bg.png"
+    Image.new("RGB", (1280, 720), (0, 0, 255)).save(bg)
+    overlay = tmp_path / "logo.png"
+    Image.new("RGBA", (20, 20), (0, 255, 0, 255)).save(overlay)
+    script = _script(str(bg), str(overlay))
+
+    frame = render_frame(script, _timeline(), 3.0)
+
+    assert frame.size == (640, 360)
+    assert frame.getpixel((2, 350)) == (0, 0, 255)
+    caption = layout_plan.get_layout_plan(script).section("s2")
+    assert frame.getpixel((caption.x + 5, caption.y + 5)) == (255, 0, 0)
+    # Overlay at right-10/top+10 with 50% opacity over the blue background.
+    r, g, b = frame.getpixel((620, 15))
+    assert r == 0 and 120 <= g <= 135 and 120 <= b <= 135
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.audio.synthesis import SectionAudioJob, synthesize_sections
+from src.audio.voicevox_client import VoicevoxClient, VoicevoxError
+from src.models import VoiceSettings
+from src.stages import Stage, StageTimeout, run_stages
+
+
+def _sleeper(sec: float, value: str):
+    def run() -> str:
+        time.sleep(sec)
+        return value
+
+    return run
+
+
+def test_stages_overlap_and_join_before_returning() -> None:
+    started = time.perf_counter()
+    report = run_stages([Stage("a", _sleeper(0.2, "A")), Stage("b", _sleeper(0.2, "B")), Stage("c", _sleeper(0.2, "C"))])
+
+    assert time.perf_counter() - started < 0.5
+    assert report.results == {"a": "A", "b": "B", "c": "C"}
+    assert list(report.durations) == ["a", "b", "c"] and all(d >= 0.2 for d in report.durations.values())
+
+
+def test_failure_is_reraised_and_cancels_the_others() -> None:
+    cancel = threading.Event()
+
+    def fail() -> None:
+        raise SystemExit("[ERROR] no background")
+
+    with pytest.raises(SystemExit, match="no background"):
+        run_stages([Stage("slow", _sleeper(5.0, "x")), Stage("bg", fail)], cancel=cancel)
+    assert cancel.is_set()
+
+
+def test_timeout_does_not_wait_for_hung_stage() -> None:
+    cancel = threading.Event()
+    started = time.perf_counter()
+
+    with pytest.raises(StageTimeout, match="bgm"):
+        run_stages([Stage("bgm", _sleeper(5.0, "x"), timeout_sec=0.1), Stage("fast", _sleeper(0.0, "y"))], cancel=cancel)
+
+    assert time.perf_counter() - started < 1.0
+    assert cancel.is_set()
+
+
+def test_cancel_stops_synthesis_before_next_request(voicevox_stub, tmp_path: Path) -> None:
+    cancel = threading.Event()
+    cancel.set()
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0)
+    jobs = [SectionAudioJob("s1", "line", tmp_path / "01_s1.wav")]
+
+    with pytest.raises(VoicevoxError, match="cancelled"):
+        synthesize_sections(client, jobs, VoiceSettings(speaker_id=1), cancel=cancel)
+    assert voicevox_stub.calls == []
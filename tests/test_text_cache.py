@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src.render import ffmpeg_runner, text_cache
+from src.render.text_cache import TextCache, text_cache_key
+
+
+def _image(width: int = 64, height: int = 32) -> Image.Image:
+    return Image.new("RGBA", (width, height), (255, 0, 0, 255))
+
+
+def test_key_covers_requested_parameters() -> None:
+    base = text_cache_key("hello", "/fonts/a.ttf", 54, "#FFFFFF", "#000000", 3, 8, 1600)
+    assert base == text_cache_key("hello", "/fonts/a.ttf", 54, "#FFFFFF", "#000000", 3, 8, 1600)
+    assert base != text_cache_key("hello", "/fonts/a.ttf", 54, "#FFFFFF", "#000000", 3, 8, 1200)
+    assert base != text_cache_key("hello", "/fonts/a.ttf", 60, "#FFFFFF", "#000000", 3, 8, 1600)
+
+
+def test_store_then_lookup_returns_sidecar_metadata(tmp_path: Path) -> None:
+    cache = TextCache(tmp_path)
+    cache.store("abc", _image(), fontsize=48, lines=["line one", "line two"])
+
+    entry = cache.lookup("abc")
+    assert entry is not None
+    assert (entry.width, entry.height, entry.fontsize, entry.lines) == (64, 32, 48, ["line one", "line two"])
+    assert Path(entry.path).name == "text_abc.png"
+    assert not [p for p in tmp_path.iterdir() if ".tmp" in p.name]
+
+    Path(entry.path).unlink()
+    assert cache.lookup("abc") is None
+
+
+def test_cache_hit_skips_rasterization(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(ffmpeg_runner, "_cache_dir", lambda name: tmp_path)
+    key = text_cache_key("cached", "/no/such/font.ttf", 54, "#FFFFFF", "#000000", 3, 8, 1600)
+    text_cache.get_text_cache(tmp_path).store(key, _image(120, 40), fontsize=50, lines=["cached"])
+    # A miss would need Pillow to open the (missing) font.
+    monkeypatch.setitem(sys.modules, "PIL", None)
+
+    path, width, height = ffmpeg_runner._render_text_image(
+        "cached", "/no/such/font.ttf", 54, "#FFFFFF", "#000000", 3, 8, max_width=1600
+    )
+    assert (Path(path).name, width, height) == (f"text_{key}.png", 120, 40)
+
+
+def test_evicts_least_recently_used_beyond_budget(tmp_path: Path) -> None:
+    cache = TextCache(tmp_path, max_bytes=0)
+    old = time.time() - 3 * text_cache.EVICTION_GRACE_SEC
+    for idx, name in enumerate(["oldest", "older", "recent"]):
+        cache.store(name, _image(), fontsize=40, lines=[name])
+        os.utime(cache.png_path(name), (old + idx, old + idx))
+    cache.lookup("oldest")  # a hit refreshes the entry
+    entry_size = cache.png_path("older").stat().st_size
+
+    cache.max_bytes = int(entry_size * 2.5)
+    cache.evict()
+    remaining = sorted(p.stem for p in tmp_path.glob("*.png"))
+    assert remaining == ["text_oldest", "text_recent"]
+    assert not (tmp_path / "text_older.json").exists()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from conftest import TextStub, make_script, make_timeline
+from src.models import OnScreenSegment, Section
+from src.render.ffmpeg_runner import _composite_text_layer, build_ffmpeg_command
+
+pytestmark = pytest.mark.usefixtures("text_stub")
+
+
+def _png(path: Path, size: tuple[int, int], color: tuple[int, int, int, int]) -> str:
+    Image.new("RGBA", size, color).save(path)
+    return str(path)
+
+
+def test_composite_places_pieces_on_bounding_box_canvas(tmp_path: Path) -> None:
+    red = _png(tmp_path / "text_red.png", (40, 10), (255, 0, 0, 255))
+    blue = _png(tmp_path / "text_blue.png", (20, 10), (0, 0, 255, 255))
+
+    path, x, y = _composite_text_layer([(red, 100, 50, 40, 10), (blue, 110, 68, 20, 10)])
+
+    assert (x, y) == (100, 50)
+    with Image.open(path) as layer:
+        assert layer.size == (40, 28)
+        assert layer.getpixel((0, 0)) == (255, 0, 0, 255)
+        assert layer.getpixel((10, 18)) == (0, 0, 255, 255)
+        assert layer.getpixel((0, 27))[3] == 0
+
+
+def test_composite_reuses_cached_layer(tmp_path: Path) -> None:
+    a = _png(tmp_path / "text_a.png", (10, 10), (255, 255, 255, 255))
+    b = _png(tmp_path / "text_b.png", (10, 10), (0, 0, 0, 255))
+    first, _, _ = _composite_text_layer([(a, 0, 0, 10, 10), (b, 0, 20, 10, 10)])
+    inode = Path(first).stat().st_ino
+    second, _, _ = _composite_text_layer([(a, 5, 5, 10, 10), (b, 5, 25, 10, 10)])
+    assert first == second
+    # Hits only refresh the mtime (LRU clock); a re-render would replace the file.
+    assert Path(second).stat().st_ino == inode
+
+
+def test_section_with_segments_uses_single_overlay(text_stub: TextStub, tmp_path: Path) -> None:
+    text_stub.size = lambda text: (100, 40)
+    segments = [OnScreenSegment(text="1位"), OnScreenSegment(text="本文"), OnScreenSegment(text="補足")]
+    script = make_script([Section(id="s1", on_screen_text="1位", on_screen_segments=segments, narration="n")])
+    timeline = make_timeline(script, [3.0])
+
+    cmd = build_ffmpeg_command(script, timeline, tmp_path, tmp_path / "out.mp4")
+
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+    assert filter_complex.count("overlay=") == 1
+    assert any(Path(token).name.startswith("layer_") for token in cmd)
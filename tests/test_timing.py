@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+from src.timing import Timings, activate, append_render_log, span, timed
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_top_level_spans_are_ordered_stages_and_nested_spans_aggregate() -> None:
+    clock = _Clock()
+    timings = Timings(clock=clock)
+    with timings.span("voicevox"):
+        clock.now += 2.0
+    with timings.span("render"):
+        for cost in (0.5, 1.5):
+            with timings.span("text.rasterize"):
+                clock.now += cost
+        clock.now += 3.0
+
+    report = timings.to_dict()
+    assert [(stage["name"], stage["start_sec"], stage["duration_sec"]) for stage in report["stages"]] == [
+        ("voicevox", 0.0, 2.0),
+        ("render", 2.0, 5.0),
+    ]
+    assert report["steps"]["text.rasterize"] == {"count": 2, "total_sec": 2.0, "max_sec": 1.5}
+    assert report["total_sec"] == 7.0
+
+
+def test_module_span_records_on_active_recorder_only() -> None:
+    @timed("font.resolve")
+    def resolve(name: str) -> str:
+        return name.upper()
+
+    assert resolve("arial") == "ARIAL"  # no recorder: plain call
+
+    timings = Timings()
+    previous = activate(timings)
+    try:
+        with span("render"):
+            resolve("arial")
+        worker = threading.Thread(target=resolve, args=("noto",))
+        worker.start()
+        worker.join()
+    finally:
+        activate(previous)
+
+    report = timings.to_dict()
+    assert [stage["name"] for stage in report["stages"]] == ["render"]
+    # Spans from worker threads are steps even at their top level.
+    assert report["steps"]["font.resolve"]["count"] == 2
+
+
+def test_render_log_is_append_only(tmp_path: Path) -> None:
+    log_path = tmp_path / "logs" / "render_log.jsonl"
+    append_render_log(log_path, {"version": "2.1.0", "timings": {"total_sec": 1.0}})
+    append_render_log(log_path, {"version": "2.2.0", "timings": {"total_sec": 0.5}})
+
+    lines = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [line["version"] for line in lines] == ["2.1.0", "2.2.0"]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from src.audio.synthesis import SectionAudioJob, synthesize_sections
+from src.audio.tts_cache import AudioQueryCache, TTSCache, tts_cache_key
+from src.audio.voicevox_client import VoicevoxClient
+from src.models import VoiceSettings
+
+
+def test_key_covers_text_and_engine_parameters_only() -> None:
+    voice = VoiceSettings(speaker_id=1)
+    key = tts_cache_key("こんにちは", voice)
+    assert key == tts_cache_key("こんにちは", VoiceSettings(speaker_id=1, pause_msec=900))
+    assert key != tts_cache_key("こんばんは", voice)
+    assert key != tts_cache_key("こんにちは", VoiceSettings(speaker_id=2))
+    assert key != tts_cache_key("こんにちは", VoiceSettings(speaker_id=1, volumeScale=1.1))
+
+
+def test_repeated_lines_are_linked_and_changed_narration_is_resynthesized(voicevox_stub, tmp_path: Path) -> None:
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0)
+    cache = TTSCache(tmp_path / "tts_cache", max_bytes=0)
+    voice = VoiceSettings(speaker_id=1)
+    first = [SectionAudioJob("intro", "intro", tmp_path / "a" / "01_intro.wav"), SectionAudioJob("cta", "登録してね", tmp_path / "a" / "02_cta.wav")]
+
+    synthesize_sections(client, first, voice, cache=cache)
+    assert voicevox_stub.calls.count("/synthesis") == 2
+
+    # Another video ending with the same outro: the CTA comes from the cache.
+    second = [SectionAudioJob("cta", "登録してね", tmp_path / "b" / "01_cta.wav")]
+    results = synthesize_sections(client, second, voice, cache=cache)
+    assert results[0].cached
+    assert voicevox_stub.calls.count("/synthesis") == 2
+    assert os.path.samefile(second[0].path, first[1].path)
+
+    # Same file name, edited narration: the old WAV must not be reused.
+    edited = [SectionAudioJob("intro", "intro v2", first[0].path)]
+    results = synthesize_sections(client, edited, voice, cache=cache)
+    assert not results[0].skipped and not results[0].cached
+    assert first[0].path.read_bytes() == b"RIFF:intro v2:1.0"
+
+    # Unchanged narration on a rerun is a no-op.
+    assert synthesize_sections(client, edited, voice, cache=cache)[0].skipped
+
+
+def test_eviction_drops_least_recently_used_but_keeps_linked_copies(tmp_path: Path) -> None:
+    cache = TTSCache(tmp_path / "cache", max_bytes=250)
+    cache.store("old", b"x" * 100)
+    cache.store("new", b"y" * 100)
+    os.utime(cache.path_for("old"), (1, 1))
+    assert cache.link_into("old", tmp_path / "render" / "old.wav")
+
+    cache.store("newest", b"z" * 100)
+
+    assert cache.lookup("old") is None
+    assert cache.lookup("new") is not None and cache.lookup("newest") is not None
+    assert (tmp_path / "render" / "old.wav").read_bytes() == b"x" * 100
+    assert not cache.link_into("old", tmp_path / "render" / "again.wav")
+
+
+def test_parameter_only_change_reuses_audio_query(voicevox_stub, tmp_path: Path) -> None:
+    query_cache = AudioQueryCache(tmp_path / "queries")
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0, query_cache=query_cache)
+
+    client.synthesize("今日の一言", VoiceSettings(speaker_id=1))
+    wav = VoicevoxClient(base_url=voicevox_stub.url, retries=0, query_cache=query_cache).synthesize(
+        "今日の一言", VoiceSettings(speaker_id=1, speedScale=1.3)
+    )
+
+    assert wav == "RIFF:今日の一言:1.3".encode()
+    assert voicevox_stub.calls.count("/audio_query") == 1
+    assert voicevox_stub.calls.count("/synthesis") == 2
+
+    # A different engine build re-runs the analysis.
+    voicevox_stub.version = "0.15.0"
+    VoicevoxClient(base_url=voicevox_stub.url, retries=0, query_cache=query_cache).synthesize("今日の一言", VoiceSettings(speaker_id=1))
+    assert voicevox_stub.calls.count("/audio_query") == 2
+
+
+def test_missing_version_endpoint_is_probed_once(voicevox_stub, tmp_path: Path, capsys) -> None:
+    voicevox_stub.version = None
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0, query_cache=AudioQueryCache(tmp_path / "queries"))
+
+    for text in ("一", "二", "三"):
+        client.synthesize(text, VoiceSettings(speaker_id=1))
+
+    assert voicevox_stub.calls.count("/version") == 1
+    assert voicevox_stub.calls.count("/audio_query") == 3
+    assert capsys.readouterr().out.count("[WARN] VOICEVOX version unavailable") == 1
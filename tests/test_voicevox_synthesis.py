@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from src.audio.synthesis import SectionAudioJob, synthesize_sections
+from src.audio.voicevox_client import VoicevoxClient, VoicevoxError
+from src.models import VoiceSettings
+
+
+def _jobs(tmp_path: Path, count: int) -> list[SectionAudioJob]:
+    return [SectionAudioJob(f"s{i}", f"text {i}", tmp_path / f"{i:02d}_s{i}.wav") for i in range(1, count + 1)]
+
+
+def test_sections_synthesize_in_parallel_over_pooled_connections(voicevox_stub, tmp_path: Path) -> None:
+    voicevox_stub.delay_sec = 0.1
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0, pool_size=4)
+    jobs = _jobs(tmp_path, 8)
+
+    started = time.perf_counter()
+    results = synthesize_sections(client, jobs, VoiceSettings(speaker_id=1), concurrency=4)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    # 16 requests at 0.1s each: ~1.6s serially, ~0.4s with four in flight.
+    assert elapsed < 1.0
+    assert voicevox_stub.max_in_flight == 4
+    # Keep-alive: at most one connection per worker, not one per request.
+    assert len(voicevox_stub.clients) <= 4
+    assert [r.section_id for r in results] == [j.section_id for j in jobs]
+    assert all(r.latency_sec >= 0.2 for r in results)
+    assert (tmp_path / "03_s3.wav").read_bytes() == b"RIFF:text 3:1.0"
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_existing_wavs_are_kept_unless_forced(voicevox_stub, tmp_path: Path) -> None:
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0)
+    jobs = _jobs(tmp_path, 2)
+    jobs[0].path.write_bytes(b"old")
+
+    results = synthesize_sections(client, jobs, VoiceSettings(speaker_id=1), concurrency=2)
+
+    assert [r.skipped for r in results] == [True, False]
+    assert jobs[0].path.read_bytes() == b"old"
+    synthesize_sections(client, jobs, VoiceSettings(speaker_id=1, speedScale=1.2), force=True)
+    assert jobs[0].path.read_bytes() == b"RIFF:text 1:1.2"
+
+
+def test_failure_names_section_and_leaves_no_partial_file(voicevox_stub, tmp_path: Path) -> None:
+    voicevox_stub.fail_texts.add("text 2")
+    client = VoicevoxClient(base_url=voicevox_stub.url, retries=0)
+    jobs = _jobs(tmp_path, 3)
+
+    with pytest.raises(VoicevoxError, match="section s2"):
+        synthesize_sections(client, jobs, VoiceSettings(speaker_id=1), concurrency=1)
+
+    assert jobs[0].path.exists()
+    assert not jobs[1].path.exists()
+    assert not list(tmp_path.glob(".*.tmp"))